@@ -0,0 +1,193 @@
+"""Time the verification on synthetic tenants and write the results to a JSON file.
+
+Run with ``uv run python -m benchmarks.run``, see ``--help`` for the options.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import functools
+import gc
+import importlib
+import itertools
+import json
+import operator
+import pathlib
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from collections.abc import Callable, Sequence
+
+import anyio
+
+from benchmarks import tenant as synthetic
+from factorialhr_analysis import export, working_time_verification
+from factorialhr_analysis.working_time_verification import helper
+
+# the pages package exports functions with the same names as its modules
+page = importlib.import_module('factorialhr_analysis.pages.working_time_verification_page')
+
+SIZES = (1_000, 100_000, 1_000_000)
+
+
+def _by_employee(shifts: Sequence[synthetic.SyntheticShift]) -> list[list[synthetic.SyntheticShift]]:
+    ordered = sorted(shifts, key=lambda shift: (shift.employee_id, *helper.chronological_order(shift)))  # pyright: ignore[reportArgumentType]
+    return [list(group) for _, group in itertools.groupby(ordered, key=operator.attrgetter('employee_id'))]
+
+
+def _get_error(tenant: synthetic.Tenant) -> Callable[[], object]:
+    employees = _by_employee(tenant.shifts)
+    return lambda: [list(working_time_verification.get_error(shifts)) for shifts in employees]  # pyright: ignore[reportArgumentType]
+
+
+def _calculate_break_time(tenant: synthetic.Tenant) -> Callable[[], object]:
+    employees = _by_employee(tenant.shifts)
+    return lambda: [helper.calculate_break_time(shifts) for shifts in employees]  # pyright: ignore[reportArgumentType]
+
+
+def _load_shifts(tenant: synthetic.Tenant) -> Callable[[], object]:
+    return lambda: working_time_verification.ShiftStore.from_attendances(tenant.shifts)  # pyright: ignore[reportArgumentType]
+
+
+def _verify(tenant: synthetic.Tenant, shift_store: working_time_verification.ShiftStore) -> page.Verification:
+    """Run the pipeline of DataStateDeprecated.calculate_errors, without state updates and with an empty cache."""
+    verification = page.Verification()
+    employees = {employee.id: employee for employee in tenant.employees}
+
+    async def add_errors(result: working_time_verification.parallel.ChunkResult):
+        for employee_id, errors in result:
+            verification.add_errors(employees[employee_id], tenant.team_names.get(employee_id, []), errors)  # pyright: ignore[reportArgumentType]
+
+    _, totals = anyio.run(
+        functools.partial(
+            working_time_verification.pipeline.verify_company,
+            shift_store,
+            tenant.employees,  # pyright: ignore[reportArgumentType]
+            tenant.team_names,
+            tenant.profile.start,
+            tenant.end,
+            None,
+            add_errors,
+            error_cache=working_time_verification.ErrorCache(maxsize=len(employees)),
+            consolidate=True,
+        )
+    )
+    verification.period_hours = [page._to_period_hours(row) for row in totals]  # noqa: SLF001
+    return verification
+
+
+def _calculate_errors(tenant: synthetic.Tenant) -> Callable[[], object]:
+    shift_store = working_time_verification.ShiftStore.from_attendances(tenant.shifts)  # pyright: ignore[reportArgumentType]
+    return lambda: _verify(tenant, shift_store)
+
+
+def _export_csv(tenant: synthetic.Tenant) -> Callable[[], object]:
+    verification = _verify(tenant, working_time_verification.ShiftStore.from_attendances(tenant.shifts))  # pyright: ignore[reportArgumentType]
+    rows = functools.partial(
+        page._export_rows,  # noqa: SLF001
+        verification.errors,
+        verification.errors_to_show,
+        range(len(verification.errors)),
+        with_attendances=False,
+    )
+    return lambda: sum(len(chunk) for chunk in export.write(export.Format.CSV, page.EXPORT_COLUMNS, rows()))
+
+
+# every benchmark prepares its input outside of the timing and returns the timed function
+BENCHMARKS: dict[str, Callable[[synthetic.Tenant], Callable[[], object]]] = {
+    'get_error': _get_error,
+    'calculate_break_time': _calculate_break_time,
+    'load_shifts': _load_shifts,
+    'calculate_errors': _calculate_errors,
+    'export_csv': _export_csv,
+}
+
+
+def _measure(function: Callable[[], object], repeat: int) -> list[float]:
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        function()
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def _revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(results: list[dict], baseline_path: pathlib.Path):
+    baseline = {
+        (entry['benchmark'], entry['shifts']): entry['best']
+        for entry in json.loads(baseline_path.read_text())['results']
+    }
+    for entry in results:
+        before = baseline.get((entry['benchmark'], entry['shifts']))
+        if before:
+            sys.stdout.write(
+                f'{entry["benchmark"]:>22} {entry["shifts"]:>9} shifts: {entry["best"] / before:6.2f}x of baseline\n'
+            )
+
+
+def main(argv: Sequence[str] | None = None):
+    """Run the benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help='number of shifts of the tenants')
+    parser.add_argument('--years', type=int, default=1, help='years of shifts per employee')
+    parser.add_argument('--benchmarks', nargs='+', choices=BENCHMARKS, default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3, help='runs per benchmark, the best one counts')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', type=pathlib.Path, default=pathlib.Path('benchmark.json'))
+    parser.add_argument('--baseline', type=pathlib.Path, help='results of a previous run to compare with')
+    args = parser.parse_args(argv)
+
+    results = []
+    for size in args.sizes:
+        profile = synthetic.TenantProfile.for_shifts(size, years=args.years, seed=args.seed)
+        tenant = synthetic.generate_tenant(profile, shifts=size)
+        for name in args.benchmarks:
+            seconds = _measure(BENCHMARKS[name](tenant), args.repeat)
+            results.append(
+                {
+                    'benchmark': name,
+                    'shifts': len(tenant.shifts),
+                    'employees': profile.employees,
+                    'seconds': seconds,
+                    'best': min(seconds),
+                    'median': statistics.median(seconds),
+                }
+            )
+            sys.stdout.write(f'{name:>22} {len(tenant.shifts):>9} shifts: {min(seconds):10.4f}s\n')
+
+    args.output.write_text(
+        json.dumps(
+            {
+                'created_at': datetime.datetime.now(tz=datetime.UTC).isoformat(),
+                'revision': _revision(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'profile': {
+                    key: str(value) for key, value in dataclasses.asdict(profile).items() if key != 'employees'
+                },
+                'results': results,
+            },
+            indent=2,
+        )
+    )
+    if args.baseline is not None:
+        _compare(results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""Synthetic tenants with realistic attendance patterns."""
+
+import dataclasses
+import datetime
+import itertools
+import math
+import random
+from collections.abc import Iterator, Mapping, Sequence
+
+# workdays per year times the average number of shifts per workday with the default rates
+SHIFTS_PER_EMPLOYEE_AND_YEAR = 340
+TEAM_SIZE = 25
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SyntheticEmployee:
+    """Employee with the fields used by the verification page."""
+
+    id: int
+    full_name: str
+    active: bool = True
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SyntheticShift:
+    """Attendance shift with the fields used by the verification."""
+
+    id: int
+    employee_id: int
+    date: datetime.date
+    clock_in: datetime.time | None
+    clock_out: datetime.time | None
+    minutes: int
+    workable: bool = True
+
+
+@dataclasses.dataclass(frozen=True)
+class TenantProfile:
+    """Parameters of a synthetic tenant.
+
+    Rates are the probabilities per workday of an employee.
+    """
+
+    employees: int
+    years: int = 1
+    start: datetime.date = datetime.date(2024, 1, 1)
+    split_rate: float = 0.3  # working day split into several shifts
+    night_rate: float = 0.03  # shift across midnight, recorded as one shift per day
+    missing_clock_out_rate: float = 0.01
+    declared_break_rate: float = 0.05  # break recorded as a shift that is not workable
+    absence_rate: float = 0.08  # vacation and sick days
+    seed: int = 0
+
+    @classmethod
+    def for_shifts(cls, shifts: int, years: int = 1, seed: int = 0) -> 'TenantProfile':
+        """Get a profile with enough employees to generate about the given number of shifts."""
+        employees = max(1, math.ceil(shifts / (years * SHIFTS_PER_EMPLOYEE_AND_YEAR)))
+        return cls(employees=employees, years=years, seed=seed)
+
+
+@dataclasses.dataclass(frozen=True)
+class Tenant:
+    """Employees, their team names and their shifts."""
+
+    profile: TenantProfile
+    employees: Sequence[SyntheticEmployee]
+    team_names: Mapping[int, Sequence[str]]
+    shifts: Sequence[SyntheticShift]
+
+    @property
+    def end(self) -> datetime.date:
+        """Get the last day of the tenant's shifts."""
+        return self.profile.start + datetime.timedelta(days=365 * self.profile.years - 1)
+
+
+def _at(day: datetime.date, minute: int) -> datetime.datetime:
+    return datetime.datetime.combine(day, datetime.time()) + datetime.timedelta(minutes=minute)
+
+
+class _ShiftWriter:
+    """Turn working periods into shifts, splitting them at midnight like FactorialHR does."""
+
+    def __init__(self, profile: TenantProfile, rng: random.Random, employee_id: int, ids: Iterator[int]):
+        self._profile = profile
+        self._rng = rng
+        self._employee_id = employee_id
+        self._ids = ids
+
+    def period(
+        self, start: datetime.datetime, end: datetime.datetime, *, workable: bool = True
+    ) -> list[SyntheticShift]:
+        """Record the period from start to end."""
+        shifts = []
+        while start < end:
+            midnight = datetime.datetime.combine(start.date() + datetime.timedelta(days=1), datetime.time())
+            stop = min(end, midnight - datetime.timedelta(minutes=1))
+            clock_out: datetime.time | None = stop.time()
+            minutes = int((stop - start).total_seconds() // 60)
+            if self._rng.random() < self._profile.missing_clock_out_rate:
+                clock_out, minutes = None, 0
+            shifts.append(
+                SyntheticShift(
+                    id=next(self._ids),
+                    employee_id=self._employee_id,
+                    date=start.date(),
+                    clock_in=start.time(),
+                    clock_out=clock_out,
+                    minutes=minutes,
+                    workable=workable,
+                )
+            )
+            start = midnight if stop < end else end
+        return shifts
+
+
+def _workday(
+    writer: _ShiftWriter, profile: TenantProfile, rng: random.Random, day: datetime.date
+) -> list[SyntheticShift]:
+    """Generate the shifts of one working day."""
+    if rng.random() < profile.night_rate:
+        start = _at(day, rng.randrange(19 * 60, 22 * 60))
+        return writer.period(start, start + datetime.timedelta(minutes=rng.randrange(6 * 60, 10 * 60)))
+    start = _at(day, rng.randrange(6 * 60, 10 * 60))
+    work = rng.randrange(4 * 60, 11 * 60)
+    if rng.random() >= profile.split_rate:
+        return writer.period(start, start + datetime.timedelta(minutes=work))
+    shifts = []
+    parts = rng.choice((2, 2, 2, 3))
+    for part in range(parts):
+        end = start + datetime.timedelta(minutes=work // parts)
+        shifts.extend(writer.period(start, end))
+        if part == parts - 1:
+            break
+        pause = datetime.timedelta(minutes=rng.randrange(5, 75))
+        if rng.random() < profile.declared_break_rate:
+            shifts.extend(writer.period(end, end + pause, workable=False))
+        start = end + pause
+    return shifts
+
+
+def _employee_shifts(profile: TenantProfile, employee_id: int, ids: Iterator[int]) -> Iterator[SyntheticShift]:
+    rng = random.Random(f'{profile.seed}-{employee_id}')
+    writer = _ShiftWriter(profile, rng, employee_id, ids)
+    for offset in range(365 * profile.years):
+        day = profile.start + datetime.timedelta(days=offset)
+        if (day.weekday() >= 5 and rng.random() > 0.05) or rng.random() < profile.absence_rate:  # noqa: PLR2004
+            continue
+        yield from _workday(writer, profile, rng, day)
+
+
+def generate_tenant(profile: TenantProfile, shifts: int | None = None) -> Tenant:
+    """Generate a tenant.
+
+    :param profile: parameters of the tenant
+    :param shifts: stop after this number of shifts
+    """
+    ids = itertools.count(1)
+    employees = [
+        SyntheticEmployee(id=index + 1, full_name=f'Employee {index + 1}') for index in range(profile.employees)
+    ]
+    team_names = {employee.id: [f'Team {employee.id // TEAM_SIZE + 1}'] for employee in employees}
+    generated = itertools.chain.from_iterable(_employee_shifts(profile, employee.id, ids) for employee in employees)
+    return Tenant(
+        profile=profile,
+        employees=employees,
+        team_names=team_names,
+        shifts=list(itertools.islice(generated, shifts)),
+    )
@@ -73,6 +73,11 @@ def icon_menu() -> rx.Component:
                 )
             ),
             rx.menu.content(
+                rx.menu.item(
+                    'Reload all data',
+                    on_click=states.DataState.reload_all_data,
+                    disabled=states.DataState.is_loading,
+                ),
                 rx.menu.item(
                     rx.link(
                         rx.text('Log out'),
@@ -8,3 +8,43 @@ REDIRECT_URI: str = os.environ.get('FACTORIALHR_REDIRECT_URI', '')
 ENVIRONMENT_URL: str = os.environ.get('FACTORIALHR_ENVIRONMENT_URL', 'https://api.factorialhr.com')
 API_KEY: str = os.environ.get('FACTORIALHR_API_KEY', '')
 SCOPE = 'read'
+
+# verification runs in worker processes if more than one worker is configured
+VERIFICATION_WORKERS: int = int(os.environ.get('VERIFICATION_WORKERS', '1'))
+VERIFICATION_CHUNK_SIZE: int = int(os.environ.get('VERIFICATION_CHUNK_SIZE', '250'))
+# number of per employee verification results kept to answer repeated verifications of unchanged shifts
+VERIFICATION_CACHE_SIZE: int = int(os.environ.get('VERIFICATION_CACHE_SIZE', '10000'))
+# number of verifications of sessions kept in memory, the least recently used ones have to be verified again
+VERIFICATION_RESULTS_SIZE: int = int(os.environ.get('VERIFICATION_RESULTS_SIZE', '100'))
+# seconds in which an export has to be downloaded after it was requested
+EXPORT_TTL: int = int(os.environ.get('EXPORT_TTL', '60'))
+# shifts are synchronized incrementally after the first load, shifts dated up to this many days before the last sync are
+# downloaded again to pick up late changes
+SHIFT_SYNC_DAYS: int = int(os.environ.get('SHIFT_SYNC_DAYS', '62'))
+# all shifts are downloaded again once the last complete download is this many days old, to pick up changes of older
+# shifts and drop the deleted ones
+FULL_SYNC_DAYS: int = int(os.environ.get('FULL_SYNC_DAYS', '7'))
+# maximum number of pages of the shifts downloaded at the same time
+DOWNLOAD_CONCURRENCY: int = int(os.environ.get('DOWNLOAD_CONCURRENCY', '4'))
+# directory of the snapshots of the loaded data, which are restored before refreshing the data; empty disables them
+SNAPSHOT_DIRECTORY: str = os.environ.get('SNAPSHOT_DIRECTORY', '')
+# seconds for which the data of a company is shared by its sessions before it is loaded again
+TENANT_CACHE_TTL: int = int(os.environ.get('TENANT_CACHE_TTL', '300'))
+# shares the data of the companies between backend processes, the same redis as the one of reflex if configured
+REDIS_URL: str = os.environ.get('REFLEX_REDIS_URL', '')
+# connections to FactorialHR are pooled and kept alive between requests of all sessions, http2 requires httpx[http2]
+HTTP2: bool = os.environ.get('HTTP2', '').lower() in ('1', 'true', 'yes')
+HTTP_MAX_CONNECTIONS: int = int(os.environ.get('HTTP_MAX_CONNECTIONS', '100'))
+HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.environ.get('HTTP_MAX_KEEPALIVE_CONNECTIONS', '20'))
+HTTP_KEEPALIVE_EXPIRY: float = float(os.environ.get('HTTP_KEEPALIVE_EXPIRY', '60'))
+# seconds to wait for reading, writing or a connection of the pool, and for establishing a connection
+HTTP_TIMEOUT: float = float(os.environ.get('HTTP_TIMEOUT', '30'))
+HTTP_CONNECT_TIMEOUT: float = float(os.environ.get('HTTP_CONNECT_TIMEOUT', '10'))
+# requests per company sent to FactorialHR at the same time, further ones are queued
+API_CONCURRENCY: int = int(os.environ.get('API_CONCURRENCY', '8'))
+# retries of requests failing with a transient error, waiting up to the backoff doubled for every retry
+API_MAX_RETRIES: int = int(os.environ.get('API_MAX_RETRIES', '5'))
+API_BACKOFF: float = float(os.environ.get('API_BACKOFF', '0.5'))
+API_MAX_BACKOFF: float = float(os.environ.get('API_MAX_BACKOFF', '30'))
+# seconds a tenant waits at most for its rate limit to reset, whatever the server asks for
+API_MAX_WAIT: float = float(os.environ.get('API_MAX_WAIT', '300'))
@@ -0,0 +1,83 @@
+"""Concurrent download of paginated endpoints."""
+
+import dataclasses
+import math
+import typing
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+
+import anyio
+import factorialhr
+import httpx
+
+T = typing.TypeVar('T')
+
+
+class PaginatedEndpoint(typing.Protocol[T]):
+    """Endpoint whose get method returns a page together with the pagination metadata."""
+
+    async def get(self, **kwargs: typing.Any) -> factorialhr.MetaApiResponse[T]:
+        """Get a page."""
+        ...
+
+
+@dataclasses.dataclass
+class DownloadProgress:
+    """Records and bytes received so far."""
+
+    records: int = 0
+    total_records: int | None = None
+    bytes: int = 0
+
+    async def on_response(self, response: httpx.Response):
+        """Count the bytes of a response, to be registered as response event hook of the http client."""
+        await response.aread()
+        self.bytes += response.num_bytes_downloaded
+
+
+async def download_pages(
+    endpoint: PaginatedEndpoint[T],
+    on_page: Callable[[Iterable[T]], Awaitable[None]],
+    *,
+    concurrency: int,
+    params: Mapping[str, typing.Any] | None = None,
+    progress: DownloadProgress | None = None,
+    **kwargs: typing.Any,
+):
+    """Download all pages of an endpoint with at most the given number of requests at the same time.
+
+    Unlike ``Endpoint.all``, which requests every page at once and returns when all of them are received, each page is
+    handed to ``on_page`` as soon as it arrives, so it can be merged while the other pages are downloaded.
+
+    :param on_page: called with the records of every page in the order the pages arrive
+    :param concurrency: maximum number of pages requested at the same time
+    :param params: query parameters of every request
+    :param progress: updated with the number of records received and the total number of records
+    :param kwargs: passed on to the requests, e.g. a timeout
+    """
+    progress = progress if progress is not None else DownloadProgress()
+
+    async def fetch(page: int) -> factorialhr.MetaApiResponse[T]:
+        return await endpoint.get(params={**(params or {}), 'page': page}, **kwargs)
+
+    async def receive(response: factorialhr.MetaApiResponse[T]):
+        progress.records += len(response.raw_data)
+        await on_page(response.data())
+
+    first = await fetch(1)
+    meta = first.meta
+    progress.total_records = meta.total
+    await receive(first)
+    page_size = meta.limit or len(first.raw_data)
+    if not meta.has_next_page or not page_size:
+        return
+
+    limiter = anyio.CapacityLimiter(concurrency)
+
+    async def download(page: int):
+        async with limiter:
+            response = await fetch(page)
+        await receive(response)
+
+    async with anyio.create_task_group() as tg:
+        for page in range(2, math.ceil(meta.total / page_size) + 1):
+            tg.start_soon(download, page)
@@ -0,0 +1,265 @@
+"""Export of tables as CSV, XLSX or Parquet, written in chunks while the rows are produced, and pending exports."""
+
+import csv
+import datetime
+import enum
+import io
+import itertools
+import logging
+import time
+import zipfile
+from collections.abc import Iterable, Iterator, Sequence
+from xml.sax import saxutils
+
+import redis.asyncio
+import redis.exceptions
+
+BATCH_SIZE = 1000  # rows written before the written bytes are handed out
+REDIS_KEY_PREFIX = 'factorialhr_analysis:export'
+
+Cell = str | int | None
+Column = tuple[str, type[str] | type[int]]  # name and type of the cells
+
+
+class Format(enum.StrEnum):
+    """File format of an export."""
+
+    CSV = 'csv'
+    XLSX = 'xlsx'
+    PARQUET = 'parquet'
+
+    @property
+    def media_type(self) -> str:
+        """Get the media type of the format."""
+        return _MEDIA_TYPES[self]
+
+
+_MEDIA_TYPES = {
+    Format.CSV: 'text/csv; charset=utf-8',
+    Format.XLSX: 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    Format.PARQUET: 'application/vnd.apache.parquet',
+}
+
+
+class _Sink(io.RawIOBase):
+    """Write-only stream collecting the written bytes until they are taken."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # noqa: ANN001
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._position += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        """Get the bytes written since the last call."""
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _batches(rows: Iterable[Sequence[Cell]], size: int) -> Iterator[tuple[Sequence[Cell], ...]]:
+    iterator = iter(rows)
+    while batch := tuple(itertools.islice(iterator, size)):
+        yield batch
+
+
+def write_csv(
+    columns: Sequence[Column], rows: Iterable[Sequence[Cell]], batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Write the rows as CSV with a header row."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(name for name, _ in columns)
+    for batch in _batches(rows, batch_size):
+        writer.writerows(batch)
+        yield output.getvalue().encode()
+        output.seek(0)
+        output.truncate()
+    if output.tell():  # only the header row, there are no rows
+        yield output.getvalue().encode()
+
+
+def _column_name(index: int) -> str:
+    """Get the name of a spreadsheet column, e.g. ``AA`` for the 27th."""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(ord('A') + remainder) + name
+    return name
+
+
+def _xlsx_row(number: int, cells: Sequence[Cell], column_names: Sequence[str]) -> str:
+    xml_cells = []
+    for column_name, cell in zip(column_names, cells, strict=True):
+        if cell is None:
+            continue
+        reference = f'{column_name}{number}'
+        if isinstance(cell, int):
+            xml_cells.append(f'<c r="{reference}"><v>{cell}</v></c>')
+        else:
+            xml_cells.append(f'<c r="{reference}" t="inlineStr"><is><t>{saxutils.escape(cell)}</t></is></c>')
+    return f'<row r="{number}">{"".join(xml_cells)}</row>'
+
+
+_XLSX_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+def write_xlsx(
+    columns: Sequence[Column], rows: Iterable[Sequence[Cell]], batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Write the rows as a workbook with a single sheet and a header row.
+
+    The sheet is compressed into the zip file while the rows are written, the strings are stored inline, so nothing
+    but the current batch of rows is kept in memory.
+    """
+    sink = _Sink()
+    column_names = [_column_name(i) for i in range(len(columns))]
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_PARTS.items():
+            workbook.writestr(name, content)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(1, [name for name, _ in columns], column_names).encode())
+            number = 2
+            for batch in _batches(rows, batch_size):
+                for cells in batch:
+                    sheet.write(_xlsx_row(number, cells, column_names).encode())
+                    number += 1
+                yield sink.take()
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.take()
+
+
+def write_parquet(
+    columns: Sequence[Column], rows: Iterable[Sequence[Cell]], batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Write the rows as Parquet, one row group per batch. Requires ``pyarrow``, see the ``parquet`` extra."""
+    import pyarrow as pa  # noqa: PLC0415
+    import pyarrow.parquet as pq  # noqa: PLC0415
+
+    schema = pa.schema([(name, pa.int64() if kind is int else pa.string()) for name, kind in columns])
+    sink = _Sink()
+    with pq.ParquetWriter(sink, schema) as writer:
+        for batch in _batches(rows, batch_size):
+            writer.write_batch(pa.record_batch([list(column) for column in zip(*batch, strict=True)], schema=schema))
+            yield sink.take()
+    yield sink.take()
+
+
+def parquet_available() -> bool:
+    """Whether Parquet can be written, which requires the optional ``pyarrow``."""
+    try:
+        import pyarrow.parquet  # noqa: F401, PLC0415
+    except ImportError:
+        return False
+    return True
+
+
+def write(
+    file_format: Format, columns: Sequence[Column], rows: Iterable[Sequence[Cell]], batch_size: int = BATCH_SIZE
+) -> Iterator[bytes]:
+    """Write the rows in the format, handing out the written bytes after every batch of rows.
+
+    :param columns: names and types of the columns
+    :param rows: cells of each row, consumed while the file is written
+    :param batch_size: number of rows written before the written bytes are handed out
+    """
+    writers = {Format.CSV: write_csv, Format.XLSX: write_xlsx, Format.PARQUET: write_parquet}
+    return writers[file_format](columns, rows, batch_size)
+
+
+class PendingExports:
+    """Exports requested by sessions until they are downloaded, each can be taken once before it expires.
+
+    Without redis, or if redis fails, the exports are kept by the backend process, which then has to serve the download.
+    With redis, they are shared with the other backend processes as well.
+    """
+
+    def __init__(self, ttl: datetime.timedelta, *, redis_url: str = ''):
+        self._ttl = ttl
+        self._redis_url = redis_url
+        self._redis: redis.asyncio.Redis | None = None
+        self._entries: dict[str, tuple[float, bytes]] = {}  # expiry on the monotonic clock and payload by token
+
+    def _redis_client(self) -> redis.asyncio.Redis | None:
+        if self._redis is None and self._redis_url:
+            self._redis = redis.asyncio.Redis.from_url(self._redis_url)
+        return self._redis
+
+    async def put(self, token: str, payload: bytes):
+        """Keep the payload of an export until it is taken or expires."""
+        client = self._redis_client()
+        if client is not None:
+            try:
+                await client.set(f'{REDIS_KEY_PREFIX}:{token}', payload, px=self._ttl)
+            except redis.exceptions.RedisError:
+                logging.getLogger(__name__).exception('error storing export')
+            else:
+                return
+        now = time.monotonic()
+        self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+        self._entries[token] = (now + self._ttl.total_seconds(), payload)
+
+    async def take(self, token: str) -> bytes | None:
+        """Get and remove the payload of an export, none if it is unknown, was taken already or expired."""
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            expires_at, payload = entry
+            return payload if expires_at > time.monotonic() else None
+        client = self._redis_client()
+        if client is None:
+            return None
+        try:
+            return await client.getdel(f'{REDIS_KEY_PREFIX}:{token}')
+        except redis.exceptions.RedisError:
+            logging.getLogger(__name__).exception('error taking export')
+            return None
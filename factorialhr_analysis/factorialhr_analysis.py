@@ -3,8 +3,10 @@
 import logging
 
 import reflex as rx
+import starlette.applications
+import starlette.routing
 
-from factorialhr_analysis import pages, routes
+from factorialhr_analysis import http_clients, pages, routes
 
 logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s', level=logging.INFO)
 
@@ -21,7 +23,11 @@ def frontend_exception_handler(exc: Exception) -> None:
     logger.exception('Frontend exception', exc_info=exc)
 
 
-app = rx.App()
+api = starlette.applications.Starlette(
+    routes=[starlette.routing.Route(f'{routes.EXPORT_ROUTE}/{{token}}', pages.export_errors)]
+)
+app = rx.App(api_transformer=api)
+app.register_lifespan_task(http_clients.lifespan)
 # app.backend_exception_handler = backend_exception_handler  # noqa: ERA001
 # app.frontend_exception_handler = frontend_exception_handler  # noqa: ERA001
 
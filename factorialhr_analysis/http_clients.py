@@ -0,0 +1,104 @@
+"""HTTP clients sharing a process-wide pool of connections and request scheduler."""
+
+import contextlib
+import typing
+from collections.abc import AsyncIterator
+
+import factorialhr
+import httpx
+
+from factorialhr_analysis import constants, scheduler
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Transport handing the requests to a pooled transport, which stays open when the client is closed."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request over a connection of the pool."""
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        """Keep the pool open for the other clients."""
+
+
+_pool: httpx.AsyncHTTPTransport | None = None
+_scheduler = scheduler.RequestScheduler(
+    concurrency=constants.API_CONCURRENCY,
+    max_retries=constants.API_MAX_RETRIES,
+    backoff=constants.API_BACKOFF,
+    max_backoff=constants.API_MAX_BACKOFF,
+    max_wait=constants.API_MAX_WAIT,
+)
+
+
+def _create_pool() -> httpx.AsyncHTTPTransport:
+    return httpx.AsyncHTTPTransport(
+        http2=constants.HTTP2,
+        limits=httpx.Limits(
+            max_connections=constants.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=constants.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=constants.HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def transport(tenant: str = '') -> scheduler.ScheduledTransport:
+    """Get a transport scheduling the requests of the tenant, sent over the pool which is created on first use.
+
+    :param tenant: key of the tenant whose rate limit the requests count towards
+    """
+    global _pool  # noqa: PLW0603
+    if _pool is None:
+        _pool = _create_pool()
+    return scheduler.ScheduledTransport(SharedTransport(_pool), _scheduler, tenant)
+
+
+def timeout() -> httpx.Timeout:
+    """Get the configured timeouts."""
+    return httpx.Timeout(constants.HTTP_TIMEOUT, connect=constants.HTTP_CONNECT_TIMEOUT)
+
+
+def client(**kwargs: typing.Any) -> httpx.AsyncClient:
+    """Create a client sending its requests over the pooled connections.
+
+    Creating and closing the client is cheap, the connections and their TLS sessions are kept alive by the pool.
+
+    :param kwargs: passed on to the client
+    """
+    return httpx.AsyncClient(transport=transport(), timeout=timeout(), **kwargs)
+
+
+def api_client(auth: httpx.Auth, *, tenant: str = '', **kwargs: typing.Any) -> factorialhr.ApiClient:
+    """Create a client of the FactorialHR API sending its requests over the pooled connections.
+
+    :param auth: authentication of the session
+    :param tenant: key of the tenant whose rate limit the requests count towards, e.g. the company id
+    :param kwargs: passed on to the underlying http client, e.g. event hooks
+    """
+    return factorialhr.ApiClient(
+        constants.ENVIRONMENT_URL,  # pyright: ignore[reportArgumentType]
+        auth=auth,
+        transport=transport(tenant),
+        timeout=timeout(),
+        **kwargs,
+    )
+
+
+async def close():
+    """Close the pooled connections."""
+    global _pool
+    if _pool is not None:
+        pool, _pool = _pool, None
+        await pool.aclose()
+
+
+@contextlib.asynccontextmanager
+async def lifespan() -> AsyncIterator[None]:
+    """Close the pooled connections when the app shuts down, to be registered as lifespan task."""
+    try:
+        yield
+    finally:
+        await close()
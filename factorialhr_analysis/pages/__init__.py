@@ -1,5 +1,11 @@
 from factorialhr_analysis.pages.index_page import index_page
 from factorialhr_analysis.pages.oauth_page import authorize_oauth_page, start_oauth_process
-from factorialhr_analysis.pages.working_time_verification_page import working_time_verification_page
+from factorialhr_analysis.pages.working_time_verification_page import export_errors, working_time_verification_page
 
-__all__ = ['authorize_oauth_page', 'index_page', 'start_oauth_process', 'working_time_verification_page']
+__all__ = [
+    'authorize_oauth_page',
+    'export_errors',
+    'index_page',
+    'start_oauth_process',
+    'working_time_verification_page',
+]
@@ -37,6 +37,23 @@ def index_page() -> rx.Component:
             padding='0.5em',
         ),
         rx.text('loaded shifts:', states.DataState.len_of_shifts),
+        rx.cond(
+            states.DataState.is_loading,
+            rx.vstack(
+                rx.progress(value=states.DataState.downloaded_shifts, max=states.DataState.total_shifts),
+                rx.text(
+                    'downloaded shifts: ',
+                    states.DataState.downloaded_shifts,
+                    ' of ',
+                    states.DataState.total_shifts,
+                    ' (',
+                    states.DataState.downloaded_megabytes,
+                    ')',
+                ),
+                align='center',
+                width='100%',
+            ),
+        ),
         bg=rx.color('accent'),
         align='center',
     )
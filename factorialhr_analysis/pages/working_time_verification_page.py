@@ -1,18 +1,40 @@
 """The main page of the app."""
 
-import csv
+import collections
+import dataclasses
 import datetime
-import io
+import hashlib
+import hmac
+import json
 import logging
+import math
+import os
+import secrets
+import time
 import typing
-from collections.abc import Container, Iterable, Sequence
+import uuid
+from collections.abc import Awaitable, Callable, Iterable, Iterator, Sequence
 
-import anyio.from_thread
+import anyio.to_thread
 import factorialhr
 import reflex as rx
+import starlette.requests
+import starlette.responses
 from reflex.utils.prerequisites import get_app
 
-from factorialhr_analysis import components, states, templates, working_time_verification
+from factorialhr_analysis import (
+    components,
+    constants,
+    export,
+    routes,
+    search,
+    states,
+    templates,
+    working_time_verification,
+)
+
+# results of previous verifications, shared by all sessions of this backend process
+_error_cache = working_time_verification.ErrorCache(maxsize=constants.VERIFICATION_CACHE_SIZE)
 
 
 class SettingsState(rx.State):
@@ -23,6 +45,10 @@ class SettingsState(rx.State):
     _tolerance: datetime.timedelta | None = None
 
     only_active: rx.Field[bool] = rx.field(default=True)
+    consolidate_errors: rx.Field[bool] = rx.field(default=True)
+    filter_in_browser: rx.Field[bool] = rx.field(default=False)
+    export_format: rx.Field[str] = rx.field(default=export.Format.CSV.value)
+    export_attendances: rx.Field[bool] = rx.field(default=False)
 
     @rx.var
     def start_date(self) -> str:
@@ -73,6 +99,26 @@ class SettingsState(rx.State):
         """Set whether to only include active employees."""
         self.only_active = active
 
+    @rx.event
+    def set_consolidate_errors(self, consolidate: bool):  # noqa: FBT001
+        """Set whether to only report the last error of a break rule within a rest window."""
+        self.consolidate_errors = consolidate
+
+    @rx.event
+    def set_filter_in_browser(self, in_browser: bool):  # noqa: FBT001
+        """Set whether all errors are sent to the browser to filter, sort and select them there."""
+        self.filter_in_browser = in_browser
+
+    @rx.event
+    def set_export_format(self, file_format: str):
+        """Set the file format of the exports."""
+        self.export_format = export.Format(file_format).value
+
+    @rx.event
+    def set_export_attendances(self, with_attendances: bool):  # noqa: FBT001
+        """Set whether the exports contain a row per attendance of an error."""
+        self.export_attendances = with_attendances
+
 
 def time_to_moment(time_: datetime.time | None) -> rx.MomentDelta:
     """Convert a datetime.time to a rx.MomentDelta.
@@ -101,6 +147,7 @@ class Attendance(typing.TypedDict):
 class ErrorToShow(typing.TypedDict):
     """TypedDict for errors to show."""
 
+    id: int  # position of the error in the calculated errors
     name: str
     team_names: Iterable[str]
     affected_days: str
@@ -108,30 +155,296 @@ class ErrorToShow(typing.TypedDict):
     cumulated_break: datetime.timedelta
     cumulated_attendance: datetime.timedelta
 
-    attendances: Sequence[Attendance]
 
+class CompactErrors(typing.TypedDict):
+    """Errors in columns with interned strings, compact enough to send all of them to the browser at once."""
 
-def _filter_error(filter_value: str, error: ErrorToShow) -> bool:
-    """Filter error based on name or team names.
+    names: list[str]
+    teams: list[str]
+    reasons: list[str]
+    # one entry per error, the position is the id of the error
+    name: list[int]  # position in names
+    team_ids: list[list[int]]  # positions in teams
+    reason: list[int]  # position in reasons
+    affected_days: list[str]
+    break_minutes: list[int]
+    attendance_minutes: list[int]
 
-    Args:
-        filter_value: The filter string to search for.
-        error: The error to check against the filter.
 
-    Returns:
-        True if the error matches the filter, False otherwise.
+class ClientRow(typing.TypedDict):
+    """Error filtered and sorted in the browser."""
 
-    """
-    return filter_value in error['name'].lower() or any(
-        filter_value in team_name.lower() for team_name in error['team_names']
+    id: int
+    name: str
+    affected_days: str
+    cumulated_break: str
+    cumulated_attendance: str
+    error: str
+
+
+class PeriodHours(typing.TypedDict):
+    """TypedDict for the hours attended per period."""
+
+    name: str
+    hours: list[str]  # one entry per period
+    total: str
+    cumulated_break: str
+
+
+def _format_hours(delta: datetime.timedelta) -> str:
+    minutes = int(delta.total_seconds() // 60)
+    return f'{minutes // 60}:{minutes % 60:02}'
+
+
+def _to_period_hours(totals: working_time_verification.pipeline.PeriodTotals) -> PeriodHours:
+    """Convert the totals of an employee or a group to a row of the hours per period."""
+    return PeriodHours(
+        name=totals.name,
+        hours=[_format_hours(hours) for hours in totals.hours],
+        total=_format_hours(totals.total),
+        cumulated_break=_format_hours(totals.break_time),
     )
 
 
+def _to_error_to_show(
+    error_id: int, employee: factorialhr.Employee, team_names: Sequence[str], error: working_time_verification.Error
+) -> ErrorToShow:
+    """Convert an error of an employee to an error to show."""
+    return ErrorToShow(
+        id=error_id,
+        name=employee.full_name,
+        team_names=team_names,
+        affected_days=', '.join(str(d) for d in error.days_affected),
+        error=error.reason,
+        cumulated_break=error.break_time,
+        cumulated_attendance=error.time_attended,
+    )
+
+
+def _to_compact_errors(errors: Sequence[ErrorToShow]) -> CompactErrors:
+    """Convert the errors to show to columns, the errors have to be ordered by their id."""
+    names: dict[str, int] = {}
+    teams: dict[str, int] = {}
+    reasons: dict[str, int] = {}
+    compact = CompactErrors(
+        names=[],
+        teams=[],
+        reasons=[],
+        name=[names.setdefault(error['name'], len(names)) for error in errors],
+        team_ids=[[teams.setdefault(team, len(teams)) for team in error['team_names']] for error in errors],
+        reason=[reasons.setdefault(error['error'], len(reasons)) for error in errors],
+        affected_days=[error['affected_days'] for error in errors],
+        break_minutes=[int(error['cumulated_break'].total_seconds() // 60) for error in errors],
+        attendance_minutes=[int(error['cumulated_attendance'].total_seconds() // 60) for error in errors],
+    )
+    compact['names'], compact['teams'], compact['reasons'] = list(names), list(teams), list(reasons)
+    return compact
+
+
+def _to_attendance(attendance: working_time_verification.ShiftRecord) -> Attendance:
+    """Convert an attendance of an error to an attendance to show."""
+    return Attendance(
+        date=attendance.date,
+        clock_in=time_to_moment(attendance.clock_in) if attendance.clock_in is not None else None,
+        clock_out=time_to_moment(attendance.clock_out) if attendance.clock_out is not None else None,
+        minutes=rx.MomentDelta(minutes=attendance.minutes),
+    )
+
+
+EXPORT_COLUMNS: list[export.Column] = [
+    ('Name', str),
+    ('Affected Days', str),
+    ('Cumulated Break', str),
+    ('Cumulated Attendance', str),
+    ('Error', str),
+]
+EXPORT_ATTENDANCE_COLUMNS: list[export.Column] = [
+    ('Date', str),
+    ('Clock In', str),
+    ('Clock Out', str),
+    ('Minutes', int),
+]
+
+
+def _export_rows(
+    errors: Sequence[working_time_verification.Error],
+    errors_to_show: Sequence[ErrorToShow],
+    error_ids: Iterable[int],
+    *,
+    with_attendances: bool,
+) -> Iterator[list[export.Cell]]:
+    """Get the export rows of the errors, one per error or one per attendance of an error. They are created lazily."""
+    for error_id in error_ids:
+        error = errors_to_show[error_id]
+        cells: list[export.Cell] = [
+            error['name'],
+            error['affected_days'],
+            str(error['cumulated_break']),
+            str(error['cumulated_attendance']),
+            error['error'],
+        ]
+        if not with_attendances:
+            yield cells
+            continue
+        for attendance in errors[error_id].attendances:
+            yield [
+                *cells,
+                attendance.date.isoformat(),
+                attendance.clock_in.isoformat('minutes') if attendance.clock_in is not None else None,
+                attendance.clock_out.isoformat('minutes') if attendance.clock_out is not None else None,
+                attendance.minutes,
+            ]
+
+
+def _session_digest(export_session: str) -> str:
+    return hashlib.sha256(export_session.encode()).hexdigest()
+
+
+@dataclasses.dataclass(frozen=True)
+class ExportRequest:
+    """Export requested by a session, served once by :func:`export_errors` of the process with the verification."""
+
+    verification_key: str  # key of the verification in the verification store
+    error_ids: list[int]  # ascending
+    file_format: export.Format
+    with_attendances: bool
+    file_name: str
+    session_digest: str  # digest of the export session cookie of the session which requested the export
+
+    def dumps(self) -> bytes:
+        """Serialize the export request."""
+        return json.dumps(dataclasses.asdict(self)).encode()
+
+    @classmethod
+    def loads(cls, payload: bytes) -> typing.Self:
+        """Deserialize an export request."""
+        data = json.loads(payload)
+        return cls(**{**data, 'file_format': export.Format(data['file_format'])})
+
+
+@dataclasses.dataclass
+class Verification:
+    """Errors found by a verification of a session."""
+
+    errors: list[working_time_verification.Error] = dataclasses.field(default_factory=list)
+    errors_to_show: list[ErrorToShow] = dataclasses.field(default_factory=list)  # one per error
+    shown_ids: list[int] = dataclasses.field(default_factory=list)  # ids of the errors matching the filter
+    index: search.SearchIndex = dataclasses.field(default_factory=lambda: search.SearchIndex([]))
+    period_hours: list[PeriodHours] = dataclasses.field(default_factory=list)  # rows of the hours per period
+
+    def add_errors(
+        self,
+        employee: factorialhr.Employee,
+        team_names: Sequence[str],
+        errors: Iterable[working_time_verification.Error],
+    ):
+        """Add errors of an employee."""
+        for error in errors:
+            self.errors_to_show.append(_to_error_to_show(len(self.errors), employee, team_names, error))
+            self.errors.append(error)
+
+    def build_index(self):
+        """Index the names and team names of the errors to filter them."""
+        self.index = search.SearchIndex([error['name'], *error['team_names']] for error in self.errors_to_show)
+
+    def apply_filter(self, filter_value: str):
+        """Show the errors whose name or team names contain the filter value, all of them if it is empty."""
+        self.shown_ids = self.index.search(filter_value)
+
+
+class VerificationStore:
+    """Least recently used verifications of the sessions, kept out of the state which is serialized on every event.
+
+    The verifications are kept by the backend process which made them. Sessions served by another process, e.g. after a
+    restart or by another worker with redis, do not find their verification and have to verify again.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[str, Verification] = collections.OrderedDict()
+
+    def get(self, key: str) -> Verification | None:
+        """Get the verification, none if it is unknown or was evicted."""
+        verification = self._entries.get(key)
+        if verification is not None:
+            self._entries.move_to_end(key)
+        return verification
+
+    def create(self, previous_key: str) -> tuple[str, Verification]:
+        """Create a verification replacing the previous one and evict the least recently used ones if full."""
+        self._entries.pop(previous_key, None)
+        key = uuid.uuid4().hex
+        verification = self._entries[key] = Verification()
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return key, verification
+
+
+_verifications = VerificationStore(maxsize=constants.VERIFICATION_RESULTS_SIZE)
+# exports requested by the sessions until they are downloaded, from any backend process if redis is configured
+_pending_exports = export.PendingExports(
+    datetime.timedelta(seconds=constants.EXPORT_TTL), redis_url=constants.REDIS_URL
+)
+
+PAGE_SIZES = ['25', '50', '100', '250']
+PROGRESS_INTERVAL = 0.25  # seconds between two updates of the verification progress
+SEARCH_DEBOUNCE = 300  # milliseconds without typing after which the errors are filtered
+EXPORT_FORMATS = [
+    file_format.value
+    for file_format in export.Format
+    if file_format is not export.Format.PARQUET or export.parquet_available()
+]
+PERIOD_PAGE_SIZE = 50  # rows of the hours per period sent to the browser at once
+CLIENT_ROWS = 200  # errors rendered at first when they are filtered in the browser, more are shown on request
+EXPORT_SESSION_COOKIE = 'export_session'  # secret of the session, only the session can download its exports
+
+
+class BatchedProgress:
+    """Counts processed employees and reports them in batches, so not every employee causes a state update."""
+
+    def __init__(self, report: Callable[[int], Awaitable[None]], *, interval: float, size: int):
+        """Create the progress.
+
+        :param report: called with the number of employees processed since the last report
+        :param interval: seconds after which processed employees are reported
+        :param size: number of processed employees which are reported regardless of the interval
+        """
+        self._report = report
+        self._interval = interval
+        self._size = size
+        self._pending = 0
+        self._last_report = time.monotonic()
+
+    async def add(self, amount: int):
+        """Count processed employees and report them if the time or size budget is exceeded."""
+        self._pending += amount
+        if self._pending >= self._size or time.monotonic() - self._last_report >= self._interval:
+            await self.flush()
+
+    async def flush(self):
+        """Report the processed employees not reported yet."""
+        self._last_report = time.monotonic()
+        if self._pending:
+            amount, self._pending = self._pending, 0
+            await self._report(amount)
+
+
 class DataStateDeprecated(rx.State):
     """State holding all the data for working time verification."""
 
+    # only the errors of the shown page are sent to the browser, the others are kept in the verification store
     errors_to_show: rx.Field[list[ErrorToShow]] = rx.field(default_factory=list)
-    _calculated_errors: list[ErrorToShow] = []  # noqa: RUF012
+    page_index: rx.Field[int] = rx.field(0)
+    page_size: rx.Field[int] = rx.field(50)
+    total_count: rx.Field[int] = rx.field(0)  # number of errors matching the filter
+    # whether all errors are filtered, sorted and selected in the browser instead of paged on the server, they are sent
+    # to the browser by send_errors_to_browser instead of being part of the state
+    errors_in_browser: rx.Field[bool] = rx.field(default=False)
+    _verification_key: str = ''  # key of the verification of the session in the verification store
+    # whether the verification of the session is not available in this backend process and has to be made again
+    verification_lost: rx.Field[bool] = rx.field(default=False)
+    # attendances of the error whose records are shown, only materialized when requested
+    shown_attendances: rx.Field[list[Attendance]] = rx.field(default_factory=list)
     is_loading: rx.Field[bool] = rx.field(default=False)
     processed_employees: rx.Field[int] = rx.field(0)  # Number of employees processed so far
     total_amount_of_employees: rx.Field[int] = rx.field(0)
@@ -140,46 +453,110 @@ class DataStateDeprecated(rx.State):
 
     selected_error_ids: rx.Field[list[int]] = rx.field(default_factory=list)
 
+    period_names: rx.Field[list[str]] = rx.field(default_factory=list)
+    # only a page of the hours per period is sent to the browser, all rows are kept in the verification store
+    period_hours: rx.Field[list[PeriodHours]] = rx.field(default_factory=list)
+    period_page_index: rx.Field[int] = rx.field(0)
+    period_page_count: rx.Field[int] = rx.field(1)
+
+    export_session: str = rx.Cookie(
+        name=EXPORT_SESSION_COOKIE,
+        same_site='strict',
+        secure=os.environ.get('REFLEX_ENV_MODE') == rx.constants.Env.PROD.value,
+    )
+
+    @rx.var
+    def page_count(self) -> int:
+        """Get the number of pages, at least one."""
+        return max(1, math.ceil(self.total_count / self.page_size))
+
+    def _verification(self) -> Verification:
+        """Get the verification of the session, an empty one if there is none.
+
+        If the verification is not available in this backend process, the shown results are cleared and the session is
+        asked to verify again.
+        """
+        verification = _verifications.get(self._verification_key)
+        if verification is not None:
+            return verification
+        if self._verification_key:
+            self._lose_verification()
+        return Verification()
+
+    def _lose_verification(self) -> list[rx.event.EventSpec]:
+        """Clear the results and ask the session to verify again, e.g. if the browser refers to unknown errors.
+
+        Returns:
+            The events clearing the errors and the selection kept in the browser.
+
+        """
+        self._clear_results()
+        self._verification_key = ''
+        self.verification_lost = True
+        return [client_errors.push(rx.Var('null')), client_selection.push(rx.Var('[]'))]
+
+    def _show_page(self, page_index: int):
+        """Show the errors of a page of the errors matching the filter."""
+        verification = self._verification()
+        self.total_count = len(verification.shown_ids)
+        self.page_index = min(max(page_index, 0), self.page_count - 1)
+        first = self.page_index * self.page_size
+        self.errors_to_show = [
+            verification.errors_to_show[error_id] for error_id in verification.shown_ids[first : first + self.page_size]
+        ]
+
+    def _show_period_page(self, page_index: int):
+        """Show a page of the rows of the hours per period."""
+        rows = self._verification().period_hours
+        self.period_page_count = max(1, math.ceil(len(rows) / PERIOD_PAGE_SIZE))
+        self.period_page_index = min(max(page_index, 0), self.period_page_count - 1)
+        first = self.period_page_index * PERIOD_PAGE_SIZE
+        self.period_hours = rows[first : first + PERIOD_PAGE_SIZE]
+
+    @rx.event
+    def show_period_page(self, page_index: int):
+        """Show a page of the hours per period, the first or last one if there is no such page."""
+        self._show_period_page(page_index)
+
+    @rx.event
+    def show_page(self, page_index: int):
+        """Show a page of the errors, the first or last one if there is no such page."""
+        self._show_page(page_index)
+
+    @rx.event
+    def set_page_size(self, page_size: str):
+        """Set the number of errors per page, keeping the first error of the shown page visible."""
+        first = self.page_index * self.page_size
+        self.page_size = int(page_size)
+        self._show_page(first // self.page_size)
+
     def _should_cancel(self) -> bool:
         """Check if the current session is still valid."""
         return self.router.session.client_token not in get_app().app.event_namespace.token_to_sid
 
-    async def _handle_single_employee(
-        self,
-        employee: factorialhr.Employee,
-        teams: Sequence[factorialhr.Team],
-        shifts: Sequence[factorialhr.AttendanceShift],
-        tolerance: datetime.timedelta | None,
-    ):
-        """Handle a single employee."""
-        for error in working_time_verification.get_error(
-            filter(lambda x: x.employee_id == employee.id, shifts), tolerance=tolerance
-        ):
-            async with self:
-                error_to_show = ErrorToShow(
-                    name=employee.full_name,
-                    team_names=[
-                        team.name
-                        for team in teams
-                        if team.employee_ids is not None and employee.id in team.employee_ids
-                    ],
-                    affected_days=', '.join(str(d) for d in error.days_affected),
-                    error=error.reason,
-                    cumulated_break=error.break_time,
-                    cumulated_attendance=error.time_attended,
-                    attendances=[
-                        Attendance(
-                            date=a.date,
-                            clock_in=time_to_moment(a.clock_in) if a.clock_in is not None else None,
-                            clock_out=time_to_moment(a.clock_out) if a.clock_out is not None else None,
-                            minutes=rx.MomentDelta(minutes=a.minutes),
-                        )
-                        for a in error.attendances
-                    ],
-                )
-                self._calculated_errors.append(error_to_show)
+    async def _add_processed(self, amount: int):
         async with self:
-            self.processed_employees += 1
+            self.processed_employees += amount
+
+    def _clear_results(self):
+        """Clear the shown results of the verification."""
+        self.selected_error_ids.clear()
+        self.errors_to_show.clear()
+        self.total_count = 0
+        self.page_index = 0
+        self.period_hours.clear()
+        self.period_page_index = 0
+        self.period_page_count = 1
+        self.shown_attendances.clear()
+        self.processed_employees = 0
+        self.errors_in_browser = False
+
+    def _reset_verification(self) -> Verification:
+        """Replace the verification by an empty one. Requires the state to be locked."""
+        self._clear_results()
+        self.verification_lost = False
+        self._verification_key, verification = _verifications.create(self._verification_key)
+        return verification
 
     @rx.event(background=True)
     async def calculate_errors(self):
@@ -188,10 +565,7 @@ class DataStateDeprecated(rx.State):
             if self.is_loading:
                 return
             self.is_loading = True
-            self.selected_error_ids.clear()
-            self.errors_to_show.clear()
-            self._calculated_errors.clear()
-            self.processed_employees = 0
+            verification = self._reset_verification()
 
             # Get states once and store references
             data_state = await self.get_state(states.DataState)
@@ -199,120 +573,243 @@ class DataStateDeprecated(rx.State):
 
         if settings_state._start_date is None or settings_state._end_date is None:  # noqa: SLF001
             return
+        shared_data = await data_state._get_data()  # noqa: SLF001
 
-        # Filter employees and shifts outside of async context for better performance
+        # Filter employees outside of async context for better performance
         employees = [
-            employee
-            for employee in data_state._employees.values()  # noqa: SLF001
-            if not settings_state.only_active or employee.active
-        ]
-
-        shifts = [
-            shift
-            for shift in data_state._shifts.values()  # noqa: SLF001
-            if settings_state._start_date <= shift.date <= settings_state._end_date  # noqa: SLF001
+            employee for employee in shared_data.employees.values() if not settings_state.only_active or employee.active
         ]
 
         # Update total count
         async with self:
             self.total_amount_of_employees = len(employees)
 
-        # Process employees concurrently with proper error handling
+        start, end = settings_state._start_date, settings_state._end_date  # noqa: SLF001
+        employees_by_id = {employee.id: employee for employee in employees}
+        team_names = shared_data.team_names_by_employee
+        # the progress is reported in batches, each report is a state update sent to the browser
+        progress = BatchedProgress(self._add_processed, interval=PROGRESS_INTERVAL, size=max(1, len(employees) // 100))
+
+        async def add_errors(result: working_time_verification.parallel.ChunkResult):
+            for employee_id, errors in result:
+                verification.add_errors(employees_by_id[employee_id], team_names.get(employee_id, []), errors)
+            await progress.add(len(result))
+
         try:
-            async with anyio.from_thread.create_task_group() as tg:
-                for employee in employees:
-                    tg.start_soon(
-                        self._handle_single_employee,
-                        employee,
-                        data_state._teams.values(),  # noqa: SLF001
-                        shifts,
-                        settings_state._tolerance,  # noqa: SLF001
-                    )
-        except ExceptionGroup as e:
+            names, totals = await working_time_verification.pipeline.verify_company(
+                shared_data.shifts,
+                employees,
+                team_names,
+                start,
+                end,
+                settings_state._tolerance,  # noqa: SLF001
+                add_errors,
+                error_cache=_error_cache,
+                consolidate=settings_state.consolidate_errors,
+                workers=constants.VERIFICATION_WORKERS,
+                chunk_size=constants.VERIFICATION_CHUNK_SIZE,
+            )
+        except Exception:
             # Log error and reset loading state
-            logging.getLogger(__name__).exception('error calculating errors', exc_info=e)
+            logging.getLogger(__name__).exception('error calculating errors')
             async with self:
                 self.is_loading = False
             return
+        await progress.flush()
+        verification.period_hours = [_to_period_hours(row) for row in totals]
+        await anyio.to_thread.run_sync(verification.build_index)
 
         # Apply filtering
         async with self:
-            if not self.filter_value:
-                self.errors_to_show = self._calculated_errors[:]
-            else:
-                self.errors_to_show = [
-                    error for error in self._calculated_errors if _filter_error(self.filter_value.lower(), error)
-                ]
+            self.period_names = names
+            self._show_period_page(0)
+            verification.apply_filter(self.filter_value)
+            self._show_page(0)
+            self.errors_in_browser = settings_state.filter_in_browser
             self.is_loading = False
 
+    @rx.event
+    def send_errors_to_browser(self) -> rx.event.EventSpec | None:
+        """Send all errors to the browser to filter, sort and select them there."""
+        verification = self._verification()
+        if self.errors_in_browser:
+            # sent as a script instead of a state update, so they are neither stored nor serialized with the state
+            return client_errors.push(rx.Var(json.dumps(_to_compact_errors(verification.errors_to_show))))
+        return None
+
     @rx.event
     def set_filter_value(self, value: str):
         """Filter employees based on the search value."""
         self.filter_value = value
-        self.errors_to_show.clear()
-        if not value:
-            self.errors_to_show = self._calculated_errors[:]
-            return
-        for error in self._calculated_errors:
-            if _filter_error(value.lower(), error):
-                self.errors_to_show.append(error)
-            yield
+        self._verification().apply_filter(value)
+        self._show_page(0)
+
+    @rx.event
+    def show_attendances(self, error_id: int) -> list[rx.event.EventSpec] | None:
+        """Show the attendances of an error, ask to verify again if the error is unknown."""
+        if self._selection([error_id]) is None:
+            return self._lose_verification()
+        self.shown_attendances = [
+            _to_attendance(attendance)  # pyright: ignore[reportArgumentType]
+            for attendance in self._verification().errors[error_id].attendances
+        ]
+        return None
 
     @rx.event
-    def select_row(self, index: int):
+    def select_row(self, error_id: int):
         """Handle row selection."""
-        if index in self.selected_error_ids:
-            self.selected_error_ids.remove(index)
+        if error_id in self.selected_error_ids:
+            self.selected_error_ids.remove(error_id)
         else:
-            self.selected_error_ids.append(index)
+            self.selected_error_ids.append(error_id)
 
-    def _convert_to_csv(self, indices: Container[int]) -> str:
-        # Create a string buffer to hold the CSV data
-        with io.StringIO() as output:
-            writer = csv.DictWriter(
-                output, fieldnames=['Name', 'Affected Days', 'Cumulated Break', 'Cumulated Attendance', 'Error']
-            )
-            writer.writeheader()
-            for index, error in enumerate(self.errors_to_show):
-                if index in indices:
-                    writer.writerow(
-                        {
-                            'Name': error['name'],
-                            'Affected Days': error['affected_days'],
-                            'Cumulated Break': error['cumulated_break'],
-                            'Cumulated Attendance': error['cumulated_attendance'],
-                            'Error': error['error'],
-                        }
-                    )
-
-            # Get the CSV data as a string
-            return output.getvalue()
-
-    async def _file_name(self) -> str:
+    async def _export(self, error_ids: Sequence[int]) -> rx.event.EventSpec:
+        """Request an export of the errors and download it from the export endpoint."""
         settings_state = await self.get_state(SettingsState)
-        return (
-            f'{settings_state.start_date}-{settings_state.end_date}_errors.csv'
+        file_format = export.Format(settings_state.export_format)
+        file_name = (
+            f'{settings_state.start_date}-{settings_state.end_date}_errors.{file_format}'
             if settings_state.start_date and settings_state.end_date
-            else 'errors.csv'
+            else f'errors.{file_format}'
         )
+        if not self.export_session:
+            self.export_session = secrets.token_urlsafe()
+        export_request = ExportRequest(
+            verification_key=self._verification_key,
+            error_ids=list(error_ids),
+            file_format=file_format,
+            with_attendances=settings_state.export_attendances,
+            file_name=file_name,
+            session_digest=_session_digest(self.export_session),
+        )
+        token = secrets.token_urlsafe()
+        await _pending_exports.put(token, export_request.dumps())
+        url = f'{rx.config.get_config().api_url}{routes.EXPORT_ROUTE}/{token}'
+        # a var since the url of the backend is absolute, the response is an attachment so the page is not left
+        return rx.download(url=rx.Var.create(url), filename=file_name)
+
+    async def _export_selection(self, error_ids: Iterable[int]) -> rx.event.EventSpec | list[rx.event.EventSpec]:
+        """Export the errors, ask to verify again instead if any of them is unknown."""
+        selection = self._selection(error_ids)
+        if selection is None:
+            return self._lose_verification()
+        return await self._export(selection)
 
     @rx.event
     async def download_all_errors(self):
-        """Download all errors as a CSV file."""
-        csv_data = self._convert_to_csv(range(len(self.errors_to_show)))
-        yield rx.download(
-            data=csv_data,
-            filename=await self._file_name(),
-        )
+        """Download the errors matching the filter."""
+        yield await self._export_selection(self._verification().shown_ids)
+
+    @rx.event
+    async def download_filtered_errors(self, query: str):
+        """Download the errors matching the filter of the browser."""
+        yield await self._export_selection(self._verification().index.search(query))
 
     @rx.event
     async def download_selected_errors(self):
-        """Download selected errors as a CSV file."""
-        csv_data = self._convert_to_csv(self.selected_error_ids)
-        yield rx.download(
-            data=csv_data,
-            filename=await self._file_name(),
+        """Download the selected errors."""
+        yield await self._export_selection(self.selected_error_ids)
+
+    @rx.event
+    async def download_errors(self, error_ids: list[int]):
+        """Download the errors selected in the browser."""
+        yield await self._export_selection(error_ids)
+
+    def _selection(self, error_ids: Iterable[int]) -> list[int] | None:
+        """Get the selected errors in ascending order without duplicates.
+
+        Returns:
+            The ids of the errors, none if the verification is no longer available or any of the errors is unknown,
+            e.g. because the browser still refers to the errors of another verification.
+
+        """
+        verification = _verifications.get(self._verification_key)
+        selection = sorted(set(error_ids))
+        if verification is None or (selection and not 0 <= selection[0] <= selection[-1] < len(verification.errors)):
+            return None
+        return selection
+
+
+async def export_errors(request: starlette.requests.Request) -> starlette.responses.Response:
+    """Stream an export requested by the session of the request, the rows are created while the file is sent.
+
+    Every export can be downloaded once, within :data:`constants.EXPORT_TTL` seconds after it was requested. The rows
+    are created from the verification, which only the backend process that made it has.
+    """
+    payload = await _pending_exports.take(request.path_params['token'])
+    if payload is None:
+        return starlette.responses.PlainTextResponse('Export not found or expired', status_code=404)
+    export_request = ExportRequest.loads(payload)
+    export_session = request.cookies.get(EXPORT_SESSION_COOKIE, '')
+    if not hmac.compare_digest(_session_digest(export_session), export_request.session_digest):
+        return starlette.responses.PlainTextResponse('Export requested by another session', status_code=403)
+    verification = _verifications.get(export_request.verification_key)
+    if verification is None:
+        return starlette.responses.PlainTextResponse(
+            'The verification is no longer available, please verify again', status_code=404
         )
+    if export_request.file_format is export.Format.PARQUET and not export.parquet_available():
+        return starlette.responses.PlainTextResponse('Parquet exports require pyarrow', status_code=501)
+    columns = EXPORT_COLUMNS + EXPORT_ATTENDANCE_COLUMNS if export_request.with_attendances else EXPORT_COLUMNS
+    rows = _export_rows(
+        verification.errors,
+        verification.errors_to_show,
+        export_request.error_ids,
+        with_attendances=export_request.with_attendances,
+    )
+    return starlette.responses.StreamingResponse(
+        export.write(export_request.file_format, columns, rows),  # iterated in a worker thread
+        media_type=export_request.file_format.media_type,
+        headers={'content-disposition': f'attachment; filename="{export_request.file_name}"'},
+    )
+
+
+# state of the errors filtered, sorted and selected in the browser
+client_errors = rx._x.client_state('compactErrors', None)  # noqa: SLF001
+client_filter = rx._x.client_state('errorFilter', '')  # noqa: SLF001
+client_sort = rx._x.client_state('errorSort', '')  # noqa: SLF001
+client_selection = rx._x.client_state('errorSelection', [])  # noqa: SLF001
+client_limit = rx._x.client_state('errorLimit', CLIENT_ROWS)  # noqa: SLF001
+
+# filters the compact errors by name and team names, sorts them by a column of the rows and returns the first ones
+_CLIENT_ROWS_FUNCTION = """((errors, query, sortKey, limit) => {
+  if (!errors) return {rows: [], total: 0};
+  const q = query.toLowerCase();
+  const names = errors.names.map((name) => name.toLowerCase());
+  const teams = errors.teams.map((team) => team.toLowerCase());
+  const hours = (minutes) => `${Math.floor(minutes / 60)}:${String(minutes % 60).padStart(2, '0')}`;
+  const rows = [];
+  for (let i = 0; i < errors.name.length; i++) {
+    if (q && !names[errors.name[i]].includes(q) && !errors.team_ids[i].some((team) => teams[team].includes(q))) {
+      continue;
+    }
+    rows.push({
+      id: i,
+      name: errors.names[errors.name[i]],
+      affected_days: errors.affected_days[i],
+      break_minutes: errors.break_minutes[i],
+      attendance_minutes: errors.attendance_minutes[i],
+      cumulated_break: hours(errors.break_minutes[i]),
+      cumulated_attendance: hours(errors.attendance_minutes[i]),
+      error: errors.reasons[errors.reason[i]],
+    });
+  }
+  const compare = (a, b) => (typeof a === 'string' ? a.localeCompare(b, undefined, {sensitivity: 'base'}) : a - b);
+  if (sortKey) {
+    rows.sort((a, b) => compare(a[sortKey], b[sortKey]) || a.id - b.id);
+  }
+  return {rows: rows.slice(0, limit), total: rows.length};
+})"""
+_TOGGLE_FUNCTION = '((ids, id) => (ids.includes(id) ? ids.filter((other) => other !== id) : [...ids, id]))'
+
+
+def _client_result() -> rx.vars.ObjectVar:
+    """Get the rows filtered and sorted in the browser, limited to the ones shown, and the number of matching rows."""
+    return (
+        rx.vars.FunctionStringVar.create(_CLIENT_ROWS_FUNCTION)
+        .call(client_errors.value, client_filter.value, client_sort.value, client_limit.value)
+        .to(dict)
+    )
 
 
 @rx.memo
@@ -350,6 +847,22 @@ def render_input() -> rx.Component:
             min_width='max-content',
             spacing='1',
         ),
+        rx.hstack(
+            rx.text('Consolidate'),
+            rx.checkbox(
+                default_checked=SettingsState.consolidate_errors, on_change=SettingsState.set_consolidate_errors
+            ),
+            align='center',
+            min_width='max-content',
+            spacing='1',
+        ),
+        rx.hstack(
+            rx.text('Filter in browser'),
+            rx.checkbox(default_checked=SettingsState.filter_in_browser, on_change=SettingsState.set_filter_in_browser),
+            align='center',
+            min_width='max-content',
+            spacing='1',
+        ),
         rx.hstack(
             rx.text('Tolerance'),
             rx.input(
@@ -374,7 +887,7 @@ def render_input() -> rx.Component:
             rx.button(
                 'Submit',
                 loading=DataStateDeprecated.is_loading,
-                on_click=DataStateDeprecated.calculate_errors,
+                on_click=[client_errors.push(None), client_selection.push([]), DataStateDeprecated.calculate_errors],
             ),
         ),
         spacing='3',
@@ -387,15 +900,45 @@ def render_input() -> rx.Component:
 def render_export_buttons() -> rx.Component:
     """Render the export buttons."""
     return rx.hstack(
-        rx.button(
-            'Export Selected',
-            disabled=DataStateDeprecated.selected_error_ids.length() == 0,
-            on_click=DataStateDeprecated.download_selected_errors,
+        rx.cond(
+            DataStateDeprecated.errors_in_browser,
+            rx.button(
+                'Export Selected',
+                disabled=client_selection.value.length() == 0,
+                on_click=client_selection.retrieve(DataStateDeprecated.download_errors),
+            ),
+            rx.button(
+                'Export Selected',
+                disabled=DataStateDeprecated.selected_error_ids.length() == 0,
+                on_click=DataStateDeprecated.download_selected_errors,
+            ),
+        ),
+        rx.cond(
+            DataStateDeprecated.errors_in_browser,
+            rx.button(
+                'Export All',
+                disabled=_client_result()['total'].to(int) == 0,
+                on_click=client_filter.retrieve(DataStateDeprecated.download_filtered_errors),
+            ),
+            rx.button(
+                'Export All',
+                disabled=DataStateDeprecated.total_count == 0,
+                on_click=DataStateDeprecated.download_all_errors,
+            ),
+        ),
+        rx.select(
+            EXPORT_FORMATS,
+            value=SettingsState.export_format,
+            on_change=SettingsState.set_export_format,
         ),
-        rx.button(
-            'Export All',
-            disabled=DataStateDeprecated.errors_to_show.length() == 0,
-            on_click=DataStateDeprecated.download_all_errors,
+        rx.hstack(
+            rx.text('Attendances'),
+            rx.checkbox(
+                default_checked=SettingsState.export_attendances, on_change=SettingsState.set_export_attendances
+            ),
+            align='center',
+            min_width='max-content',
+            spacing='1',
         ),
         justify='center',
         align='center',
@@ -408,19 +951,89 @@ def render_search() -> rx.Component:
     """Render the search input."""
     return rx.hstack(
         rx.text('Search'),
-        rx.input(
-            value=DataStateDeprecated.filter_value,
-            on_change=DataStateDeprecated.set_filter_value,
-            width='100%',
-            placeholder='Filter by name or team',
-            disabled=DataStateDeprecated.is_loading,
+        rx.cond(
+            DataStateDeprecated.errors_in_browser,
+            rx.input(
+                on_change=client_filter.set,
+                width='100%',
+                placeholder='Filter by name or team',
+            ),
+            rx.debounce_input(
+                rx.input(
+                    on_change=DataStateDeprecated.set_filter_value,
+                    width='100%',
+                    placeholder='Filter by name or team',
+                    disabled=DataStateDeprecated.is_loading,
+                ),
+                value=DataStateDeprecated.filter_value,
+                debounce_timeout=SEARCH_DEBOUNCE,
+            ),
         ),
         width='50%',
         align='center',
     )
 
 
-def show_employee(error: rx.Var[ErrorToShow], index: int) -> rx.Component:
+def _attendances_dialog(error_id: rx.Var[int]) -> rx.Component:
+    """Show a button opening a dialog with the attendances of an error."""
+    return rx.alert_dialog.root(
+        rx.alert_dialog.trigger(
+            rx.icon_button('info', on_click=DataStateDeprecated.show_attendances(error_id)),
+        ),
+        rx.alert_dialog.content(
+            rx.alert_dialog.title('Relevant attendance records'),
+            rx.inset(
+                rx.table.root(
+                    rx.table.header(
+                        rx.table.row(
+                            rx.table.column_header_cell('Date'),
+                            rx.table.column_header_cell('Clock in'),
+                            rx.table.column_header_cell('Clock out'),
+                            rx.table.column_header_cell('Hours attended'),
+                        ),
+                    ),
+                    rx.table.body(
+                        rx.foreach(
+                            DataStateDeprecated.shown_attendances,
+                            lambda x: rx.table.row(
+                                rx.table.cell(rx.moment(x['date'], format='YYYY-MM-DD')),
+                                rx.table.cell(
+                                    rx.cond(
+                                        x['clock_in'].is_none(),
+                                        None,
+                                        rx.moment(x['date'], add=x['clock_in'], format='HH:mm'),
+                                    )
+                                ),
+                                rx.table.cell(
+                                    rx.cond(
+                                        x['clock_out'].is_none(),
+                                        None,
+                                        rx.moment(x['date'], add=x['clock_out'], format='HH:mm'),
+                                    )
+                                ),
+                                rx.table.cell(rx.moment(x['date'], add=x['minutes'], format='HH:mm')),
+                            ),
+                        )
+                    ),
+                ),
+                side='x',
+                margin_top='24px',
+                margin_bottom='24px',
+            ),
+            rx.flex(
+                rx.alert_dialog.cancel(
+                    rx.button(
+                        'Close',
+                        variant='soft',
+                    ),
+                ),
+                justify='end',
+            ),
+        ),
+    )
+
+
+def show_employee(error: rx.Var[ErrorToShow]) -> rx.Component:
     """Show a customer in a table row."""
     return rx.table.row(
         rx.table.cell(error['name']),
@@ -428,73 +1041,101 @@ def show_employee(error: rx.Var[ErrorToShow], index: int) -> rx.Component:
         rx.table.cell(error['cumulated_break']),
         rx.table.cell(error['cumulated_attendance']),
         rx.table.cell(error['error'], align='left'),
-        rx.table.cell(
-            rx.alert_dialog.root(
-                rx.alert_dialog.trigger(
-                    rx.icon_button('info'),
-                ),
-                rx.alert_dialog.content(
-                    rx.alert_dialog.title('Relevant attendance records'),
-                    rx.inset(
-                        rx.table.root(
-                            rx.table.header(
-                                rx.table.row(
-                                    rx.table.column_header_cell('Date'),
-                                    rx.table.column_header_cell('Clock in'),
-                                    rx.table.column_header_cell('Clock out'),
-                                    rx.table.column_header_cell('Hours attended'),
-                                ),
-                            ),
-                            rx.table.body(
-                                rx.foreach(
-                                    error['attendances'],
-                                    lambda x: rx.table.row(
-                                        rx.table.cell(rx.moment(x['date'], format='YYYY-MM-DD')),
-                                        rx.table.cell(
-                                            rx.cond(
-                                                x['clock_in'].is_none(),
-                                                None,
-                                                rx.moment(x['date'], add=x['clock_in'], format='HH:mm'),
-                                            )
-                                        ),
-                                        rx.table.cell(
-                                            rx.cond(
-                                                x['clock_out'].is_none(),
-                                                None,
-                                                rx.moment(x['date'], add=x['clock_out'], format='HH:mm'),
-                                            )
-                                        ),
-                                        rx.table.cell(rx.moment(x['date'], add=x['minutes'], format='HH:mm')),
-                                    ),
-                                )
-                            ),
-                        ),
-                        side='x',
-                        margin_top='24px',
-                        margin_bottom='24px',
-                    ),
-                    rx.flex(
-                        rx.alert_dialog.cancel(
-                            rx.button(
-                                'Close',
-                                variant='soft',
-                            ),
-                        ),
-                        justify='end',
-                    ),
-                ),
+        rx.table.cell(_attendances_dialog(error['id']), align='right'),
+        on_click=DataStateDeprecated.select_row(error['id']),
+        background_color=rx.cond(
+            DataStateDeprecated.selected_error_ids.contains(error['id']), rx.color('blue', 3), 'transparent'
+        ),
+    )
+
+
+def render_period_hours() -> rx.Component:
+    """Render a page of the table of the hours attended per period."""
+    table = rx.table.root(
+        rx.table.header(
+            rx.table.row(
+                rx.table.column_header_cell('Name'),
+                rx.foreach(DataStateDeprecated.period_names, lambda name: rx.table.column_header_cell(name)),
+                rx.table.column_header_cell('Total'),
+                rx.table.column_header_cell('Cumulated Break'),
             ),
-            align='right',
         ),
-        on_click=lambda: DataStateDeprecated.select_row(index),
-        background_color=rx.cond(
-            DataStateDeprecated.selected_error_ids.contains(index), rx.color('blue', 3), 'transparent'
+        rx.table.body(
+            rx.foreach(
+                DataStateDeprecated.period_hours,
+                lambda row: rx.table.row(
+                    rx.table.cell(row['name']),
+                    rx.foreach(row['hours'], lambda hours: rx.table.cell(hours)),
+                    rx.table.cell(row['total']),
+                    rx.table.cell(row['cumulated_break']),
+                ),
+            )
+        ),
+        width='100%',
+    )
+    pagination = rx.hstack(
+        rx.icon_button(
+            'chevron-left',
+            on_click=DataStateDeprecated.show_period_page(DataStateDeprecated.period_page_index - 1),
+            disabled=DataStateDeprecated.period_page_index == 0,
+        ),
+        rx.text('Page ', DataStateDeprecated.period_page_index + 1, ' of ', DataStateDeprecated.period_page_count),
+        rx.icon_button(
+            'chevron-right',
+            on_click=DataStateDeprecated.show_period_page(DataStateDeprecated.period_page_index + 1),
+            disabled=DataStateDeprecated.period_page_index + 1 >= DataStateDeprecated.period_page_count,
+        ),
+        align='center',
+        justify='end',
+        width='100%',
+    )
+    return rx.vstack(pagination, table, width='100%')
+
+
+def render_pagination() -> rx.Component:
+    """Render the controls to page through the errors."""
+    return rx.hstack(
+        rx.icon_button(
+            'chevrons-left', on_click=DataStateDeprecated.show_page(0), disabled=DataStateDeprecated.page_index == 0
+        ),
+        rx.icon_button(
+            'chevron-left',
+            on_click=DataStateDeprecated.show_page(DataStateDeprecated.page_index - 1),
+            disabled=DataStateDeprecated.page_index == 0,
+        ),
+        rx.text(
+            'Page ',
+            DataStateDeprecated.page_index + 1,
+            ' of ',
+            DataStateDeprecated.page_count,
+            ' (',
+            DataStateDeprecated.total_count,
+            ' errors)',
+        ),
+        rx.icon_button(
+            'chevron-right',
+            on_click=DataStateDeprecated.show_page(DataStateDeprecated.page_index + 1),
+            disabled=DataStateDeprecated.page_index + 1 >= DataStateDeprecated.page_count,
+        ),
+        rx.icon_button(
+            'chevrons-right',
+            on_click=DataStateDeprecated.show_page(DataStateDeprecated.page_count - 1),
+            disabled=DataStateDeprecated.page_index + 1 >= DataStateDeprecated.page_count,
+        ),
+        rx.select(
+            PAGE_SIZES,
+            value=DataStateDeprecated.page_size.to_string(),
+            on_change=DataStateDeprecated.set_page_size,
         ),
+        rx.text('per page'),
+        align='center',
+        justify='end',
+        width='100%',
     )
 
 
 def render_table() -> rx.Component:
-    """Render the main table showing errors."""
+    """Render the main table showing the errors of the shown page."""
     return rx.table.root(
         rx.table.header(
             rx.table.row(
@@ -516,6 +1157,66 @@ def render_table() -> rx.Component:
     )
 
 
+def show_client_row(row: rx.Var[ClientRow]) -> rx.Component:
+    """Show an error filtered in the browser in a table row."""
+    return rx.table.row(
+        rx.table.cell(row['name']),
+        rx.table.cell(row['affected_days']),
+        rx.table.cell(row['cumulated_break']),
+        rx.table.cell(row['cumulated_attendance']),
+        rx.table.cell(row['error'], align='left'),
+        rx.table.cell(_attendances_dialog(row['id']), align='right'),
+        on_click=client_selection.set_value(
+            rx.vars.FunctionStringVar.create(_TOGGLE_FUNCTION).call(client_selection.value, row['id'])
+        ),
+        background_color=rx.cond(client_selection.value.contains(row['id']), rx.color('blue', 3), 'transparent'),
+    )
+
+
+def _sortable_header(title: str, sort_key: str, width: str) -> rx.Component:
+    return rx.table.column_header_cell(
+        rx.hstack(title, rx.cond(client_sort.value == sort_key, rx.icon('arrow-down', size=14)), align='center'),
+        on_click=client_sort.set_value(sort_key),
+        cursor='pointer',
+        min_width=width,
+        max_width=width,
+    )
+
+
+def render_client_table() -> rx.Component:
+    """Render the table of the errors filtered and sorted in the browser, showing more rows on request."""
+    result = _client_result()
+    return rx.vstack(
+        rx.table.root(
+            rx.table.header(
+                rx.table.row(
+                    _sortable_header('Name', 'name', '17.5%'),
+                    _sortable_header('Affected Days', 'affected_days', '15%'),
+                    _sortable_header('Cumulated Break', 'break_minutes', '12.5%'),
+                    _sortable_header('Cumulated Attendance', 'attendance_minutes', '12.5%'),
+                    _sortable_header('Error', 'error', '40%'),
+                    rx.table.column_header_cell('Records', align='right', min_width='2.5%', max_width='2.5%'),
+                ),
+            ),
+            rx.table.body(rx.foreach(result['rows'].to(list[ClientRow]), show_client_row)),
+            width='100%',
+        ),
+        rx.hstack(
+            rx.text('Showing ', result['rows'].to(list).length(), ' of ', result['total'], ' errors'),
+            rx.button(
+                'Show more',
+                variant='soft',
+                on_click=client_limit.set_value(client_limit.value + CLIENT_ROWS),
+                disabled=result['rows'].to(list).length() >= result['total'].to(int),
+            ),
+            align='center',
+        ),
+        align='center',
+        width='100%',
+        on_mount=DataStateDeprecated.send_errors_to_browser,
+    )
+
+
 @rx.memo
 def live_progress() -> rx.Component:
     """Show a live progress bar when loading data."""
@@ -534,8 +1235,37 @@ def live_progress() -> rx.Component:
 def working_time_verification_page() -> rx.Component:
     """Index page of the app."""
     return rx.vstack(
+        client_errors,
+        client_filter,
+        client_sort,
+        client_selection,
+        client_limit,
         rx.hstack(render_input(), render_export_buttons(), render_search(), justify='between', width='100%'),
         live_progress(),
-        render_table(),
+        rx.cond(
+            DataStateDeprecated.verification_lost,
+            rx.callout(
+                'The results of the verification are no longer available, please submit it again.',
+                icon='info',
+                width='100%',
+            ),
+        ),
+        rx.tabs.root(
+            rx.tabs.list(
+                rx.tabs.trigger('Errors', value='errors'),
+                rx.tabs.trigger('Hours per period', value='hours'),
+            ),
+            rx.tabs.content(
+                rx.cond(
+                    DataStateDeprecated.errors_in_browser,
+                    render_client_table(),
+                    rx.vstack(render_pagination(), render_table(), width='100%'),
+                ),
+                value='errors',
+            ),
+            rx.tabs.content(render_period_hours(), value='hours'),
+            default_value='errors',
+            width='100%',
+        ),
         width='100%',
     )
@@ -4,3 +4,4 @@ INDEX = '/'
 OAUTH_START_ROUTE = '/oauth/start'
 OAUTH_AUTHORIZE_ROUTE = '/oauth/authorize'
 VERIFICATION_ROUTE = '/verification'
+EXPORT_ROUTE = '/export'
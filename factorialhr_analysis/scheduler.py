@@ -0,0 +1,177 @@
+"""Scheduling of the requests to FactorialHR per tenant, respecting its rate limits."""
+
+import dataclasses
+import email.utils
+import enum
+import heapq
+import itertools
+import logging
+import random
+import time
+
+import anyio
+import httpx
+
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+RETRY_STATUS_CODES = frozenset({429, 502, 503, 504})
+# reset values later than this many seconds before now are points in time as seconds since the epoch, not durations
+EPOCH_SLACK = 24 * 60 * 60
+
+
+class Priority(enum.IntEnum):
+    """Priority of a request, requests of lower values are sent first."""
+
+    INTERACTIVE = 0  # requests a user waits for, e.g. token exchanges and small lists
+    BULK = 1  # pages of large downloads
+
+
+def retry_after(response: httpx.Response) -> float | None:
+    """Get the seconds to wait before the next request as requested by the server, if any.
+
+    Besides ``Retry-After`` in seconds or as date, ``RateLimit-Reset`` and ``X-RateLimit-Reset`` are respected once
+    the remaining requests are used up. They are seconds to wait, or seconds since the epoch if they are that large.
+    """
+    value = response.headers.get('retry-after')
+    if value is None:
+        for prefix in ('ratelimit-', 'x-ratelimit-'):
+            if response.headers.get(f'{prefix}remaining') == '0' and f'{prefix}reset' in response.headers:
+                value = response.headers[f'{prefix}reset']
+                break
+        else:
+            return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        now = time.time()
+        return max(0.0, seconds - now if seconds > now - EPOCH_SLACK else seconds)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp() - time.time())
+
+
+@dataclasses.dataclass
+class _Tenant:
+    """Requests of a tenant, sent and waiting."""
+
+    running: int = 0
+    waiting: list[tuple[Priority, int, anyio.Event]] = dataclasses.field(default_factory=list)  # heap
+    blocked_until: float = 0.0  # monotonic time before which no request is sent
+
+
+class RequestScheduler:
+    """Sends the requests of each tenant in priority order, retrying idempotent ones with backoff.
+
+    Every tenant may have a number of requests in flight, further ones wait in a priority queue. A tenant whose rate
+    limit was exceeded, as told by a response, waits for the limit to reset before sending further requests, so the
+    sessions of the tenant do not make it worse, but no longer than the maximum wait. Idempotent requests failing with
+    a transient error or status are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, *, concurrency: int, max_retries: int, backoff: float, max_backoff: float, max_wait: float):
+        """Create the scheduler.
+
+        :param concurrency: maximum number of requests per tenant in flight
+        :param max_retries: maximum number of retries of an idempotent request
+        :param backoff: seconds to wait at most before the first retry, doubled for every further retry
+        :param max_backoff: upper bound of the seconds to wait before a retry, unless the server asks for more
+        :param max_wait: upper bound of the seconds the server can ask to wait for its rate limit
+        """
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self._tenants: dict[str, _Tenant] = {}
+        self._order = itertools.count()
+
+    def waiting(self, tenant: str) -> int:
+        """Get the number of requests of the tenant waiting to be sent."""
+        return len(self._tenants[tenant].waiting) if tenant in self._tenants else 0
+
+    async def send(
+        self, tenant: str, priority: Priority, transport: httpx.AsyncBaseTransport, request: httpx.Request
+    ) -> httpx.Response:
+        """Send the request of the tenant once it is its turn, retrying it if it is idempotent."""
+        state = self._tenants.setdefault(tenant, _Tenant())
+        retries = self.max_retries if request.method in IDEMPOTENT_METHODS else 0
+        attempt = 0
+        while True:
+            await self._acquire(state, priority)
+            try:
+                await anyio.sleep(state.blocked_until - time.monotonic())
+                response = await transport.handle_async_request(request)
+            except httpx.TransportError:
+                if attempt >= retries:
+                    raise
+                delay = None
+            else:
+                delay = retry_after(response)
+                if delay is not None:
+                    delay = min(delay, self.max_wait)
+                    state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= retries:
+                    return response
+                await response.aclose()
+            finally:
+                self._release(state)
+            wait = max(delay or 0.0, random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt)))
+            logging.getLogger(__name__).info('retrying %s %s in %.1f s', request.method, request.url, wait)
+            await anyio.sleep(wait)
+            attempt += 1
+
+    async def _acquire(self, state: _Tenant, priority: Priority):
+        if state.running < self.concurrency and not state.waiting:
+            state.running += 1
+            return
+        event = anyio.Event()
+        entry = (priority, next(self._order), event)
+        heapq.heappush(state.waiting, entry)
+        try:
+            await event.wait()
+        except BaseException:
+            if event.is_set():
+                self._release(state)  # hand the slot granted meanwhile to the next request
+            else:
+                state.waiting.remove(entry)
+                heapq.heapify(state.waiting)
+            raise
+
+    def _release(self, state: _Tenant):
+        state.running -= 1
+        while state.running < self.concurrency and state.waiting:
+            _, _, event = heapq.heappop(state.waiting)
+            state.running += 1
+            event.set()
+
+
+class ScheduledTransport(httpx.AsyncBaseTransport):
+    """Transport sending the requests of a tenant through the scheduler.
+
+    The priority of a request can be set with the ``priority`` request extension, e.g.
+    ``client.get(url, extensions={'priority': Priority.BULK})``.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        scheduler: RequestScheduler,
+        tenant: str,
+        priority: Priority = Priority.INTERACTIVE,
+    ):
+        self._transport = transport
+        self._scheduler = scheduler
+        self._tenant = tenant
+        self._priority = priority
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send the request once it is its turn."""
+        priority = Priority(request.extensions.get('priority', self._priority))
+        return await self._scheduler.send(self._tenant, priority, self._transport, request)
+
+    async def aclose(self):
+        """Close the underlying transport."""
+        await self._transport.aclose()
@@ -0,0 +1,52 @@
+"""Search index for filtering results by text."""
+
+import collections
+from collections.abc import Iterable, Sequence
+
+NGRAM_LENGTH = 3
+
+
+def _ngrams(text: str) -> set[str]:
+    """Get the n-grams of the text, none if it is shorter than an n-gram."""
+    return {text[i : i + NGRAM_LENGTH] for i in range(len(text) - NGRAM_LENGTH + 1)}
+
+
+class SearchIndex:
+    """Index of documents consisting of text fields, finding the ones with a field containing a query.
+
+    The search is case-insensitive. Every field is lowercased once and its n-grams are indexed, so a query only has to
+    check the documents containing all of its n-grams instead of every document. Queries shorter than an n-gram check
+    every document, which is still cheap since the fields are lowercased already.
+    """
+
+    def __init__(self, documents: Iterable[Iterable[str]]):
+        """Index the documents, identified by their position."""
+        self._fields: list[tuple[str, ...]] = []
+        postings: dict[str, list[int]] = collections.defaultdict(list)
+        for document_id, fields in enumerate(documents):
+            lowered = tuple(field.lower() for field in fields)
+            self._fields.append(lowered)
+            for ngram in set().union(*map(_ngrams, lowered)):
+                postings[ngram].append(document_id)
+        self._postings = dict(postings)
+
+    def __len__(self) -> int:
+        """Get the number of documents."""
+        return len(self._fields)
+
+    def search(self, query: str) -> list[int]:
+        """Get the ids of the documents with a field containing the query in ascending order, all for an empty query."""
+        query = query.lower()
+        if not query:
+            return list(range(len(self._fields)))
+        candidates: Sequence[int] | set[int]
+        if len(query) < NGRAM_LENGTH:
+            candidates = range(len(self._fields))
+        else:
+            postings = sorted((self._postings.get(ngram, []) for ngram in _ngrams(query)), key=len)
+            candidates = set(postings[0]).intersection(*postings[1:])
+        return [
+            document_id
+            for document_id in sorted(candidates)
+            if any(query in field for field in self._fields[document_id])
+        ]
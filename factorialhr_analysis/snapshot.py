@@ -0,0 +1,153 @@
+"""Snapshot of the data loaded from FactorialHR, stored in a SQLite file per company."""
+
+import contextlib
+import dataclasses
+import datetime
+import logging
+import os
+import pathlib
+import sqlite3
+import tempfile
+
+import factorialhr
+import numpy as np
+
+from factorialhr_analysis.working_time_verification import batch
+
+VERSION = 3  # increased whenever the layout changes, snapshots of other versions are ignored
+
+
+@dataclasses.dataclass(frozen=True)
+class Snapshot:
+    """Data of a company at the time it was saved."""
+
+    employees: dict[int, factorialhr.Employee]
+    teams: dict[int, factorialhr.Team]
+    shifts: batch.ShiftColumns
+    shifts_synced_on: datetime.date | None
+    shifts_fully_synced_on: datetime.date | None
+    saved_at: datetime.datetime
+
+
+def snapshot_path(directory: str | os.PathLike[str], key: str) -> pathlib.Path:
+    """Get the path of the snapshot of the data with the key, see :func:`tenant.cache_key`."""
+    return pathlib.Path(directory) / f'company_{key}.sqlite'
+
+
+def save(path: pathlib.Path, snapshot: Snapshot):
+    """Save the snapshot.
+
+    The file is written next to the path and then renamed, so readers never see a partially written snapshot. The
+    shifts are stored as one binary column each, which is a lot faster than a row per shift.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, name = tempfile.mkstemp(suffix='.tmp', prefix=path.name, dir=path.parent)
+    os.close(handle)
+    temporary = pathlib.Path(name)
+    try:
+        with contextlib.closing(sqlite3.connect(temporary)) as connection:
+            _write(connection, snapshot)
+    except BaseException:
+        temporary.unlink(missing_ok=True)
+        raise
+    temporary.replace(path)
+
+
+def dumps(snapshot: Snapshot) -> bytes:
+    """Serialize the snapshot to the content of a snapshot file, e.g. to store it outside of the file system."""
+    with contextlib.closing(sqlite3.connect(':memory:')) as connection:
+        _write(connection, snapshot)
+        return connection.serialize()
+
+
+def loads(data: bytes) -> Snapshot | None:
+    """Deserialize a snapshot serialized by ``dumps``, if it is of the current version."""
+    try:
+        with contextlib.closing(sqlite3.connect(':memory:')) as connection:
+            connection.deserialize(data)
+            return _read(connection)
+    except (sqlite3.Error, ValueError, TypeError):
+        logging.getLogger(__name__).exception('ignoring unreadable snapshot')
+        return None
+
+
+def _format_date(date: datetime.date | None) -> str:
+    return date.isoformat() if date else ''
+
+
+def _parse_date(value: str) -> datetime.date | None:
+    return datetime.date.fromisoformat(value) if value else None
+
+
+def _write(connection: sqlite3.Connection, snapshot: Snapshot):
+    with connection:
+        connection.executescript(
+            """
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            CREATE TABLE employees (id INTEGER PRIMARY KEY, data TEXT);
+            CREATE TABLE teams (id INTEGER PRIMARY KEY, data TEXT);
+            CREATE TABLE shift_columns (name TEXT PRIMARY KEY, dtype TEXT, data BLOB);
+            """
+        )
+        connection.executemany(
+            'INSERT INTO meta VALUES (?, ?)',
+            [
+                ('version', str(VERSION)),
+                ('saved_at', snapshot.saved_at.isoformat()),
+                ('shifts_synced_on', _format_date(snapshot.shifts_synced_on)),
+                ('shifts_fully_synced_on', _format_date(snapshot.shifts_fully_synced_on)),
+            ],
+        )
+        connection.executemany(
+            'INSERT INTO employees VALUES (?, ?)', [(i, e.model_dump_json()) for i, e in snapshot.employees.items()]
+        )
+        connection.executemany(
+            'INSERT INTO teams VALUES (?, ?)', [(i, t.model_dump_json()) for i, t in snapshot.teams.items()]
+        )
+        connection.executemany(
+            'INSERT INTO shift_columns VALUES (?, ?, ?)',
+            [
+                (
+                    field.name,
+                    str(getattr(snapshot.shifts, field.name).dtype),
+                    getattr(snapshot.shifts, field.name).tobytes(),
+                )
+                for field in dataclasses.fields(snapshot.shifts)
+            ],
+        )
+
+
+def load(path: pathlib.Path) -> Snapshot | None:
+    """Load a snapshot, if there is one of the current version."""
+    if not path.exists():
+        return None
+    try:
+        with contextlib.closing(sqlite3.connect(f'{path.as_uri()}?mode=ro', uri=True)) as connection:
+            return _read(connection)
+    except (sqlite3.Error, ValueError, TypeError):
+        logging.getLogger(__name__).exception('ignoring unreadable snapshot %s', path)
+        return None
+
+
+def _read(connection: sqlite3.Connection) -> Snapshot | None:
+    meta = dict(connection.execute('SELECT key, value FROM meta'))
+    if meta.get('version') != str(VERSION):
+        return None
+    columns = {
+        name: np.frombuffer(data, dtype=dtype)
+        for name, dtype, data in connection.execute('SELECT name, dtype, data FROM shift_columns')
+    }
+    return Snapshot(
+        employees={
+            i: factorialhr.Employee.model_validate_json(data)
+            for i, data in connection.execute('SELECT id, data FROM employees')
+        },
+        teams={
+            i: factorialhr.Team.model_validate_json(data)
+            for i, data in connection.execute('SELECT id, data FROM teams')
+        },
+        shifts=batch.ShiftColumns(**columns),
+        shifts_synced_on=_parse_date(meta['shifts_synced_on']),
+        shifts_fully_synced_on=_parse_date(meta['shifts_fully_synced_on']),
+        saved_at=datetime.datetime.fromisoformat(meta['saved_at']),
+    )
@@ -1,80 +1,130 @@
 """State for managing data."""
 
 import datetime
+import functools
 import logging
+import time
 
-import anyio
 import factorialhr
 import reflex as rx
 
-from factorialhr_analysis import constants, states
+from factorialhr_analysis import constants, download, http_clients, states, tenant
+
+PROGRESS_INTERVAL = 0.25  # seconds between two updates of the download progress
+
+_tenant_cache = tenant.TenantCache(
+    datetime.timedelta(seconds=constants.TENANT_CACHE_TTL),
+    redis_url=constants.REDIS_URL,
+    snapshot_directory=constants.SNAPSHOT_DIRECTORY,
+)
 
 
 class DataState(rx.State):
     """State for managing data."""
 
-    _employees: dict[int, factorialhr.Employee] = {}  # noqa: RUF012
-    _teams: dict[int, factorialhr.Team] = {}  # noqa: RUF012
-    _shifts: dict[int, factorialhr.AttendanceShift] = {}  # noqa: RUF012
+    # the state is serialized on every event, so it only references the data of the session in the tenant cache
+    _cache_key: str | None = None
     _credentials: factorialhr.Credentials | None = None
 
     is_loading: rx.Field[bool] = rx.field(default=False)
     last_updated: rx.Field[datetime.datetime | None] = rx.field(default=None)
+    len_of_shifts: rx.Field[int] = rx.field(0)
+    # progress of the shift download
+    downloaded_shifts: rx.Field[int] = rx.field(0)
+    total_shifts: rx.Field[int] = rx.field(0)
+    downloaded_bytes: rx.Field[int] = rx.field(0)
 
     @rx.var
-    def len_of_shifts(self) -> int:
-        """Get the number of shifts."""
-        return len(self._shifts)
+    def downloaded_megabytes(self) -> str:
+        """Get the amount of data downloaded so far."""
+        return f'{self.downloaded_bytes / 1_000_000:.1f} MB'
 
-    async def _load_employees(self, api_client: factorialhr.ApiClient):
-        employees = await factorialhr.EmployeesEndpoint(api_client).all()
-        async with self:
-            self._employees = {emp.id: emp for emp in employees.data()}
+    def _set_download_progress(self, progress: download.DownloadProgress):
+        """Show the progress of the shift download. Requires the state to be locked."""
+        self.downloaded_shifts = progress.records
+        self.total_shifts = progress.total_records or 0
+        self.downloaded_bytes = progress.bytes
 
-    async def _load_teams(self, api_client: factorialhr.ApiClient):
-        teams = await factorialhr.TeamsEndpoint(api_client).all()
-        async with self:
-            self._teams = {team.id: team for team in teams.data()}
+    async def _get_data(self) -> tenant.TenantData:
+        """Get the data of the company of the session."""
+        data = await _tenant_cache.lookup(self._cache_key) if self._cache_key is not None else None
+        return data if data is not None else tenant.TenantData.empty()
 
-    async def _load_shifts(self, api_client: factorialhr.ApiClient):
-        # all shifts are obtained in a single page and therefore requires a high timeout
-        shifts = await factorialhr.ShiftsEndpoint(api_client).all(timeout=100)
-        async with self:
-            self._shifts = {shift.id: shift for shift in shifts.data()}
+    def _set_data(self, cache_key: str, data: tenant.TenantData):
+        """Show the data of the company. Requires the state to be locked."""
+        self._cache_key = cache_key
+        self.last_updated = data.loaded_at
+        self.len_of_shifts = len(data.shifts)
 
-    async def _load_credentials(self, api_client: factorialhr.ApiClient):
-        credentials = await factorialhr.CredentialsEndpoint(api_client).all()
+    async def _show_stale_data(self, cache_key: str, data: tenant.TenantData):
         async with self:
-            self._credentials = next(iter(credentials.data()), None)
+            if self.last_updated is None:
+                self._set_data(cache_key, data)
 
-    @rx.event
-    async def refresh_data(self):  # noqa: ANN201
-        """Refresh the data."""
-        self.clear()
+    async def _poll_data(self, *, full: bool):  # noqa: ANN202
         if constants.API_KEY:
-            return DataState.poll_data
+            return DataState.poll_data(full)
         auth_state = await self.get_state(states.OAuthSessionState)
         if await auth_state.refresh_session():
-            return DataState.poll_data
+            return DataState.poll_data(full)
         return states.OAuthSessionState.redir
 
+    @rx.event
+    async def refresh_data(self):  # noqa: ANN201
+        """Refresh the data.
+
+        The loaded data is kept in the cache shared by the sessions until it is replaced, which allows to synchronize
+        the shifts incrementally.
+        """
+        return await self._poll_data(full=False)
+
+    @rx.event
+    async def reload_all_data(self):  # noqa: ANN201
+        """Reload all data, including the shifts before the window which is synchronized by a refresh."""
+        return await self._poll_data(full=True)
+
     @rx.event(background=True)
-    async def poll_data(self):
-        """Poll the data."""
+    async def poll_data(self, full: bool = False):  # noqa: FBT001, FBT002
+        """Poll the data.
+
+        The data is shared with the other sessions with the same credentials, it is only loaded if it is older than the
+        ttl of the cache and by one session at a time. With full, all shifts are downloaded again even if the data is
+        fresh.
+        """
         async with self:
             if self.is_loading:
                 return
             self.is_loading = True
             auth = (await self.get_state(states.OAuthSessionState)).get_auth()
+            progress = download.DownloadProgress()
+            self._set_download_progress(progress)
+        last_progress = time.monotonic()
+
+        async def on_progress():
+            nonlocal last_progress
+            if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+                last_progress = time.monotonic()
+                async with self:
+                    self._set_download_progress(progress)
+
         try:
-            async with (
-                factorialhr.ApiClient(constants.ENVIRONMENT_URL, auth=auth) as client,  # pyright: ignore[reportArgumentType]
-                anyio.create_task_group() as tg,
-            ):
-                tg.start_soon(self._load_teams, client)
-                tg.start_soon(self._load_employees, client)
-                tg.start_soon(self._load_shifts, client)
-                tg.start_soon(self._load_credentials, client)
+            # the credentials tell which company the session has access to
+            async with http_clients.api_client(auth) as client:
+                credentials = await tenant.load_credentials(client)
+            if credentials is None:
+                logging.getLogger(__name__).error('no credentials to load the data of')
+                return
+            cache_key = tenant.cache_key(credentials)
+            # the requests count towards the rate limit of the company
+            async with http_clients.api_client(
+                auth, tenant=str(credentials.company_id), event_hooks={'response': [progress.on_response]}
+            ) as client:
+                data = await _tenant_cache.fetch(
+                    cache_key,
+                    functools.partial(tenant.load, client, full=full, progress=progress, on_progress=on_progress),
+                    on_stale=functools.partial(self._show_stale_data, cache_key),
+                    reload=full,
+                )
         except Exception:
             logging.getLogger(__name__).exception('error loading data')
             raise
@@ -82,14 +132,15 @@ class DataState(rx.State):
             async with self:
                 self.is_loading = False
         async with self:
-            self.last_updated = datetime.datetime.now(tz=datetime.UTC)
-            logging.getLogger(__name__).info('data loaded')
+            self._set_download_progress(progress)
+            self._credentials = credentials
+            self._set_data(cache_key, data)
+            logging.getLogger(__name__).info('data of %s loaded', data.loaded_at)
 
     @rx.event
     def clear(self):
         """Clear the data."""
         self.last_updated = None
-        self._employees.clear()
-        self._teams.clear()
-        self._shifts.clear()
+        self.len_of_shifts = 0
+        self._cache_key = None
         self._credentials = None
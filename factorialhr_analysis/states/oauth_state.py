@@ -9,7 +9,7 @@ import httpx
 import pydantic
 import reflex as rx
 
-from factorialhr_analysis import constants, routes
+from factorialhr_analysis import constants, http_clients, routes
 
 
 class ApiSession(pydantic.BaseModel):
@@ -79,7 +79,7 @@ class OAuthSessionState(rx.State):
                     'redirect_uri': constants.REDIRECT_URI,
                 }
             )
-        async with httpx.AsyncClient() as client:
+        async with http_clients.client() as client:
             response = await client.post(
                 f'{constants.ENVIRONMENT_URL}/oauth/token',
                 data=data,
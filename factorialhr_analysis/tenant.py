@@ -0,0 +1,321 @@
+"""Data of a company, loaded once and shared by all sessions with the same credentials."""
+
+import collections
+import contextlib
+import dataclasses
+import datetime
+import hashlib
+import logging
+import sqlite3
+import typing
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterable
+
+import anyio
+import factorialhr
+import redis.asyncio
+import redis.exceptions
+
+from factorialhr_analysis import constants, download, scheduler, snapshot, working_time_verification
+
+REDIS_KEY_PREFIX = 'factorialhr_analysis:tenant'
+LOAD_TIMEOUT = 600  # seconds after which the lock of a load that did not finish is released
+
+
+def team_names_by_employee(teams: Iterable[factorialhr.Team]) -> dict[int, list[str]]:
+    """Map each employee id to the names of the teams the employee is a member of."""
+    team_names: dict[int, list[str]] = collections.defaultdict(list)
+    for team in teams:
+        for employee_id in team.employee_ids or ():
+            team_names[employee_id].append(team.name)
+    return dict(team_names)
+
+
+def cache_key(credentials: factorialhr.Credentials) -> str:
+    """Get the key of the data loaded with the credentials.
+
+    What the data contains depends on the permissions of the credentials, e.g. a user signed in with OAuth only sees
+    the employees the user has access to. So the data is only shared by sessions with the same credentials, e.g. the
+    same API key or the same signed in user, and not by all sessions of the company.
+    """
+    digest = hashlib.sha256(credentials.id.encode()).hexdigest()[:16]
+    return f'{credentials.company_id}_{digest}'
+
+
+@dataclasses.dataclass(frozen=True)
+class TenantData:
+    """Data of a company. It is shared between sessions and therefore never modified, but replaced."""
+
+    employees: dict[int, factorialhr.Employee]
+    teams: dict[int, factorialhr.Team]
+    team_names_by_employee: dict[int, list[str]]
+    shifts: working_time_verification.ShiftStore
+    shifts_synced_on: datetime.date | None  # day of the last download of the shifts
+    shifts_fully_synced_on: datetime.date | None  # day of the last download of all shifts
+    loaded_at: datetime.datetime
+
+    @classmethod
+    def empty(cls) -> typing.Self:
+        """Create data without any employees or shifts."""
+        return cls(
+            employees={},
+            teams={},
+            team_names_by_employee={},
+            shifts=working_time_verification.ShiftStore(),
+            shifts_synced_on=None,
+            shifts_fully_synced_on=None,
+            loaded_at=datetime.datetime.min.replace(tzinfo=datetime.UTC),
+        )
+
+    @classmethod
+    def from_snapshot(cls, saved: snapshot.Snapshot) -> typing.Self:
+        """Create the data from a snapshot. Builds the shift store, so better run it in a worker thread."""
+        return cls(
+            employees=saved.employees,
+            teams=saved.teams,
+            team_names_by_employee=team_names_by_employee(saved.teams.values()),
+            shifts=working_time_verification.ShiftStore(saved.shifts),
+            shifts_synced_on=saved.shifts_synced_on,
+            shifts_fully_synced_on=saved.shifts_fully_synced_on,
+            loaded_at=saved.saved_at,
+        )
+
+    def to_snapshot(self) -> snapshot.Snapshot:
+        """Get a snapshot of the data."""
+        return snapshot.Snapshot(
+            employees=self.employees,
+            teams=self.teams,
+            shifts=self.shifts.columns,
+            shifts_synced_on=self.shifts_synced_on,
+            shifts_fully_synced_on=self.shifts_fully_synced_on,
+            saved_at=self.loaded_at,
+        )
+
+
+async def load_credentials(api_client: factorialhr.ApiClient) -> factorialhr.Credentials | None:
+    """Load the credentials, which tell the company the client has access to."""
+    credentials = await factorialhr.CredentialsEndpoint(api_client).all()
+    return next(iter(credentials.data()), None)
+
+
+def sync_start(previous: TenantData | None, today: datetime.date) -> datetime.date | None:
+    """Get the first day of the shifts to download again, none to download all shifts.
+
+    Older shifts rarely change, so only the shifts of a moving window before the last sync are downloaded again. Once
+    the last download of all shifts is :data:`constants.FULL_SYNC_DAYS` old, all of them are downloaded again to pick
+    up the changes of older shifts as well.
+    """
+    if (
+        previous is None
+        or previous.shifts_synced_on is None
+        or previous.shifts_fully_synced_on is None
+        or today - previous.shifts_fully_synced_on >= datetime.timedelta(days=constants.FULL_SYNC_DAYS)
+    ):
+        return None
+    return previous.shifts_synced_on - datetime.timedelta(days=constants.SHIFT_SYNC_DAYS)
+
+
+async def load(
+    api_client: factorialhr.ApiClient,
+    previous: TenantData | None,
+    *,
+    full: bool = False,
+    progress: download.DownloadProgress | None = None,
+    on_progress: Callable[[], Awaitable[None]] | None = None,
+) -> TenantData:
+    """Load the data of a company.
+
+    :param previous: data loaded before, the shifts are only synchronized within a moving window before its last sync,
+        see :func:`sync_start`
+    :param full: download all shifts regardless of the previous data
+    :param progress: updated with the progress of the shift download
+    :param on_progress: called whenever a page of shifts was received
+    """
+    today = datetime.datetime.now(tz=datetime.UTC).date()
+    start = None if full else sync_start(previous, today)
+    params = {'start_on': start.isoformat()} if start is not None else {}
+    pages: list[working_time_verification.batch.ShiftColumns] = []
+    employees: list[factorialhr.Employee] = []
+    teams: list[factorialhr.Team] = []
+
+    async def on_page(shifts: Iterable[factorialhr.AttendanceShift]):
+        pages.append(working_time_verification.batch.ShiftColumns.from_attendances(shifts))
+        if on_progress is not None:
+            await on_progress()
+
+    async def load_shifts():
+        await download.download_pages(
+            factorialhr.ShiftsEndpoint(api_client),
+            on_page,
+            concurrency=constants.DOWNLOAD_CONCURRENCY,
+            params=params,
+            progress=progress,
+            extensions={'priority': scheduler.Priority.BULK},
+        )
+
+    async def load_employees():
+        employees.extend((await factorialhr.EmployeesEndpoint(api_client).all()).data())
+
+    async def load_teams():
+        teams.extend((await factorialhr.TeamsEndpoint(api_client).all()).data())
+
+    async with anyio.create_task_group() as tg:
+        tg.start_soon(load_shifts)
+        tg.start_soon(load_employees)
+        tg.start_soon(load_teams)
+    # pages are requested by offset, a shift moving between the requests of two pages is received with both of them
+    columns = working_time_verification.batch.ShiftColumns.concatenate(pages).drop_duplicates()
+    if previous is None or start is None:
+        store = await anyio.to_thread.run_sync(working_time_verification.ShiftStore, columns)
+        fully_synced_on = today
+    else:
+        # shifts of the window which were not downloaded again were deleted and are dropped
+        store = await anyio.to_thread.run_sync(previous.shifts.merge, columns, start)
+        fully_synced_on = previous.shifts_fully_synced_on
+    return TenantData(
+        employees={employee.id: employee for employee in employees},
+        teams={team.id: team for team in teams},
+        team_names_by_employee=team_names_by_employee(teams),
+        shifts=store,
+        shifts_synced_on=today,
+        shifts_fully_synced_on=fully_synced_on,
+        loaded_at=datetime.datetime.now(tz=datetime.UTC),
+    )
+
+
+class TenantCache:
+    """Cache of the data of each company, shared by all sessions of the backend process with the same credentials.
+
+    The data is kept by the key of the credentials it was loaded with, see :func:`cache_key`. Data younger than the ttl
+    is served from memory. Otherwise it is loaded by a single session at a time, sessions asking for the same key
+    meanwhile wait for and receive that data. With redis, the data and the lock are shared with the other backend
+    processes as well. The snapshots, if enabled, serve as base for the incremental synchronization of the shifts after
+    a restart.
+    """
+
+    def __init__(self, ttl: datetime.timedelta, *, redis_url: str = '', snapshot_directory: str = ''):
+        self._ttl = ttl
+        self._redis_url = redis_url
+        self._redis: redis.asyncio.Redis | None = None
+        self._snapshot_directory = snapshot_directory
+        self._entries: dict[str, TenantData] = {}
+        self._locks: dict[str, anyio.Lock] = collections.defaultdict(anyio.Lock)
+
+    def get(self, key: str) -> TenantData | None:
+        """Get the data of the key in memory, regardless of its age."""
+        return self._entries.get(key)
+
+    async def lookup(self, key: str) -> TenantData | None:
+        """Get the data of the key regardless of its age, from memory or else from the other backend processes."""
+        data = self._entries.get(key)
+        if data is None:
+            data = await self._load_shared(key)
+            if data is not None:
+                self._entries.setdefault(key, data)
+        return data
+
+    def is_fresh(self, data: TenantData) -> bool:
+        """Whether the data is younger than the ttl."""
+        return datetime.datetime.now(tz=datetime.UTC) - data.loaded_at < self._ttl
+
+    async def fetch(
+        self,
+        key: str,
+        load: Callable[[TenantData | None], Awaitable[TenantData]],
+        *,
+        on_stale: Callable[[TenantData], Awaitable[None]] | None = None,
+        reload: bool = False,
+    ) -> TenantData:
+        """Get the data of the key, loading it if there is no fresh data.
+
+        :param load: called with the stale data, if there is any, to load the data
+        :param on_stale: called with the stale data before it is loaded, e.g. to show it in the meantime
+        :param reload: load the data even if it is fresh
+        """
+        data = self._entries.get(key)
+        if not reload and data is not None and self.is_fresh(data):
+            return data
+        async with self._locks[key], self._shared_lock(key):
+            # another session may have loaded the data while waiting for the lock
+            data = self._newest(self._entries.get(key), await self._load_shared(key))
+            if reload or data is None or not self.is_fresh(data):
+                if data is not None and on_stale is not None:
+                    await on_stale(data)
+                data = await load(data)
+                await self._save_shared(key, data)
+            self._entries[key] = data
+            return data
+
+    @staticmethod
+    def _newest(*candidates: TenantData | None) -> TenantData | None:
+        return max(filter(None, candidates), key=lambda data: data.loaded_at, default=None)
+
+    def _redis_client(self) -> redis.asyncio.Redis | None:
+        if self._redis is None and self._redis_url:
+            self._redis = redis.asyncio.Redis.from_url(self._redis_url)
+        return self._redis
+
+    @contextlib.asynccontextmanager
+    async def _shared_lock(self, key: str) -> AsyncIterator[None]:
+        """Hold the lock of the key shared by the backend processes.
+
+        If redis fails, only the lock of this process is held, at worst the data is loaded once per process.
+        """
+        client = self._redis_client()
+        if client is None:
+            yield
+            return
+        lock = None
+        try:
+            lock = client.lock(f'{REDIS_KEY_PREFIX}:{key}:lock', timeout=LOAD_TIMEOUT)
+            await lock.acquire()
+        except redis.exceptions.RedisError:
+            logging.getLogger(__name__).exception('error locking the data of %s', key)
+            lock = None
+        try:
+            yield
+        finally:
+            if lock is not None:
+                try:
+                    await lock.release()
+                except redis.exceptions.RedisError:
+                    logging.getLogger(__name__).exception('error unlocking the data of %s', key)
+
+    async def _load_shared(self, key: str) -> TenantData | None:
+        """Load the data from redis or else from the snapshot."""
+        saved = None
+        client = self._redis_client()
+        if client is not None:
+            try:
+                payload = await client.get(f'{REDIS_KEY_PREFIX}:{key}')
+            except redis.exceptions.RedisError:
+                logging.getLogger(__name__).exception('error reading cached data of %s', key)
+            else:
+                saved = await anyio.to_thread.run_sync(snapshot.loads, payload) if payload is not None else None
+        if saved is None and self._snapshot_directory and key not in self._entries:
+            path = snapshot.snapshot_path(self._snapshot_directory, key)
+            saved = await anyio.to_thread.run_sync(snapshot.load, path)
+        if saved is None:
+            return None
+        current = self._entries.get(key)
+        if current is not None and current.loaded_at >= saved.saved_at:
+            return current
+        return await anyio.to_thread.run_sync(TenantData.from_snapshot, saved)
+
+    async def _save_shared(self, key: str, data: TenantData):
+        """Save the data to redis and to the snapshot."""
+        client = self._redis_client()
+        if client is None and not self._snapshot_directory:
+            return
+        saved = data.to_snapshot()
+        if client is not None:
+            payload = await anyio.to_thread.run_sync(snapshot.dumps, saved)
+            try:
+                await client.set(f'{REDIS_KEY_PREFIX}:{key}', payload, px=self._ttl)
+            except redis.exceptions.RedisError:
+                logging.getLogger(__name__).exception('error caching data of %s', key)
+        if self._snapshot_directory:
+            path = snapshot.snapshot_path(self._snapshot_directory, key)
+            try:
+                await anyio.to_thread.run_sync(snapshot.save, path, saved)
+            except (OSError, sqlite3.Error):
+                logging.getLogger(__name__).exception('error saving snapshot')
@@ -1,4 +1,25 @@
+from factorialhr_analysis.working_time_verification import batch, parallel, pipeline
+from factorialhr_analysis.working_time_verification.cache import CacheKey, ErrorCache
 from factorialhr_analysis.working_time_verification.helper import Error
-from factorialhr_analysis.working_time_verification.verification import get_error
+from factorialhr_analysis.working_time_verification.store import ShiftRecord, ShiftStore
+from factorialhr_analysis.working_time_verification.verification import (
+    average_period_start,
+    get_average_errors,
+    get_error,
+    get_error_incremental,
+)
 
-__all__ = ['Error', 'get_error']
+__all__ = [
+    'CacheKey',
+    'Error',
+    'ErrorCache',
+    'ShiftRecord',
+    'ShiftStore',
+    'average_period_start',
+    'batch',
+    'get_average_errors',
+    'get_error',
+    'get_error_incremental',
+    'parallel',
+    'pipeline',
+]
@@ -0,0 +1,85 @@
+"""Columnar representation of the attendances of many employees."""
+
+import dataclasses
+import datetime
+from collections.abc import Iterable
+
+import factorialhr
+import numpy as np
+import numpy.typing as npt
+
+MISSING = -1  # marker for a clock time that was not provided
+MINUTES_PER_DAY = 24 * 60
+
+
+def _to_minutes(time_: datetime.time | None) -> int:
+    """Convert a clock time to minutes since midnight, dropping the seconds like the verification does."""
+    return MISSING if time_ is None else time_.hour * 60 + time_.minute
+
+
+@dataclasses.dataclass(frozen=True)
+class ShiftColumns:
+    """Columnar representation of attendances.
+
+    Dates are proleptic Gregorian ordinals, clock times are minutes since midnight or :data:`MISSING`.
+    """
+
+    id: npt.NDArray[np.int64]
+    employee_id: npt.NDArray[np.int64]
+    date: npt.NDArray[np.int64]
+    clock_in: npt.NDArray[np.int64]
+    clock_out: npt.NDArray[np.int64]
+    minutes: npt.NDArray[np.int64]
+    workable: npt.NDArray[np.bool_]
+
+    def __len__(self) -> int:
+        """Get the number of attendances."""
+        return len(self.id)
+
+    @classmethod
+    def from_attendances(cls, attendances: Iterable[factorialhr.AttendanceShift]) -> 'ShiftColumns':
+        """Build the columns from attendance objects."""
+        rows = [
+            (
+                a.id,
+                a.employee_id,
+                a.date.toordinal(),
+                _to_minutes(a.clock_in),
+                _to_minutes(a.clock_out),
+                a.minutes,
+                bool(a.workable),
+            )
+            for a in attendances
+        ]
+        if not rows:
+            empty = np.empty(0, dtype=np.int64)
+            return cls(empty, empty, empty, empty, empty, empty, np.empty(0, dtype=np.bool_))
+        ids, employee_ids, dates, clock_ins, clock_outs, minutes, workable = zip(*rows, strict=True)
+        return cls(
+            id=np.array(ids, dtype=np.int64),
+            employee_id=np.array(employee_ids, dtype=np.int64),
+            date=np.array(dates, dtype=np.int64),
+            clock_in=np.array(clock_ins, dtype=np.int64),
+            clock_out=np.array(clock_outs, dtype=np.int64),
+            minutes=np.array(minutes, dtype=np.int64),
+            workable=np.array(workable, dtype=np.bool_),
+        )
+
+    @classmethod
+    def concatenate(cls, parts: Iterable['ShiftColumns']) -> 'ShiftColumns':
+        """Join the columns of several parts, e.g. of the pages of a download."""
+        parts = [cls.from_attendances([]), *parts]
+        return cls(
+            **{
+                field.name: np.concatenate([getattr(part, field.name) for part in parts])
+                for field in dataclasses.fields(cls)
+            }
+        )
+
+    def drop_duplicates(self) -> 'ShiftColumns':
+        """Keep only the last attendance of every id, e.g. if an attendance was received with two pages."""
+        _, last_reversed = np.unique(self.id[::-1], return_index=True)
+        if len(last_reversed) == len(self):
+            return self
+        keep = np.sort(len(self) - 1 - last_reversed)
+        return type(self)(**{field.name: getattr(self, field.name)[keep] for field in dataclasses.fields(self)})
@@ -0,0 +1,41 @@
+"""Cache of verification results."""
+
+import collections
+import datetime
+from collections.abc import Sequence
+
+from factorialhr_analysis.working_time_verification import helper
+
+# fingerprint of the verified shifts, first and last day of the verified range, the tolerance and whether errors were
+# consolidated
+CacheKey = tuple[bytes, datetime.date, datetime.date, datetime.timedelta | None, bool]
+
+
+class ErrorCache:
+    """Least recently used cache of the errors of one employee, keyed by what was verified."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: collections.OrderedDict[CacheKey, Sequence[helper.Error]] = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        """Get the number of cached results."""
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> Sequence[helper.Error] | None:
+        """Get the cached errors, if any."""
+        errors = self._entries.get(key)
+        if errors is not None:
+            self._entries.move_to_end(key)
+        return errors
+
+    def put(self, key: CacheKey, errors: Sequence[helper.Error]):
+        """Cache the errors and evict the least recently used ones if the cache is full."""
+        self._entries[key] = errors
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all cached errors."""
+        self._entries.clear()
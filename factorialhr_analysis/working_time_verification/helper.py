@@ -2,7 +2,9 @@
 
 import dataclasses
 import datetime
-from collections.abc import Iterable, Sequence
+import functools
+import typing
+from collections.abc import Iterable, Iterator, Sequence
 from collections.abc import Set as AbstractSet
 
 import factorialhr
@@ -25,6 +27,16 @@ def get_clock_in_and_clock_out(
     return clock_in, clock_out
 
 
+def chronological_order(
+    attendance: factorialhr.AttendanceShift,
+) -> tuple[datetime.date, datetime.time, datetime.time]:
+    """Sort key ordering attendances by date, clock in and clock out.
+
+    Missing clock times sort first so that incomplete attendances are reported before the complete ones of that day.
+    """
+    return attendance.date, attendance.clock_in or datetime.time.min, attendance.clock_out or datetime.time.min
+
+
 def calculate_time_attended(attendances: Iterable[factorialhr.AttendanceShift]) -> datetime.timedelta:
     """Calculate the time attended.
 
@@ -40,7 +52,7 @@ def calculate_break_time(attendances: Iterable[factorialhr.AttendanceShift]) ->
     :param attendances: list of attendances
     :return: time between attendances
     """
-    attendances = sorted(attendances, key=lambda x: datetime.datetime.combine(x.date, x.clock_in))
+    attendances = sorted(attendances, key=chronological_order)
     if not attendances:
         return datetime.timedelta(seconds=0)
 
@@ -59,24 +71,77 @@ def calculate_break_time(attendances: Iterable[factorialhr.AttendanceShift]) ->
     return break_time
 
 
+class AttendanceSpan(Sequence[factorialhr.AttendanceShift]):
+    """Read only view of consecutive attendances of a sequence without copying them.
+
+    The viewed sequence must not be changed within the span, appending to it is fine.
+    """
+
+    __slots__ = ('_attendances', '_start', '_stop')
+
+    def __init__(self, attendances: Sequence[factorialhr.AttendanceShift], start: int, stop: int):
+        self._attendances = attendances
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        """Get the number of attendances in the span."""
+        return self._stop - self._start
+
+    @typing.overload
+    def __getitem__(self, index: int) -> factorialhr.AttendanceShift: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> Sequence[factorialhr.AttendanceShift]: ...
+
+    def __getitem__(self, index: int | slice) -> factorialhr.AttendanceShift | Sequence[factorialhr.AttendanceShift]:
+        """Get the attendance at the index of the span."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if not -len(self) <= index < len(self):
+            msg = 'span index out of range'
+            raise IndexError(msg)
+        return self._attendances[self._start + index % len(self)]
+
+    def __iter__(self) -> Iterator[factorialhr.AttendanceShift]:
+        """Iterate over the attendances of the span."""
+        for index in range(self._start, self._stop):
+            yield self._attendances[index]
+
+    def __eq__(self, other: object) -> bool:
+        """Compare the attendances with those of another sequence."""
+        if not isinstance(other, Sequence):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other, strict=True))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        """Get the representation of the attendances."""
+        return f'{type(self).__name__}({list(self)!r})'
+
+
 @dataclasses.dataclass(frozen=True)
 class Error:
-    """Error found during verification."""
+    """Error found during verification.
+
+    Aggregates are calculated on first access and then kept, the attendances are usually an :class:`AttendanceSpan`.
+    """
 
     reason: str
     attendances: Sequence[factorialhr.AttendanceShift]
 
-    @property
+    @functools.cached_property
     def days_affected(self) -> AbstractSet[datetime.date]:
         """Get the days affected."""
         return {attendance.date for attendance in self.attendances}
 
-    @property
+    @functools.cached_property
     def break_time(self) -> datetime.timedelta:
         """Get the break time."""
         return calculate_break_time(self.attendances)
 
-    @property
+    @functools.cached_property
     def time_attended(self) -> datetime.timedelta:
         """Get the time attended."""
         return calculate_time_attended(self.attendances)
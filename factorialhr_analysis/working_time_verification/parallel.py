@@ -0,0 +1,94 @@
+"""Verification of the shifts of employees, in worker processes for many employees."""
+
+import datetime
+from collections.abc import Awaitable, Callable, Sequence
+
+import anyio
+import anyio.to_process
+
+from factorialhr_analysis.working_time_verification import batch, helper, store, verification
+
+ChunkResult = list[tuple[int, list[helper.Error]]]
+
+
+def verify_employee(  # noqa: PLR0913
+    shift_store: store.ShiftStore,
+    employee_id: int,
+    start: datetime.date,
+    end: datetime.date,
+    tolerance: datetime.timedelta | None,
+    *,
+    consolidate: bool = False,
+) -> list[helper.Error]:
+    """Verify the shifts of an employee between start and end, both inclusive, against all rules.
+
+    The average working time also takes the shifts since :func:`verification.average_period_start` into account, the
+    store has to contain them.
+
+    :param consolidate: passed on to :func:`verification.get_error_incremental`
+    """
+    return [
+        *verification.get_error_incremental(
+            shift_store.of_employee(employee_id, start, end),  # pyright: ignore[reportArgumentType]
+            tolerance,
+            consolidate=consolidate,
+            detect_overlaps=True,
+        ),
+        *verification.get_average_errors(
+            shift_store.of_employee(employee_id, verification.average_period_start(start), end),  # pyright: ignore[reportArgumentType]
+            tolerance,
+            since=start,
+        ),
+    ]
+
+
+def verify_employees(  # noqa: PLR0913
+    columns: batch.ShiftColumns,
+    employee_ids: Sequence[int],
+    start: datetime.date,
+    end: datetime.date,
+    tolerance: datetime.timedelta | None,
+    consolidate: bool = False,  # noqa: FBT001, FBT002
+) -> ChunkResult:
+    """Verify each employee with :func:`verify_employee`.
+
+    Runs in a worker process, the shifts are received as columns because they pickle a lot smaller than records.
+    """
+    shift_store = store.ShiftStore(columns)
+    return [
+        (employee_id, verify_employee(shift_store, employee_id, start, end, tolerance, consolidate=consolidate))
+        for employee_id in employee_ids
+    ]
+
+
+async def verify_in_processes(  # noqa: PLR0913
+    shift_store: store.ShiftStore,
+    employee_ids: Sequence[int],
+    start: datetime.date,
+    end: datetime.date,
+    tolerance: datetime.timedelta | None,
+    on_result: Callable[[ChunkResult], Awaitable[None]],
+    *,
+    workers: int,
+    chunk_size: int,
+    consolidate: bool = False,
+):
+    """Verify the shifts of the employees between start and end in chunks on a pool of worker processes.
+
+    :param on_result: called with the errors of every employee of a chunk as soon as the chunk is verified
+    :param workers: maximum number of chunks verified at the same time
+    :param chunk_size: number of employees per chunk
+    :param consolidate: passed on to :func:`verification.get_error_incremental`
+    """
+    limiter = anyio.CapacityLimiter(workers)
+
+    async def run(chunk: Sequence[int]):
+        columns = shift_store.columns_of_employees(chunk, verification.average_period_start(start), end)
+        result = await anyio.to_process.run_sync(
+            verify_employees, columns, chunk, start, end, tolerance, consolidate, limiter=limiter
+        )
+        await on_result(result)
+
+    async with anyio.create_task_group() as tg:
+        for index in range(0, len(employee_ids), chunk_size):
+            tg.start_soon(run, employee_ids[index : index + chunk_size])
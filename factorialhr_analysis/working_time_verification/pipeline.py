@@ -0,0 +1,167 @@
+"""Verification of a company, from the store of its shifts to the errors and the hours per period."""
+
+import collections
+import dataclasses
+import datetime
+import functools
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+
+import anyio.to_thread
+import factorialhr
+
+from factorialhr_analysis.working_time_verification import cache, parallel, store, verification
+
+
+@dataclasses.dataclass(frozen=True)
+class PeriodTotals:
+    """Time attended per period and in total and the cumulated break of an employee or a group of employees."""
+
+    name: str
+    hours: list[datetime.timedelta]  # one entry per period
+    total: datetime.timedelta
+    break_time: datetime.timedelta
+
+
+def months(start: datetime.date, end: datetime.date) -> list[tuple[datetime.date, datetime.date]]:
+    """Split the range from start to end, both inclusive, at the start of every month."""
+    periods = []
+    first = start
+    while first <= end:
+        next_month = (first.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        periods.append((first, min(end, next_month - datetime.timedelta(days=1))))
+        first = next_month
+    return periods
+
+
+def period_totals(
+    shift_store: store.ShiftStore,
+    employees: Sequence[factorialhr.Employee],
+    team_names: Mapping[int, Sequence[str]],
+    start: datetime.date,
+    end: datetime.date,
+) -> tuple[list[str], list[PeriodTotals]]:
+    """Sum up the hours attended per month by all employees, by every team and by every employee.
+
+    :return: names of the periods and the totals of all employees, followed by the totals of every team and of every
+        employee
+    """
+    periods = months(start, end)
+
+    def group_totals(name: str, employee_ids: Sequence[int]) -> PeriodTotals:
+        group = shift_store.group(employee_ids)
+        time_attended, break_time = group.totals(start, end)
+        return PeriodTotals(
+            name=name,
+            hours=[group.totals(first, last)[0] for first, last in periods],
+            total=time_attended,
+            break_time=break_time,
+        )
+
+    def employee_totals(employee: factorialhr.Employee) -> PeriodTotals:
+        return PeriodTotals(
+            name=employee.full_name,
+            hours=[shift_store.time_attended(employee.id, first, last) for first, last in periods],
+            total=shift_store.time_attended(employee.id, start, end),
+            break_time=shift_store.break_time(employee.id, start, end),
+        )
+
+    members: dict[str, list[int]] = collections.defaultdict(list)
+    for employee in employees:
+        for team_name in team_names.get(employee.id, []):
+            members[team_name].append(employee.id)
+    totals = [group_totals('All employees', [employee.id for employee in employees])]
+    totals.extend(group_totals(f'Team {team_name}', member_ids) for team_name, member_ids in sorted(members.items()))
+    totals.extend(employee_totals(employee) for employee in employees)
+    return [f'{first:%Y-%m}' for first, _ in periods], totals
+
+
+def _verify_chunk(  # noqa: PLR0913
+    shift_store: store.ShiftStore,
+    employee_ids: Sequence[int],
+    start: datetime.date,
+    end: datetime.date,
+    tolerance: datetime.timedelta | None,
+    *,
+    consolidate: bool,
+) -> parallel.ChunkResult:
+    return [
+        (
+            employee_id,
+            parallel.verify_employee(shift_store, employee_id, start, end, tolerance, consolidate=consolidate),
+        )
+        for employee_id in employee_ids
+    ]
+
+
+async def verify_company(  # noqa: PLR0913
+    shift_store: store.ShiftStore,
+    employees: Sequence[factorialhr.Employee],
+    team_names: Mapping[int, Sequence[str]],
+    start: datetime.date,
+    end: datetime.date,
+    tolerance: datetime.timedelta | None,
+    on_result: Callable[[parallel.ChunkResult], Awaitable[None]],
+    *,
+    error_cache: cache.ErrorCache,
+    consolidate: bool = False,
+    workers: int = 1,
+    chunk_size: int = 250,
+) -> tuple[list[str], list[PeriodTotals]]:
+    """Verify the shifts of the employees between start and end, both inclusive, and sum up their hours per period.
+
+    Employees whose shifts did not change since a verification of the same range are taken from the cache. The others
+    are verified in chunks, on a pool of worker processes if there are several workers and in a worker thread
+    otherwise, and cached. The event loop is not blocked by any of the steps.
+
+    :param on_result: called with the errors of every employee of a chunk as soon as the chunk is verified
+    :param error_cache: errors of the employees by what was verified
+    :param consolidate: passed on to :func:`verification.get_error_incremental`
+    :param workers: maximum number of chunks verified at the same time in worker processes
+    :param chunk_size: number of employees per chunk
+    :return: names of the periods and the totals, see :func:`period_totals`
+    """
+    # the shifts before start count towards the average working time
+    history_start = verification.average_period_start(start)
+
+    def cache_keys() -> dict[int, cache.CacheKey]:
+        return {
+            employee.id: (shift_store.fingerprint(employee.id, history_start, end), start, end, tolerance, consolidate)
+            for employee in employees
+        }
+
+    keys = await anyio.to_thread.run_sync(cache_keys)
+    cached: parallel.ChunkResult = []
+    uncached: list[int] = []
+    for employee in employees:
+        errors = error_cache.get(keys[employee.id])
+        if errors is None:
+            uncached.append(employee.id)
+        else:
+            cached.append((employee.id, list(errors)))
+    await on_result(cached)
+
+    async def cache_result(result: parallel.ChunkResult):
+        for employee_id, errors in result:
+            error_cache.put(keys[employee_id], errors)
+        await on_result(result)
+
+    if workers > 1:
+        await parallel.verify_in_processes(
+            shift_store,
+            uncached,
+            start,
+            end,
+            tolerance,
+            cache_result,
+            workers=workers,
+            chunk_size=chunk_size,
+            consolidate=consolidate,
+        )
+    else:
+        for index in range(0, len(uncached), chunk_size):
+            chunk = uncached[index : index + chunk_size]
+            verify_chunk = functools.partial(
+                _verify_chunk, shift_store, chunk, start, end, tolerance, consolidate=consolidate
+            )
+            await cache_result(await anyio.to_thread.run_sync(verify_chunk))
+    return await anyio.to_thread.run_sync(period_totals, shift_store, employees, team_names, start, end)
@@ -0,0 +1,306 @@
+"""Compact storage of attendance shifts."""
+
+import collections
+import dataclasses
+import datetime
+import hashlib
+import threading
+import typing
+from collections.abc import Iterable, Sequence
+
+import factorialhr
+import numpy as np
+import numpy.typing as npt
+
+from factorialhr_analysis.working_time_verification import batch
+
+GROUP_CACHE_SIZE = 64  # groups of employees whose totals per day are kept by a store
+
+
+def _to_time(minutes: int) -> datetime.time | None:
+    return None if minutes == batch.MISSING else datetime.time(*divmod(minutes, 60))
+
+
+def _cumulated(values: npt.NDArray[np.int64]) -> npt.NDArray[np.int64]:
+    return np.concatenate(([0], np.cumsum(values))).astype(np.int64)
+
+
+class GroupTotals:
+    """Time attended and time between shifts of a group of employees, e.g. a team or the whole company.
+
+    Both are summed per day once, so the totals of any date range take constant time instead of two binary searches
+    per employee. Like :meth:`ShiftStore.break_time`, a break only counts if the shifts before and after it both lie in
+    the range. The breaks crossing the first day of the range are summed per day as well and subtracted, the few
+    breaks spanning the whole range are found by their length and added back.
+    """
+
+    def __init__(
+        self,
+        days: npt.NDArray[np.int64],
+        minutes: npt.NDArray[np.int64],
+        gaps: npt.NDArray[np.int64],
+        previous_days: npt.NDArray[np.int64],
+    ):
+        """Sum the shifts of the group.
+
+        :param days: ordinal dates of the shifts
+        :param minutes: minutes attended of every shift
+        :param gaps: minutes between every shift and the previous valid shift of its employee
+        :param previous_days: ordinal dates of the previous valid shift of the employee of every shift with a gap
+        """
+        self._first_day = int(days.min()) if len(days) else 0
+        self._size = int(days.max()) - self._first_day + 1 if len(days) else 0
+        offsets = days - self._first_day
+        self._minutes = _cumulated(np.bincount(offsets, weights=minutes, minlength=self._size).astype(np.int64))
+        self._gaps = _cumulated(np.bincount(offsets, weights=gaps, minlength=self._size).astype(np.int64))
+        has_gap = gaps > 0
+        # a break covers the days after its previous shift up to the day of its shift
+        first_days = previous_days[has_gap] - self._first_day + 1
+        last_days = offsets[has_gap]
+        weights = gaps[has_gap]
+        self._crossing = np.cumsum(
+            np.bincount(first_days, weights=weights, minlength=self._size + 1)
+            - np.bincount(last_days + 1, weights=weights, minlength=self._size + 1)
+        ).astype(np.int64)
+        order = np.argsort(last_days - first_days, kind='stable')[::-1]
+        self._break_lengths = (last_days - first_days)[order]
+        self._break_first_days = first_days[order]
+        self._break_last_days = last_days[order]
+        self._break_minutes = weights[order]
+
+    def totals(
+        self, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> tuple[datetime.timedelta, datetime.timedelta]:
+        """Get the time attended and the time between shifts, optionally between start and end, both inclusive."""
+        first = min(max(start.toordinal() - self._first_day, 0), self._size) if start is not None else 0
+        stop = min(max(end.toordinal() - self._first_day + 1, 0), self._size) if end is not None else self._size
+        if stop <= first:
+            return datetime.timedelta(), datetime.timedelta()
+        minutes = self._minutes[stop] - self._minutes[first]
+        gaps = self._gaps[stop] - self._gaps[first] - self._crossing[first]
+        # breaks crossing the first day which also end after the last day were not part of the gaps of the range
+        spanning = int(np.searchsorted(-self._break_lengths, -(stop - first), side='right'))
+        mask = (self._break_first_days[:spanning] <= first) & (self._break_last_days[:spanning] >= stop)
+        gaps += self._break_minutes[:spanning][mask].sum()
+        return datetime.timedelta(minutes=int(minutes)), datetime.timedelta(minutes=int(gaps))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ShiftRecord:
+    """Attendance shift reduced to the fields needed for verification and display."""
+
+    id: int
+    employee_id: int
+    date: datetime.date
+    clock_in: datetime.time | None
+    clock_out: datetime.time | None
+    minutes: int
+    workable: bool
+
+
+class ShiftStore(Sequence[ShiftRecord]):
+    """Attendance shifts stored column wise, sorted by employee and chronologically.
+
+    Only the columns of :class:`batch.ShiftColumns` are kept, which takes about 60 bytes per shift. Records are created
+    on access and seconds of the clock times are dropped. Prefix sums of the time attended and of the breaks between
+    shifts are built once, so the totals of any employee and date range take two binary searches.
+    """
+
+    def __init__(self, columns: batch.ShiftColumns | None = None):
+        columns = columns if columns is not None else batch.ShiftColumns.from_attendances([])
+        order = np.lexsort((columns.clock_out, columns.clock_in, columns.date, columns.employee_id))
+        self._columns = batch.ShiftColumns(
+            **{field.name: getattr(columns, field.name)[order] for field in dataclasses.fields(columns)}
+        )
+        self._id_order = np.argsort(self._columns.id, kind='stable')
+        self._sorted_ids = self._columns.id[self._id_order]
+        self._cumulated_minutes, self._cumulated_gaps, self._next_active, self._previous_days = self._prefix_sums(
+            self._columns
+        )
+        self._groups: collections.OrderedDict[tuple[int, ...], GroupTotals] = collections.OrderedDict()
+        self._groups_lock = threading.Lock()
+
+    @staticmethod
+    def _prefix_sums(
+        columns: batch.ShiftColumns,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Calculate the prefix sums of the minutes of valid workable shifts and of the gaps before them.
+
+        The gap before a shift is measured to the clock out of the previous valid workable shift of the employee, like
+        :func:`helper.calculate_break_time` does. Shifts with missing or invalid clock times count neither minutes nor
+        a gap, so both sums cover the same shifts.
+
+        :return: both prefix sums, the position of the next valid workable shift at or after every position and the date
+            of the previous valid workable shift of the employee, -1 if there is none
+        """
+        size = len(columns)
+        active = (
+            (columns.clock_in != batch.MISSING)
+            & (columns.clock_out != batch.MISSING)
+            & (columns.clock_out > columns.clock_in)
+            & columns.workable
+        )
+        day = columns.date * batch.MINUTES_PER_DAY
+        previous = np.full(size, -1, dtype=np.int64)
+        previous[1:] = np.maximum.accumulate(np.where(active, np.arange(size), -1))[:-1]
+        has_previous = active & (previous >= 0)
+        has_previous[has_previous] = columns.employee_id[previous[has_previous]] == columns.employee_id[has_previous]
+        gaps = np.zeros(size, dtype=np.int64)
+        gaps[has_previous] = np.maximum(
+            (day + columns.clock_in)[has_previous] - (day + columns.clock_out)[previous[has_previous]], 0
+        )
+        minutes = np.where(active, columns.minutes, 0)
+        next_active = np.minimum.accumulate(np.where(np.append(active, True), np.arange(size + 1), size)[::-1])[::-1]
+        previous_days = np.full(size, -1, dtype=np.int64)
+        previous_days[has_previous] = columns.date[previous[has_previous]]
+        return _cumulated(minutes), _cumulated(gaps), next_active, previous_days
+
+    @classmethod
+    def from_attendances(cls, attendances: Iterable[factorialhr.AttendanceShift]) -> typing.Self:
+        """Build the store from attendance objects."""
+        return cls(batch.ShiftColumns.from_attendances(attendances))
+
+    def merge(self, delta: batch.ShiftColumns, start: datetime.date, end: datetime.date | None = None) -> typing.Self:
+        """Get a store with the shifts between start and end, both inclusive, replaced by the shifts of the delta.
+
+        Shifts of the range that are not part of the delta are dropped as deleted, shifts outside of the range with the
+        id of a shift of the delta are replaced as well. Of shifts with the same id in the delta, the last one is kept.
+        """
+        delta = delta.drop_duplicates()
+        dates = self._columns.date
+        keep = (dates < start.toordinal()) | (dates > end.toordinal() if end is not None else False)
+        keep &= ~np.isin(self._columns.id, delta.id)
+        kept = batch.ShiftColumns(
+            **{field.name: getattr(self._columns, field.name)[keep] for field in dataclasses.fields(self._columns)}
+        )
+        return type(self)(batch.ShiftColumns.concatenate((kept, delta)))
+
+    @property
+    def columns(self) -> batch.ShiftColumns:
+        """Get the columns in the order of the records."""
+        return self._columns
+
+    def __len__(self) -> int:
+        """Get the number of shifts."""
+        return len(self._columns)
+
+    @typing.overload
+    def __getitem__(self, index: int) -> ShiftRecord: ...
+
+    @typing.overload
+    def __getitem__(self, index: slice) -> Sequence[ShiftRecord]: ...
+
+    def __getitem__(self, index: int | slice) -> ShiftRecord | Sequence[ShiftRecord]:
+        """Get the record at the index."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        columns = self._columns
+        return ShiftRecord(
+            id=int(columns.id[index]),
+            employee_id=int(columns.employee_id[index]),
+            date=datetime.date.fromordinal(int(columns.date[index])),
+            clock_in=_to_time(int(columns.clock_in[index])),
+            clock_out=_to_time(int(columns.clock_out[index])),
+            minutes=int(columns.minutes[index]),
+            workable=bool(columns.workable[index]),
+        )
+
+    def get(self, shift_id: int) -> ShiftRecord | None:
+        """Get a shift by its id."""
+        position = int(np.searchsorted(self._sorted_ids, shift_id))
+        if position == len(self._sorted_ids) or self._sorted_ids[position] != shift_id:
+            return None
+        return self[int(self._id_order[position])]
+
+    def rows_of_employee(
+        self, employee_id: int, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> range:
+        """Get the positions of the shifts of an employee, optionally between start and end, both inclusive."""
+        low = int(np.searchsorted(self._columns.employee_id, employee_id, side='left'))
+        high = int(np.searchsorted(self._columns.employee_id, employee_id, side='right'))
+        dates = self._columns.date[low:high]
+        first = int(np.searchsorted(dates, start.toordinal(), side='left')) if start is not None else 0
+        last = int(np.searchsorted(dates, end.toordinal(), side='right')) if end is not None else len(dates)
+        return range(low + first, low + last)
+
+    def of_employee(
+        self, employee_id: int, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> Sequence[ShiftRecord]:
+        """Get the chronologically sorted shifts of an employee, optionally between start and end, both inclusive."""
+        rows = self.rows_of_employee(employee_id, start, end)
+        return self[rows.start : rows.stop]
+
+    def time_attended(
+        self, employee_id: int, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> datetime.timedelta:
+        """Get the time attended by an employee, optionally between start and end, both inclusive."""
+        rows = self.rows_of_employee(employee_id, start, end)
+        return datetime.timedelta(minutes=int(self._cumulated_minutes[rows.stop] - self._cumulated_minutes[rows.start]))
+
+    def break_time(
+        self, employee_id: int, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> datetime.timedelta:
+        """Get the time between the shifts of an employee, optionally between start and end, both inclusive."""
+        rows = self.rows_of_employee(employee_id, start, end)
+        first = int(self._next_active[rows.start]) if rows else rows.stop
+        if first >= rows.stop:
+            return datetime.timedelta()
+        # the gap before the first valid shift of the range lies outside of it
+        return datetime.timedelta(minutes=int(self._cumulated_gaps[rows.stop] - self._cumulated_gaps[first + 1]))
+
+    def group(self, employee_ids: Iterable[int]) -> GroupTotals:
+        """Get the totals of a group of employees, e.g. of a team or the whole company.
+
+        The totals of the least recently used groups are kept, so the groups of a store are summed once.
+        """
+        key = tuple(sorted(set(employee_ids)))
+        with self._groups_lock:
+            group = self._groups.get(key)
+            if group is not None:
+                self._groups.move_to_end(key)
+                return group
+        positions = self._positions(self.rows_of_employee(employee_id) for employee_id in key)
+        group = GroupTotals(
+            self._columns.date[positions],
+            np.diff(self._cumulated_minutes)[positions],
+            np.diff(self._cumulated_gaps)[positions],
+            self._previous_days[positions],
+        )
+        with self._groups_lock:
+            self._groups[key] = group
+            while len(self._groups) > GROUP_CACHE_SIZE:
+                self._groups.popitem(last=False)
+        return group
+
+    def totals(
+        self, employee_ids: Iterable[int], start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> tuple[datetime.timedelta, datetime.timedelta]:
+        """Get the time attended and the time between shifts of employees, e.g. of a team or the whole company."""
+        return self.group(employee_ids).totals(start, end)
+
+    @staticmethod
+    def _positions(rows: Iterable[range]) -> npt.NDArray[np.int64]:
+        ranges = [np.arange(r.start, r.stop) for r in rows]
+        return np.concatenate(ranges) if ranges else np.empty(0, dtype=np.int64)
+
+    def columns_of_employees(
+        self, employee_ids: Iterable[int], start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> batch.ShiftColumns:
+        """Get the columns of the shifts of the employees, optionally between start and end, both inclusive."""
+        positions = self._positions(self.rows_of_employee(employee_id, start, end) for employee_id in employee_ids)
+        return batch.ShiftColumns(
+            **{field.name: getattr(self._columns, field.name)[positions] for field in dataclasses.fields(self._columns)}
+        )
+
+    def fingerprint(
+        self, employee_id: int, start: datetime.date | None = None, end: datetime.date | None = None
+    ) -> bytes:
+        """Get a digest of the shifts of an employee, optionally between start and end, both inclusive.
+
+        The digest changes whenever a shift of the employee in that range is added, removed or changed.
+        """
+        rows = self.rows_of_employee(employee_id, start, end)
+        digest = hashlib.blake2b(str(employee_id).encode(), digest_size=16)
+        for field in dataclasses.fields(self._columns):
+            digest.update(getattr(self._columns, field.name)[rows.start : rows.stop].tobytes())
+        return digest.digest()
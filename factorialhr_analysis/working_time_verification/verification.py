@@ -1,6 +1,11 @@
 """Module to verify working time regulations based on attendances."""
 
+import calendar
+import collections
+import dataclasses
 import datetime
+import itertools
+import operator
 from collections.abc import Iterable, Iterator
 
 import factorialhr
@@ -8,11 +13,14 @@ import factorialhr
 from factorialhr_analysis.working_time_verification import helper
 
 HOURS_6 = datetime.timedelta(hours=6)
+HOURS_8 = datetime.timedelta(hours=8)
 HOURS_9 = datetime.timedelta(hours=9)
 HOURS_10 = datetime.timedelta(hours=10)
 HOURS_11 = datetime.timedelta(hours=11)
 MINUTES_30 = datetime.timedelta(minutes=30)
 MINUTES_45 = datetime.timedelta(minutes=45)
+AVERAGE_PERIOD = datetime.timedelta(weeks=24)
+WORKDAYS_PER_WEEK = 6  # monday to saturday
 
 SIX_AM = datetime.time(hour=6, minute=0, second=0)
 TEN_PM = datetime.time(hour=22, minute=0, second=0)
@@ -52,21 +60,34 @@ def calculate_break(
     return datetime.timedelta(seconds=0)
 
 
-def check_breaks_and_reset(
-    current_attendances: list[factorialhr.AttendanceShift], tolerance: datetime.timedelta
-) -> tuple[helper.Error | None, bool]:
-    """Check for legal break durations and determines if attendances should be reset."""
-    cumulated_time_attended = helper.calculate_time_attended(current_attendances)
-    cumulated_break_time = helper.calculate_break_time(current_attendances)
+def evaluate_breaks(
+    time_attended: datetime.timedelta, break_time: datetime.timedelta, tolerance: datetime.timedelta
+) -> tuple[str | None, bool]:
+    """Evaluate the break rules for the cumulated time attended and break time of a window.
+
+    :return: reason of the violated rule, if any, and whether the window has to be reset
+    """
     reason = None
     reset = False
-    if cumulated_time_attended > HOURS_6 + tolerance and cumulated_break_time < MINUTES_30:
+    if time_attended > HOURS_6 + tolerance and break_time < MINUTES_30:
         reason = 'Attended more than 6 hours without a cumulated break of 30 min'
-    if cumulated_time_attended > HOURS_9 + tolerance and cumulated_break_time < MINUTES_45:
+    if time_attended > HOURS_9 + tolerance and break_time < MINUTES_45:
         reason = 'Attended more than 9 hours without a cumulated break of 45 min'
-    if cumulated_time_attended > HOURS_10 + tolerance and cumulated_break_time < HOURS_11:
+    if time_attended > HOURS_10 + tolerance and break_time < HOURS_11:
         reason = 'Attended more than 10 hours without a single break of 11 hours'
         reset = True
+    return reason, reset
+
+
+def check_breaks_and_reset(
+    current_attendances: list[factorialhr.AttendanceShift], tolerance: datetime.timedelta
+) -> tuple[helper.Error | None, bool]:
+    """Check for legal break durations and determines if attendances should be reset."""
+    reason, reset = evaluate_breaks(
+        helper.calculate_time_attended(current_attendances),
+        helper.calculate_break_time(current_attendances),
+        tolerance,
+    )
     return helper.Error(reason=reason, attendances=current_attendances[:]) if reason else None, reset
 
 
@@ -90,7 +111,7 @@ def get_error(
         if not attendance.workable:
             continue  # Declared as a break, skip
         # Ensure correct order
-        current_attendances.sort(key=lambda x: (x.clock_out, x.clock_out))
+        current_attendances.sort(key=lambda x: helper.get_clock_in_and_clock_out(x)[1])
         # Check for early/late attendance
         yield from check_attendance_time(attendance, tolerance)
         clock_in, clock_out = helper.get_clock_in_and_clock_out(attendance)
@@ -106,3 +127,219 @@ def get_error(
             yield error
         if reset:
             current_attendances = [attendance]
+
+
+@dataclasses.dataclass(slots=True)
+class RunningWindow:
+    """Attendances between two rests of at least 11 hours together with their running totals.
+
+    Attendances have to be appended in chronological order, see :func:`helper.chronological_order`. Under that
+    precondition the totals equal :func:`helper.calculate_time_attended` and :func:`helper.calculate_break_time` of
+    the attendances while each update takes constant time. All appended attendances are kept in :attr:`history`, the
+    window is the part of it starting at :attr:`start`.
+    """
+
+    history: list[factorialhr.AttendanceShift] = dataclasses.field(default_factory=list)
+    start: int = 0
+    time_attended: datetime.timedelta = dataclasses.field(default_factory=datetime.timedelta)
+    break_time: datetime.timedelta = dataclasses.field(default_factory=datetime.timedelta)
+    last_clock_out: datetime.datetime | None = None
+    # clock out of the latest appended attendance, which calculate_break_time uses to measure the next gap
+    previous_clock_out: datetime.datetime | None = None
+
+    @property
+    def attendances(self) -> helper.AttendanceSpan:
+        """Get the attendances of the window without copying them."""
+        return helper.AttendanceSpan(self.history, self.start, len(self.history))
+
+    def break_before(self, clock_in: datetime.datetime) -> datetime.timedelta:
+        """Calculate the break between the latest clock out of the window and the given clock in."""
+        if self.last_clock_out is not None and clock_in > self.last_clock_out:
+            return clock_in - self.last_clock_out
+        return datetime.timedelta(seconds=0)
+
+    def append(
+        self, attendance: factorialhr.AttendanceShift, clock_in: datetime.datetime, clock_out: datetime.datetime
+    ):
+        """Append an attendance and update the running totals."""
+        if self.previous_clock_out is not None and clock_in > self.previous_clock_out:
+            self.break_time += clock_in - self.previous_clock_out
+        self.previous_clock_out = clock_out
+        if self.last_clock_out is None or clock_out > self.last_clock_out:
+            self.last_clock_out = clock_out
+        self.time_attended += datetime.timedelta(minutes=attendance.minutes)
+        self.history.append(attendance)
+
+    def reset(self):
+        """Start a new empty window."""
+        self.start = len(self.history)
+        self.time_attended = datetime.timedelta()
+        self.break_time = datetime.timedelta()
+        self.last_clock_out = None
+        self.previous_clock_out = None
+
+    def restart_at_last(self):
+        """Start a new window with the latest appended attendance only."""
+        self.start = len(self.history) - 1
+        self.time_attended = datetime.timedelta(minutes=self.history[-1].minutes)
+        self.break_time = datetime.timedelta()
+        self.last_clock_out = self.previous_clock_out
+
+
+@dataclasses.dataclass(slots=True)
+class OverlapSweep:
+    """Sweep line over attendances in chronological order finding the ones that overlap a previous attendance.
+
+    Only the attendance with the latest clock out so far has to be kept, an attendance overlaps a previous one exactly
+    if it clocks in before that clock out.
+    """
+
+    latest: factorialhr.AttendanceShift | None = None
+    latest_clock_out: datetime.datetime | None = None
+
+    def check(
+        self, attendance: factorialhr.AttendanceShift, clock_in: datetime.datetime, clock_out: datetime.datetime
+    ) -> helper.Error | None:
+        """Check whether the attendance overlaps a previous one and advance the sweep line."""
+        error = None
+        if self.latest is not None and self.latest_clock_out is not None and clock_in < self.latest_clock_out:
+            error = helper.Error('Attendance overlaps another attendance', [self.latest, attendance])
+        if self.latest_clock_out is None or clock_out > self.latest_clock_out:
+            self.latest, self.latest_clock_out = attendance, clock_out
+        return error
+
+
+def get_error_incremental(
+    attendances: Iterable[factorialhr.AttendanceShift],
+    tolerance: datetime.timedelta | None = None,
+    *,
+    consolidate: bool = False,
+    detect_overlaps: bool = False,
+) -> Iterator[helper.Error]:
+    """Verification function with running totals.
+
+    Yields the same errors as :func:`get_error` for attendances in chronological order, but keeps the time attended,
+    the cumulated break and the last clock out of the current window up to date instead of recalculating them for
+    every attendance. The attendances are sorted once up front, so the verification is linear in their number. Errors
+    refer to their attendances as spans of the sorted attendances instead of copies.
+
+    :param consolidate: yield only the last error of every break rule violated within a window instead of an error for
+        every attendance appended after the first violation
+    :param detect_overlaps: also report attendances overlapping a previous one, see :class:`OverlapSweep`
+    """
+    tolerance = tolerance or datetime.timedelta()
+    window = RunningWindow()
+    sweep = OverlapSweep()
+    pending: list[helper.Error] = []  # latest error of the current window, held back while it may be superseded
+    for attendance in sorted(attendances, key=helper.chronological_order):
+        error = validate_clock_times(attendance)
+        if error:
+            yield error
+            continue
+        clock_in, clock_out = helper.get_clock_in_and_clock_out(attendance)
+        overlap = sweep.check(attendance, clock_in, clock_out) if detect_overlaps else None
+        if overlap:
+            yield overlap
+        if not attendance.workable:
+            continue  # Declared as a break, skip
+        yield from check_attendance_time(attendance, tolerance)
+        if window.break_before(clock_in) >= HOURS_11:
+            yield from pending
+            pending.clear()
+            window.reset()
+        window.append(attendance, clock_in, clock_out)
+        reason, reset = evaluate_breaks(window.time_attended, window.break_time, tolerance)
+        if reason:
+            yield from (previous for previous in pending if previous.reason != reason)
+            pending[:] = [helper.Error(reason=reason, attendances=window.attendances)]
+        if reset or not consolidate:
+            yield from pending
+            pending.clear()
+        if reset:
+            window.restart_at_last()
+    yield from pending
+
+
+def count_workdays(start: datetime.date, end: datetime.date) -> int:
+    """Get the number of workdays (monday to saturday) from start to end, both included."""
+    weeks, days = divmod((end - start).days + 1, 7)
+    if weeks < 0:
+        return 0
+    # the remaining days are less than a week, so they contain at most one sunday
+    contains_sunday = (calendar.SUNDAY - start.weekday()) % 7 < days
+    return weeks * WORKDAYS_PER_WEEK + days - contains_sunday
+
+
+@dataclasses.dataclass(slots=True)
+class RollingAverage:
+    """Time attended per day within a sliding period together with its running total.
+
+    Days have to be added in ascending order. Days leaving the period are dropped when a later day is added, so every
+    update takes amortized constant time no matter how long the period is. The average only counts the workdays since
+    the first added day, so a short history is not compensated by days before it.
+    """
+
+    period: datetime.timedelta = AVERAGE_PERIOD
+    days: collections.deque[tuple[datetime.date, datetime.timedelta]] = dataclasses.field(
+        default_factory=collections.deque
+    )
+    total: datetime.timedelta = dataclasses.field(default_factory=datetime.timedelta)
+    first_day: datetime.date | None = None
+
+    @property
+    def average(self) -> datetime.timedelta:
+        """Get the average time attended per workday of the period ending at the latest added day."""
+        if self.first_day is None:
+            return datetime.timedelta()
+        last_day = self.days[-1][0]
+        start = max(self.first_day, last_day - self.period + datetime.timedelta(days=1))
+        return self.total / max(1, count_workdays(start, last_day))
+
+    def add(self, day: datetime.date, time_attended: datetime.timedelta):
+        """Add the time attended on a day and drop the days that left the period."""
+        while self.days and self.days[0][0] <= day - self.period:
+            self.total -= self.days.popleft()[1]
+        if self.first_day is None:
+            self.first_day = day
+        self.days.append((day, time_attended))
+        self.total += time_attended
+
+
+def average_period_start(start: datetime.date) -> datetime.date:
+    """Get the first day whose attendances are needed for the average working time from start on."""
+    return start - AVERAGE_PERIOD + datetime.timedelta(days=1)
+
+
+def get_average_errors(
+    attendances: Iterable[factorialhr.AttendanceShift],
+    tolerance: datetime.timedelta | None = None,
+    since: datetime.date | None = None,
+) -> Iterator[helper.Error]:
+    """Verify that days of more than 8 hours are compensated.
+
+    The working time may only be extended to 10 hours per day if it does not exceed 8 hours per workday on average
+    within 24 weeks. For every day attended more than 8 hours the average over the 24 weeks ending at that day is
+    checked, workdays without attendances count as not attended. Workdays before the first attendance are not counted,
+    so employees with a shorter history are checked over the workdays they have. The tolerance only applies to the
+    days, not to the average. Invalid attendances and declared breaks are ignored, they are reported by
+    :func:`get_error_incremental`.
+
+    :param since: only report days from this day on, earlier attendances only count towards the average
+    """
+    tolerance = tolerance or datetime.timedelta()
+    rolling_average = RollingAverage()
+    attended = sorted(
+        (a for a in attendances if a.workable and validate_clock_times(a) is None), key=helper.chronological_order
+    )
+    for day, group in itertools.groupby(attended, key=operator.attrgetter('date')):
+        day_attendances = list(group)
+        time_attended = helper.calculate_time_attended(day_attendances)
+        rolling_average.add(day, time_attended)
+        if (
+            (since is None or day >= since)
+            and time_attended > HOURS_8 + tolerance
+            and rolling_average.average > HOURS_8
+        ):
+            yield helper.Error(
+                reason='Attended more than 8 hours per workday on average within 24 weeks', attendances=day_attendances
+            )
@@ -0,0 +1,9 @@
+"""Shared fixtures of the tests."""
+
+import pytest
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    """Run async tests on asyncio only, which is what the backend uses."""
+    return 'asyncio'
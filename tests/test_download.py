@@ -0,0 +1,99 @@
+"""Unit tests for download module."""
+
+import typing
+from collections.abc import AsyncIterator, Iterable
+
+import anyio
+import factorialhr
+import httpx
+import pydantic
+import pytest
+
+from factorialhr_analysis import download
+
+
+class Record(pydantic.BaseModel):
+    """Record served by the fake endpoint."""
+
+    id: int
+
+
+class FakeEndpoint:
+    """Paginated endpoint serving numbered records."""
+
+    def __init__(self, total: int, limit: int):
+        self.total = total
+        self.limit = limit
+        self.requests: list[dict[str, typing.Any]] = []
+        self.running = 0
+        self.max_running = 0
+
+    async def get(self, **kwargs: typing.Any) -> factorialhr.MetaApiResponse[Record]:
+        """Get a page after a short delay."""
+        params = kwargs['params']
+        self.requests.append(params)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await anyio.sleep(0.01)
+        self.running -= 1
+        first = (params['page'] - 1) * self.limit
+        return factorialhr.MetaApiResponse(
+            raw_meta={
+                'limit': self.limit,
+                'total': self.total,
+                'has_next_page': first + self.limit < self.total,
+                'has_previous_page': first > 0,
+            },
+            raw_data=[{'id': i} for i in range(first, min(first + self.limit, self.total))],
+            model_type=Record,
+        )
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(('total', 'limit'), [(0, 10), (7, 10), (95, 10)])
+async def test_download_pages(total: int, limit: int) -> None:
+    """Every page is downloaded once with a bounded number of concurrent requests."""
+    endpoint = FakeEndpoint(total, limit)
+    progress = download.DownloadProgress()
+    received: list[int] = []
+
+    async def on_page(records: Iterable[Record]) -> None:
+        received.extend(record.id for record in records)
+
+    params = {'start_on': '2024-01-01'}
+    await download.download_pages(endpoint, on_page, concurrency=3, params=params, progress=progress)
+    assert sorted(received) == list(range(total))
+    assert progress.records == progress.total_records == total
+    assert endpoint.max_running <= 3  # noqa: PLR2004
+    assert all(request['start_on'] == '2024-01-01' for request in endpoint.requests)
+
+
+@pytest.mark.anyio
+async def test_download_progress_counts_the_bytes_of_the_responses() -> None:
+    """The bytes of every response received by the client are counted."""
+    progress = download.DownloadProgress()
+
+    async def stream(body: bytes) -> AsyncIterator[bytes]:
+        yield body
+
+    # streamed like the body of a real response, the bytes of a body given at once are not counted as downloaded
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=stream(request.url.path.encode())))
+    async with httpx.AsyncClient(transport=transport, event_hooks={'response': [progress.on_response]}) as client:
+        await client.get('https://example.com/abc')
+        await client.get('https://example.com/defgh')
+    assert progress.bytes == len('/abc') + len('/defgh')
+
+
+@pytest.mark.anyio
+async def test_download_pages_reports_the_final_count_with_the_last_page() -> None:
+    """When the last page is handed over, the progress counts all records."""
+    endpoint = FakeEndpoint(45, 10)
+    progress = download.DownloadProgress()
+    counts: list[int] = []
+
+    async def on_page(records: Iterable[Record]) -> None:  # noqa: ARG001
+        counts.append(progress.records)
+
+    await download.download_pages(endpoint, on_page, concurrency=2, progress=progress)
+    assert counts == sorted(counts)
+    assert counts[-1] == progress.total_records == 45  # noqa: PLR2004
@@ -0,0 +1,136 @@
+"""Unit tests for export module."""
+
+import csv
+import datetime as dt
+import io
+import xml.etree.ElementTree as ET
+import zipfile
+from collections.abc import Iterator
+
+import pytest
+import redis.exceptions
+
+from factorialhr_analysis import export
+
+COLUMNS: list[export.Column] = [('Name', str), ('Minutes', int), ('Comment', str)]
+ROWS: list[list[export.Cell]] = [['Ada', 480, None], ['Grace <Navy> & co', 0, 'late'], ['Alan', None, '"quoted"']]
+NAMESPACE = {'main': 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'}
+
+
+def _consumed_rows(rows: list[list[export.Cell]], consumed: list[int]) -> Iterator[list[export.Cell]]:
+    for i, row in enumerate(rows):
+        consumed.append(i)
+        yield row
+
+
+def test_csv() -> None:
+    """The rows are written with a header row."""
+    data = b''.join(export.write(export.Format.CSV, COLUMNS, ROWS)).decode()
+    assert list(csv.reader(io.StringIO(data))) == [
+        ['Name', 'Minutes', 'Comment'],
+        ['Ada', '480', ''],
+        ['Grace <Navy> & co', '0', 'late'],
+        ['Alan', '', '"quoted"'],
+    ]
+    assert b''.join(export.write(export.Format.CSV, COLUMNS, [])) == b'Name,Minutes,Comment\r\n'
+
+
+@pytest.mark.parametrize('file_format', [export.Format.CSV, export.Format.XLSX])
+def test_rows_are_consumed_while_writing(file_format: export.Format) -> None:
+    """Bytes are handed out after every batch, before the following rows are produced."""
+    consumed: list[int] = []
+    chunks = export.write(file_format, COLUMNS, _consumed_rows(ROWS * 10, consumed), batch_size=4)
+    next(chunks)
+    assert len(consumed) == 4  # noqa: PLR2004
+    assert sum(1 for _ in chunks) >= 7  # noqa: PLR2004
+
+
+def test_xlsx() -> None:
+    """The rows are written as inline strings and numbers to a sheet, cells without a value are left out."""
+    data = b''.join(export.write(export.Format.XLSX, COLUMNS, ROWS, batch_size=2))
+    with zipfile.ZipFile(io.BytesIO(data)) as workbook:
+        assert workbook.testzip() is None
+        sheet = ET.fromstring(workbook.read('xl/worksheets/sheet1.xml'))  # noqa: S314
+    cells = {
+        cell.attrib['r']: cell.findtext('main:v', namespaces=NAMESPACE)
+        or cell.findtext('main:is/main:t', namespaces=NAMESPACE)
+        for cell in sheet.iterfind('main:sheetData/main:row/main:c', NAMESPACE)
+    }
+    assert cells == {
+        'A1': 'Name',
+        'B1': 'Minutes',
+        'C1': 'Comment',
+        'A2': 'Ada',
+        'B2': '480',
+        'A3': 'Grace <Navy> & co',
+        'B3': '0',
+        'C3': 'late',
+        'A4': 'Alan',
+        'C4': '"quoted"',
+    }
+
+
+def test_column_names() -> None:
+    """Spreadsheet columns are named like A, ..., Z, AA, ..., ZZ, AAA."""
+    names = [export._column_name(i) for i in range(703)]  # noqa: SLF001
+    assert names[:3] == ['A', 'B', 'C']
+    assert names[25:28] == ['Z', 'AA', 'AB']
+    assert names[701:] == ['ZZ', 'AAA']
+    assert len(set(names)) == len(names)
+
+
+def test_parquet() -> None:
+    """The rows are written as row groups of the batch size."""
+    pq = pytest.importorskip('pyarrow.parquet')
+    data = b''.join(export.write(export.Format.PARQUET, COLUMNS, ROWS, batch_size=2))
+    parquet_file = pq.ParquetFile(io.BytesIO(data))
+    assert parquet_file.num_row_groups == 2  # noqa: PLR2004
+    assert parquet_file.read().to_pylist() == [
+        {'Name': name, 'Minutes': minutes, 'Comment': comment} for name, minutes, comment in ROWS
+    ]
+
+
+class FailingRedis:
+    """Redis client whose every command fails as if the server was unreachable."""
+
+    async def set(self, *_args: object, **_kwargs: object) -> bool:
+        """Fail to set a value."""
+        raise redis.exceptions.ConnectionError
+
+    async def getdel(self, *_args: object) -> bytes | None:
+        """Fail to get and delete a value."""
+        raise redis.exceptions.ConnectionError
+
+
+@pytest.mark.anyio
+async def test_pending_exports_are_taken_once() -> None:
+    """An export can be taken once, unknown exports are none."""
+    pending = export.PendingExports(dt.timedelta(minutes=1))
+    await pending.put('token', b'payload')
+    assert await pending.take('other') is None
+    assert await pending.take('token') == b'payload'
+    assert await pending.take('token') is None
+
+
+@pytest.mark.anyio
+async def test_pending_exports_expire(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Exports not taken within the ttl expire and are dropped when other exports are put."""
+    now = 1000.0
+    monkeypatch.setattr(export.time, 'monotonic', lambda: now)
+    pending = export.PendingExports(dt.timedelta(minutes=1))
+    await pending.put('first', b'first')
+    await pending.put('second', b'second')
+    now += 61
+    assert await pending.take('first') is None
+    await pending.put('third', b'third')
+    assert list(pending._entries) == ['third']  # noqa: SLF001
+
+
+@pytest.mark.anyio
+async def test_pending_exports_fall_back_to_the_process_without_redis() -> None:
+    """If redis fails, the exports are kept by the backend process."""
+    pending = export.PendingExports(dt.timedelta(minutes=1), redis_url='redis://localhost')
+    pending._redis = FailingRedis()  # type: ignore[assignment]  # noqa: SLF001
+    await pending.put('token', b'payload')
+    assert await pending.take('token') == b'payload'
+    assert await pending.take('token') is None
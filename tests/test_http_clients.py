@@ -0,0 +1,40 @@
+"""Unit tests for http_clients module."""
+
+import httpx
+import pytest
+
+from factorialhr_analysis import constants, http_clients
+
+
+class ClosingTransport(httpx.MockTransport):
+    """Mock transport remembering whether it was closed."""
+
+    closed = False
+
+    async def aclose(self) -> None:
+        """Remember the transport was closed."""
+        self.closed = True
+
+
+@pytest.mark.anyio
+async def test_shared_transport_outlives_clients() -> None:
+    """Clients use the pooled transport, which stays open when they are closed."""
+    pool = ClosingTransport(lambda request: httpx.Response(200, text=request.url.path))
+    for path in ('/first', '/second'):
+        async with httpx.AsyncClient(transport=http_clients.SharedTransport(pool)) as client:
+            assert (await client.get(f'https://example.com{path}')).text == path
+    assert not pool.closed
+
+
+@pytest.mark.anyio
+async def test_clients_share_the_pool() -> None:
+    """Every client sends its requests to the same pool, which is created again after it was closed."""
+    async with http_clients.client() as client:
+        assert client.timeout.connect == constants.HTTP_CONNECT_TIMEOUT
+    pool = http_clients._pool  # noqa: SLF001
+    assert pool is not None
+    async with http_clients.api_client(httpx.Auth(), tenant='1'):
+        pass
+    assert http_clients._pool is pool  # noqa: SLF001
+    await http_clients.close()
+    assert http_clients._pool is None  # noqa: SLF001
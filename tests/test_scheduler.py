@@ -0,0 +1,232 @@
+"""Unit tests for scheduler module."""
+
+import email.utils
+import json
+import time
+import typing
+from collections.abc import Iterable
+
+import anyio
+import anyio.lowlevel
+import factorialhr
+import httpx
+import pydantic
+import pytest
+
+from factorialhr_analysis import download, scheduler
+
+Scope = dict[str, typing.Any]
+Receive = typing.Callable[[], typing.Awaitable[dict[str, typing.Any]]]
+Send = typing.Callable[[dict[str, typing.Any]], typing.Awaitable[None]]
+
+
+class StandInServer:
+    """Local stand-in of the FactorialHR API serving paginated shifts.
+
+    The first request of every page is rate limited, further requests are answered after a short delay.
+    """
+
+    def __init__(self, total: int, limit: int, retry_after: str = '0.05'):
+        self.total = total
+        self.limit = limit
+        self.retry_after = retry_after
+        self.requests: list[tuple[str, str, str]] = []  # method, path and query of every request
+        self.limited_pages: set[int] = set()
+        self.status_code = 200  # status of the responses to non-get requests
+        self.gate: anyio.Event | None = None  # requests are held until it is set
+
+    async def __call__(self, scope: Scope, _: Receive, send: Send) -> None:
+        """Answer a request."""
+        query = scope['query_string'].decode()
+        self.requests.append((scope['method'], scope['path'], query))
+        if self.gate is not None:
+            await self.gate.wait()
+        await anyio.sleep(0.01)
+        if scope['method'] != 'GET':
+            await self._respond(send, self.status_code, {})
+            return
+        page = int(dict(item.split('=') for item in query.split('&'))['page'])
+        if page not in self.limited_pages:
+            self.limited_pages.add(page)
+            await self._respond(send, 429, {'error': 'rate limited'}, [(b'retry-after', self.retry_after.encode())])
+            return
+        first = (page - 1) * self.limit
+        await self._respond(
+            send,
+            200,
+            {
+                'meta': {
+                    'limit': self.limit,
+                    'total': self.total,
+                    'has_next_page': first + self.limit < self.total,
+                    'has_previous_page': first > 0,
+                },
+                'data': [{'id': i} for i in range(first, min(first + self.limit, self.total))],
+            },
+        )
+
+    @staticmethod
+    async def _respond(
+        send: Send, status: int, body: dict[str, typing.Any], headers: Iterable[tuple[bytes, bytes]] = ()
+    ) -> None:
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [(b'content-type', b'application/json'), *headers],
+            }
+        )
+        await send({'type': 'http.response.body', 'body': json.dumps(body).encode()})
+
+
+class Record(pydantic.BaseModel):
+    """Record served by the stand-in server."""
+
+    id: int
+
+
+class Endpoint:
+    """Paginated endpoint of the stand-in server."""
+
+    def __init__(self, api: factorialhr.ApiClient):
+        self.api = api
+
+    async def get(self, **kwargs: typing.Any) -> factorialhr.MetaApiResponse[Record]:
+        """Get a page of records."""
+        response = await self.api.get('attendance/shifts', **kwargs)
+        return factorialhr.MetaApiResponse(raw_meta=response['meta'], raw_data=response['data'], model_type=Record)
+
+
+def _scheduler(concurrency: int = 4, max_retries: int = 3, max_wait: float = 10) -> scheduler.RequestScheduler:
+    return scheduler.RequestScheduler(
+        concurrency=concurrency, max_retries=max_retries, backoff=0.01, max_backoff=0.1, max_wait=max_wait
+    )
+
+
+@pytest.mark.anyio
+async def test_rate_limited_download_is_retried() -> None:
+    """Every rate limited page is retried after the time the server asked for, so the download completes."""
+    server = StandInServer(total=45, limit=10)
+    transport = scheduler.ScheduledTransport(httpx.ASGITransport(app=server), _scheduler(), 'company')
+    received: list[int] = []
+
+    async def on_page(records: Iterable[Record]) -> None:
+        received.extend(record.id for record in records)
+
+    async with factorialhr.ApiClient(auth=httpx.Auth(), transport=transport) as api:
+        await download.download_pages(Endpoint(api), on_page, concurrency=3)
+    assert sorted(received) == list(range(45))
+    assert len(server.requests) == 10  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_retries_are_limited_and_only_for_idempotent_requests() -> None:
+    """Requests are given up after the maximum of retries, non-idempotent requests are not retried at all."""
+    server = StandInServer(total=10, limit=10)
+    server.limited_pages.clear()
+    sched = _scheduler(max_retries=0)
+    async with httpx.AsyncClient(
+        transport=scheduler.ScheduledTransport(httpx.ASGITransport(app=server), sched, 'company'),
+        base_url='https://factorial.test',
+    ) as client:
+        assert (await client.get('/shifts', params={'page': 1})).status_code == 429  # noqa: PLR2004
+        server.status_code = 503
+        assert (await client.post('/token')).status_code == 503  # noqa: PLR2004
+    assert len(server.requests) == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_requests_wait_for_the_rate_limit_of_their_tenant() -> None:
+    """After a rate limited response, further requests of the tenant wait, the ones of other tenants do not."""
+    server = StandInServer(total=10, limit=10, retry_after='0.3')
+    sched = _scheduler(max_retries=0)
+    inner = httpx.ASGITransport(app=server)
+    async with (
+        httpx.AsyncClient(transport=scheduler.ScheduledTransport(inner, sched, 'limited')) as limited,
+        httpx.AsyncClient(transport=scheduler.ScheduledTransport(inner, sched, 'other')) as other,
+    ):
+        await limited.get('https://factorial.test/shifts', params={'page': 1})
+        start = time.monotonic()
+        await other.get('https://factorial.test/shifts', params={'page': 2})
+        assert time.monotonic() - start < 0.2  # noqa: PLR2004
+        await limited.get('https://factorial.test/shifts', params={'page': 1})
+        assert time.monotonic() - start >= 0.2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_requests_are_sent_in_priority_order() -> None:
+    """Queued interactive requests are sent before queued bulk requests."""
+    server = StandInServer(total=10, limit=10)
+    server.limited_pages.update(range(1, 10))
+    server.gate = anyio.Event()
+    sched = _scheduler(concurrency=1)
+    async with httpx.AsyncClient(
+        transport=scheduler.ScheduledTransport(httpx.ASGITransport(app=server), sched, 'company'),
+        base_url='https://factorial.test',
+    ) as client:
+
+        async def get(page: int, priority: scheduler.Priority) -> None:
+            await client.get('/shifts', params={'page': page}, extensions={'priority': priority})
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(get, 1, scheduler.Priority.BULK)
+            while not server.requests:  # the first request is in flight, the others are queued
+                await anyio.lowlevel.checkpoint()
+            for page in (2, 3):
+                tg.start_soon(get, page, scheduler.Priority.BULK)
+                while sched.waiting('company') < page - 1:
+                    await anyio.lowlevel.checkpoint()
+            tg.start_soon(get, 4, scheduler.Priority.INTERACTIVE)
+            while sched.waiting('company') < 3:  # noqa: PLR2004
+                await anyio.lowlevel.checkpoint()
+            server.gate.set()
+    assert [query for _, _, query in server.requests] == ['page=1', 'page=4', 'page=2', 'page=3']
+
+
+@pytest.mark.parametrize(
+    ('headers', 'expected'),
+    [
+        ({}, None),
+        ({'retry-after': '3'}, 3),
+        ({'retry-after': 'soon'}, None),
+        ({'ratelimit-remaining': '0', 'ratelimit-reset': '7'}, 7),
+        ({'x-ratelimit-remaining': '5', 'x-ratelimit-reset': '7'}, None),
+    ],
+)
+def test_retry_after(headers: dict[str, str], expected: float | None) -> None:
+    """The wait requested by the server is read from the response headers."""
+    assert scheduler.retry_after(httpx.Response(429, headers=headers)) == expected
+
+
+def test_retry_after_date() -> None:
+    """Retry-After may be given as date."""
+    headers = {'retry-after': email.utils.formatdate(time.time() + 60, usegmt=True)}
+    assert 58 < (scheduler.retry_after(httpx.Response(429, headers=headers)) or 0) <= 60  # noqa: PLR2004
+
+
+def test_retry_after_epoch() -> None:
+    """Reset values in seconds since the epoch are converted to the seconds until then."""
+    reset = int(time.time()) + 60
+    headers = {'x-ratelimit-remaining': '0', 'x-ratelimit-reset': str(reset)}
+    assert 58 < (scheduler.retry_after(httpx.Response(200, headers=headers)) or 0) <= 60  # noqa: PLR2004
+    headers['x-ratelimit-reset'] = str(reset - 3600)
+    assert scheduler.retry_after(httpx.Response(200, headers=headers)) == 0
+
+
+@pytest.mark.anyio
+async def test_rate_limit_wait_is_capped() -> None:
+    """A tenant is blocked no longer than the maximum wait, however long the server asks to wait."""
+    reset = str(int(time.time()) + 10 * 365 * 24 * 60 * 60)
+    responses = iter(
+        [httpx.Response(200, headers={'x-ratelimit-remaining': '0', 'x-ratelimit-reset': reset}), httpx.Response(200)]
+    )
+    transport = httpx.MockTransport(lambda _: next(responses))
+    sched = _scheduler(max_wait=0.2)
+    async with httpx.AsyncClient(
+        transport=scheduler.ScheduledTransport(transport, sched, 'company'), base_url='https://factorial.test'
+    ) as client:
+        await client.get('/shifts')
+        started = time.monotonic()
+        with anyio.fail_after(2):
+            await client.get('/shifts')
+    assert 0.1 < time.monotonic() - started < 1  # noqa: PLR2004
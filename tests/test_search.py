@@ -0,0 +1,47 @@
+"""Unit tests for search module."""
+
+import random
+import string
+
+import pytest
+
+from factorialhr_analysis import search
+
+DOCUMENTS = [['Ada Lovelace', 'Engines'], ['Grace Hopper', 'Compilers', 'Navy'], ['Alan Turing'], ['Edsger Dijkstra']]
+
+
+@pytest.mark.parametrize(
+    ('query', 'expected'),
+    [
+        ('', [0, 1, 2, 3]),
+        ('a', [0, 1, 2, 3]),
+        ('LOVE', [0]),
+        ('ng', [0, 2]),
+        ('engines', [0]),
+        ('navy', [1]),
+        ('hopper compilers', []),  # fields are matched separately
+        ('xyz', []),
+    ],
+)
+def test_search(query: str, expected: list[int]) -> None:
+    """Documents with a field containing the query are found regardless of the case."""
+    assert search.SearchIndex(DOCUMENTS).search(query) == expected
+
+
+@pytest.mark.parametrize('ngram_length', [2, 3, 4])
+@pytest.mark.parametrize('seed', range(5))
+def test_search_matches_scan(seed: int, ngram_length: int, monkeypatch: pytest.MonkeyPatch) -> None:
+    """The index finds the same documents as checking every field of every document, for any n-gram length."""
+    monkeypatch.setattr(search, 'NGRAM_LENGTH', ngram_length)
+    rng = random.Random(seed)
+
+    def text() -> str:
+        return ''.join(rng.choices('abcAB ', k=rng.randint(0, 8)))
+
+    documents = [[text() for _ in range(rng.randint(1, 3))] for _ in range(200)]
+    index = search.SearchIndex(documents)
+    assert len(index) == len(documents)
+    for query in (text() for _ in range(50)):
+        expected = [i for i, fields in enumerate(documents) if any(query.lower() in f.lower() for f in fields)]
+        assert index.search(query) == expected, query
+    assert index.search(string.digits) == []
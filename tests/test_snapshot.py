@@ -0,0 +1,82 @@
+"""Unit tests for snapshot module."""
+
+import datetime as dt
+import pathlib
+import sqlite3
+
+import factorialhr
+import numpy as np
+
+from factorialhr_analysis import snapshot
+from factorialhr_analysis.working_time_verification import batch
+
+
+def _snapshot() -> snapshot.Snapshot:
+    now = dt.datetime(2024, 3, 1, 12, 0, tzinfo=dt.UTC)
+    employee = factorialhr.Employee(
+        id=1,
+        access_id=2,
+        first_name='Ada',
+        last_name='Lovelace',
+        full_name='Ada Lovelace',
+        company_id=3,
+        location_id=4,
+        created_at=now,
+        updated_at=now,
+        is_terminating=False,
+        attendable=True,
+    )
+    return snapshot.Snapshot(
+        employees={1: employee},
+        teams={5: factorialhr.Team(id=5, name='Engines', company_id=3, employee_ids=[1])},
+        shifts=batch.ShiftColumns(
+            id=np.array([7, 8]),
+            employee_id=np.array([1, 1]),
+            date=np.array([dt.date(2024, 2, 1).toordinal()] * 2),
+            clock_in=np.array([8 * 60, 13 * 60]),
+            clock_out=np.array([12 * 60, batch.MISSING]),
+            minutes=np.array([240, 0]),
+            workable=np.array([True, False]),
+        ),
+        shifts_synced_on=dt.date(2024, 3, 1),
+        shifts_fully_synced_on=dt.date(2024, 2, 28),
+        saved_at=now,
+    )
+
+
+def test_snapshot_round_trip(tmp_path: pathlib.Path) -> None:
+    """A saved snapshot is loaded with the same data."""
+    saved = _snapshot()
+    path = snapshot.snapshot_path(tmp_path / 'snapshots', '3_key')
+    snapshot.save(path, saved)
+    loaded = snapshot.load(path)
+    assert loaded is not None
+    assert loaded.employees == saved.employees
+    assert loaded.teams == saved.teams
+    assert (loaded.shifts_synced_on, loaded.shifts_fully_synced_on, loaded.saved_at) == (
+        saved.shifts_synced_on,
+        saved.shifts_fully_synced_on,
+        saved.saved_at,
+    )
+    for name in ('id', 'employee_id', 'date', 'clock_in', 'clock_out', 'minutes', 'workable'):
+        np.testing.assert_array_equal(getattr(loaded.shifts, name), getattr(saved.shifts, name))
+    assert list(path.parent.iterdir()) == [path]
+
+
+def test_snapshot_of_other_version_is_ignored(tmp_path: pathlib.Path) -> None:
+    """Snapshots of another version or missing snapshots are not loaded."""
+    path = snapshot.snapshot_path(tmp_path, '3_key')
+    assert snapshot.load(path) is None
+    snapshot.save(path, _snapshot())
+    with sqlite3.connect(path) as connection:
+        connection.execute("UPDATE meta SET value = '0' WHERE key = 'version'")
+    assert snapshot.load(path) is None
+
+
+def test_snapshot_dumps_and_loads() -> None:
+    """A snapshot serialized to bytes is deserialized with the same data."""
+    saved = _snapshot()
+    loaded = snapshot.loads(snapshot.dumps(saved))
+    assert loaded is not None
+    assert (loaded.employees, loaded.teams, loaded.saved_at) == (saved.employees, saved.teams, saved.saved_at)
+    np.testing.assert_array_equal(loaded.shifts.clock_out, saved.shifts.clock_out)
@@ -0,0 +1,300 @@
+"""Unit tests for tenant module."""
+
+import dataclasses
+import datetime as dt
+import pathlib
+from collections.abc import Awaitable, Callable
+
+import anyio
+import factorialhr
+import httpx
+import pytest
+import redis.exceptions
+
+from factorialhr_analysis import tenant, working_time_verification
+
+
+def _data(loaded_at: dt.datetime | None = None) -> tenant.TenantData:
+    return tenant.TenantData(
+        employees={},
+        teams={},
+        team_names_by_employee={},
+        shifts=working_time_verification.ShiftStore(),
+        shifts_synced_on=dt.date(2024, 3, 1),
+        shifts_fully_synced_on=dt.date(2024, 3, 1),
+        loaded_at=loaded_at or dt.datetime.now(tz=dt.UTC),
+    )
+
+
+def _returning(data: tenant.TenantData) -> Callable[[tenant.TenantData | None], Awaitable[tenant.TenantData]]:
+    async def load(_: tenant.TenantData | None) -> tenant.TenantData:
+        return data
+
+    return load
+
+
+class Loader:
+    """Load function counting its calls."""
+
+    def __init__(self):
+        self.previous: list[tenant.TenantData | None] = []
+
+    async def __call__(self, previous: tenant.TenantData | None) -> tenant.TenantData:
+        """Load fresh data after a short delay."""
+        self.previous.append(previous)
+        await anyio.sleep(0.01)
+        return _data()
+
+
+@pytest.mark.anyio
+async def test_fetch_loads_once_per_company() -> None:
+    """Concurrent sessions of a company share a single load, other companies are loaded separately."""
+    cache = tenant.TenantCache(dt.timedelta(minutes=5))
+    loader = Loader()
+    results: list[tenant.TenantData] = []
+
+    async def fetch(key: str) -> None:
+        results.append(await cache.fetch(key, loader))
+
+    async with anyio.create_task_group() as tg:
+        for key in ('1', '1', '1', '2'):
+            tg.start_soon(fetch, key)
+    assert loader.previous == [None, None]
+    assert len({id(result) for result in results}) == 2  # noqa: PLR2004
+    assert await cache.fetch('1', loader) is cache.get('1')
+    assert len(loader.previous) == 2  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_fetch_reloads_stale_data() -> None:
+    """Data older than the ttl is shown in the meantime and passed to the load to synchronize incrementally."""
+    cache = tenant.TenantCache(dt.timedelta(minutes=5))
+    loader = Loader()
+    stale = _data(dt.datetime.now(tz=dt.UTC) - dt.timedelta(minutes=10))
+    await cache.fetch('1', _returning(stale))
+    shown: list[tenant.TenantData] = []
+
+    async def on_stale(data: tenant.TenantData) -> None:
+        shown.append(data)
+
+    fresh = await cache.fetch('1', loader, on_stale=on_stale)
+    assert loader.previous == [stale]
+    assert shown == [stale]
+    assert cache.get('1') is fresh
+    assert cache.is_fresh(fresh)
+
+
+@pytest.mark.anyio
+async def test_fetch_starts_from_snapshot(tmp_path: pathlib.Path) -> None:
+    """After a restart, the snapshot saved by another load is the base of the next load."""
+    saved = _data(dt.datetime.now(tz=dt.UTC) - dt.timedelta(minutes=10))
+    await tenant.TenantCache(dt.timedelta(minutes=5), snapshot_directory=str(tmp_path)).fetch('1', _returning(saved))
+    loader = Loader()
+    await tenant.TenantCache(dt.timedelta(minutes=5), snapshot_directory=str(tmp_path)).fetch('1', loader)
+    assert len(loader.previous) == 1
+    assert loader.previous[0] is not None
+    assert loader.previous[0].loaded_at == saved.loaded_at
+
+
+@pytest.mark.anyio
+async def test_lookup_shares_data_between_processes(tmp_path: pathlib.Path) -> None:
+    """Data loaded by another backend process is looked up from the shared storage, unknown companies have none."""
+    saved = _data()
+    await tenant.TenantCache(dt.timedelta(minutes=5), snapshot_directory=str(tmp_path)).fetch('1', _returning(saved))
+    cache = tenant.TenantCache(dt.timedelta(minutes=5), snapshot_directory=str(tmp_path))
+    looked_up = await cache.lookup('1')
+    assert looked_up is not None
+    assert looked_up.loaded_at == saved.loaded_at
+    assert cache.get('1') is looked_up
+    assert await cache.lookup('2') is None
+
+
+@pytest.mark.anyio
+async def test_fetch_shares_data_only_between_the_same_credentials() -> None:
+    """Sessions with different credentials of a company do not see each other's data, they may see different data."""
+    cache = tenant.TenantCache(dt.timedelta(minutes=5))
+    loader = Loader()
+    manager = factorialhr.Credentials(company_id=1, id='access_1', role='admin')
+    employee = factorialhr.Credentials(company_id=1, id='access_2', role='basic')
+    as_manager = await cache.fetch(tenant.cache_key(manager), loader)
+    as_employee = await cache.fetch(tenant.cache_key(employee), loader)
+    assert as_employee is not as_manager
+    assert loader.previous == [None, None]
+    assert await cache.fetch(tenant.cache_key(manager.model_copy()), loader) is as_manager
+    assert tenant.cache_key(factorialhr.Credentials(company_id=2, id='access_1')) != tenant.cache_key(manager)
+
+
+class FailingRedis:
+    """Redis client whose every command fails as if the server was unreachable."""
+
+    def lock(self, *_args: object, **_kwargs: object) -> 'FailingRedis':
+        """Get a lock that fails to be acquired."""
+        return self
+
+    async def acquire(self) -> bool:
+        """Fail to acquire the lock."""
+        raise redis.exceptions.ConnectionError
+
+    async def get(self, *_args: object) -> bytes | None:
+        """Fail to get a value."""
+        raise redis.exceptions.ConnectionError
+
+    async def set(self, *_args: object, **_kwargs: object) -> bool:
+        """Fail to set a value."""
+        raise redis.exceptions.ConnectionError
+
+
+@pytest.mark.anyio
+async def test_fetch_falls_back_to_the_local_lock_without_redis() -> None:
+    """If redis fails, the data is loaded once per process, guarded by the lock of the process."""
+    cache = tenant.TenantCache(dt.timedelta(minutes=5), redis_url='redis://localhost')
+    cache._redis = FailingRedis()  # type: ignore[assignment]  # noqa: SLF001
+    loader = Loader()
+    results: list[tenant.TenantData] = []
+
+    async def fetch() -> None:
+        results.append(await cache.fetch('1', loader))
+
+    async with anyio.create_task_group() as tg:
+        for _ in range(3):
+            tg.start_soon(fetch)
+    assert loader.previous == [None]
+    assert len({id(data) for data in results}) == 1
+
+
+@pytest.mark.anyio
+async def test_fetch_reloads_fresh_data_on_request() -> None:
+    """A reload loads the data even if it is fresh."""
+    cache = tenant.TenantCache(dt.timedelta(minutes=5))
+    loader = Loader()
+    fresh = await cache.fetch('1', loader)
+    reloaded = await cache.fetch('1', loader, reload=True)
+    assert loader.previous == [None, fresh]
+    assert cache.get('1') is reloaded
+
+
+@pytest.mark.parametrize(
+    ('synced_on', 'fully_synced_on', 'expected'),
+    [
+        (None, None, None),
+        (dt.date(2024, 3, 10), dt.date(2024, 3, 8), dt.date(2024, 3, 10) - dt.timedelta(days=62)),
+        (dt.date(2024, 3, 10), dt.date(2024, 3, 3), None),
+        (dt.date(2024, 3, 10), None, None),
+    ],
+)
+def test_sync_start(
+    monkeypatch: pytest.MonkeyPatch,
+    synced_on: dt.date | None,
+    fully_synced_on: dt.date | None,
+    expected: dt.date | None,
+) -> None:
+    """Shifts are synchronized within a moving window, all of them once the last full download is too old."""
+    monkeypatch.setattr(tenant.constants, 'SHIFT_SYNC_DAYS', 62)
+    monkeypatch.setattr(tenant.constants, 'FULL_SYNC_DAYS', 7)
+    previous = dataclasses.replace(_data(), shifts_synced_on=synced_on, shifts_fully_synced_on=fully_synced_on)
+    assert tenant.sync_start(previous, dt.date(2024, 3, 10)) == expected
+    assert tenant.sync_start(None, dt.date(2024, 3, 10)) is None
+
+
+class FakeApi:
+    """FactorialHR API serving the shifts in pages, filtered by their start_on parameter, and no other records."""
+
+    def __init__(self, shifts: list[dict[str, object]], limit: int = 2):
+        self.shifts = shifts
+        self.limit = limit
+        self.start_ons: list[str | None] = []
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve a page."""
+        records: list[dict[str, object]] = []
+        if request.url.path.endswith(factorialhr.ShiftsEndpoint.endpoint):
+            start_on = request.url.params.get('start_on')
+            self.start_ons.append(start_on)
+            records = [shift for shift in self.shifts if start_on is None or str(shift['date']) >= start_on]
+        first = (int(request.url.params.get('page', '1')) - 1) * self.limit
+        meta = {
+            'limit': self.limit,
+            'total': len(records),
+            'has_next_page': first + self.limit < len(records),
+            'has_previous_page': first > 0,
+        }
+        return httpx.Response(200, json={'meta': meta, 'data': records[first : first + self.limit]})
+
+    def client(self) -> factorialhr.ApiClient:
+        """Get a client of the API."""
+        return factorialhr.ApiClient(auth=httpx.Auth(), transport=httpx.MockTransport(self.handle))
+
+
+def _shift(shift_id: int, date: dt.date, clock_in: str = '08:00') -> dict[str, object]:
+    return {
+        'id': shift_id,
+        'employee_id': 1,
+        'company_id': 1,
+        'date': date.isoformat(),
+        'reference_date': date.isoformat(),
+        'clock_in': clock_in,
+        'clock_out': '12:00',
+        'minutes': 240,
+        'workable': True,
+        'created_at': '2024-01-01T00:00:00Z',
+        'updated_at': '2024-01-01T00:00:00Z',
+    }
+
+
+def _shift_ids(data: tenant.TenantData) -> list[int]:
+    return sorted(record.id for record in data.shifts)
+
+
+@pytest.mark.anyio
+async def test_load_synchronizes_the_window_and_everything_on_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    """A refresh drops the deleted shifts of its window only, a full load drops the older ones as well."""
+    monkeypatch.setattr(tenant.constants, 'SHIFT_SYNC_DAYS', 10)
+    today = dt.datetime.now(tz=dt.UTC).date()
+    old, recent = today - dt.timedelta(days=30), today - dt.timedelta(days=2)
+    api = FakeApi([_shift(1, old), _shift(2, old), _shift(3, recent), _shift(4, recent), _shift(5, recent)])
+    async with api.client() as client:
+        previous = await tenant.load(client, None)
+        assert _shift_ids(previous) == [1, 2, 3, 4, 5]
+        assert previous.shifts_fully_synced_on == today
+
+        api.shifts = [_shift(1, old), _shift(3, recent, clock_in='09:00'), _shift(5, recent), _shift(6, recent)]
+        refreshed = await tenant.load(client, previous)
+        assert api.start_ons[-1] == (today - dt.timedelta(days=10)).isoformat()
+        assert _shift_ids(refreshed) == [1, 2, 3, 5, 6]
+        assert refreshed.shifts.get(3).clock_in == dt.time(9, 0)  # type: ignore[union-attr]
+        assert refreshed.shifts_fully_synced_on == today
+
+        reloaded = await tenant.load(client, refreshed, full=True)
+        assert api.start_ons[-1] is None
+        assert _shift_ids(reloaded) == [1, 3, 5, 6]
+
+
+class MovingApi(FakeApi):
+    """API where a shift is inserted before the others after the first page was served."""
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        """Serve a page, inserting the shift after the first page."""
+        response = super().handle(request)
+        if request.url.path.endswith(factorialhr.ShiftsEndpoint.endpoint) and request.url.params.get('page') == '1':
+            self.shifts.insert(0, _shift(99, dt.date(2024, 1, 1)))
+        return response
+
+
+@pytest.mark.anyio
+async def test_load_keeps_a_shift_received_with_two_pages_once() -> None:
+    """A shift moving to the next page between two requests is received twice but stored once."""
+    shifts = [_shift(shift_id, dt.date(2024, 1, 2)) for shift_id in range(1, 6)]
+    api = MovingApi(shifts)
+    async with api.client() as client:
+        data = await tenant.load(client, None)
+    assert _shift_ids(data) == [1, 2, 3, 4, 5]
+
+
+def test_team_names_by_employee() -> None:
+    """Employees get the names of all their teams, employees without a team are left out."""
+    teams = [
+        factorialhr.Team(id=1, name='Engines', employee_ids=[1, 2], company_id=1),
+        factorialhr.Team(id=2, name='Navy', employee_ids=[2], company_id=1),
+        factorialhr.Team(id=3, name='Empty', employee_ids=None, company_id=1),
+    ]
+    assert tenant.team_names_by_employee(teams) == {1: ['Engines'], 2: ['Engines', 'Navy']}
@@ -1,12 +1,21 @@
 """Unit tests for working_time_verification module."""
 
 import datetime as dt
+import random
 from collections.abc import Sequence
 from dataclasses import dataclass
 
 import pytest
 
-from factorialhr_analysis.working_time_verification import helper, verification
+from factorialhr_analysis.working_time_verification import (
+    batch,
+    cache,
+    helper,
+    parallel,
+    pipeline,
+    store,
+    verification,
+)
 
 
 @dataclass(frozen=True)
@@ -19,6 +28,7 @@ class FakeShift:
     workable: bool = True
     minutes: int = 0
     id: int = 0
+    employee_id: int = 0
 
     def __post_init__(self) -> None:
         """Populate minutes from clock_in/clock_out when not explicitly provided."""
@@ -325,8 +335,504 @@ def test_get_error_resets_on_eleven_hour_break() -> None:
     assert all('more than' not in r for r in reasons)
 
 
+@pytest.mark.parametrize('seed', range(10))
+def test_shift_store_group_totals_match_employees(seed: int) -> None:
+    """The totals of a group equal the sums of its employees for any range, including breaks spanning the range."""
+    shifts = _sequential_shifts(seed, amount=60)
+    rng = random.Random(seed)
+    # long absences, so that breaks start before and end after ranges
+    shifts = [
+        shift
+        for shift in shifts
+        if not dt.date(2024, 1, 10) <= shift.date <= dt.date(2024, 1, 20) or shift.employee_id % 2
+    ]
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    for _ in range(30):
+        employee_ids = rng.sample(range(6), rng.randint(0, 6))
+        first = dt.date(2024, 1, 1) + dt.timedelta(days=rng.randrange(-5, 60))
+        last = first + dt.timedelta(days=rng.randrange(-1, 40))
+        expected = (
+            sum((shift_store.time_attended(e, first, last) for e in employee_ids), dt.timedelta()),
+            sum((shift_store.break_time(e, first, last) for e in employee_ids), dt.timedelta()),
+        )
+        assert shift_store.group(employee_ids).totals(first, last) == expected, (employee_ids, first, last)
+    assert shift_store.group([0, 1]) is shift_store.group([1, 0, 1])
+
+
+def test_shift_store_group_totals_skip_breaks_around_the_range() -> None:
+    """Breaks before the first or after the last shift of the range do not count, however long they are."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 4), dt.time(8, 0), dt.time(12, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 10), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 6), dt.time(8, 0), dt.time(12, 0), id=3, employee_id=2),
+        FakeShift(dt.date(2024, 1, 6), dt.time(13, 0), dt.time(15, 0), id=4, employee_id=2),
+    ]
+    group = store.ShiftStore.from_attendances(shifts).group([1, 2])  # type: ignore[arg-type]
+    assert group.totals(dt.date(2024, 1, 5), dt.date(2024, 1, 9)) == (dt.timedelta(hours=6), dt.timedelta(hours=1))
+    assert group.totals(dt.date(2024, 1, 4), dt.date(2024, 1, 9)) == (dt.timedelta(hours=10), dt.timedelta(hours=1))
+    assert group.totals(dt.date(2024, 1, 4), dt.date(2024, 1, 10)) == (
+        dt.timedelta(hours=14),
+        dt.timedelta(days=5, hours=21),
+    )
+    assert group.totals(dt.date(2024, 1, 11)) == (dt.timedelta(), dt.timedelta())
+
+
+def test_shift_store_totals_skip_shifts_with_invalid_clock_times() -> None:
+    """Minutes of shifts without valid clock times count neither as time attended nor start a break."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(13, 0), None, minutes=120, id=2),
+        FakeShift(dt.date(2024, 1, 1), dt.time(16, 0), dt.time(15, 0), minutes=60, id=3),
+        FakeShift(dt.date(2024, 1, 1), dt.time(16, 0), dt.time(18, 0), id=4),
+    ]
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    assert shift_store.totals([0]) == (dt.timedelta(hours=6), dt.timedelta(hours=4))
+
+
 def test_get_error_triggers_reset_on_ten_hour_violation() -> None:
     """Working more than 10 hours with <11h break should yield an error and reset accumulation."""
     shifts = [FakeShift(dt.date(2024, 1, 1), dt.time(7, 0), dt.time(17, 1))]  # >10h
     errors = list(verification.get_error(shifts, dt.timedelta(0)))  # type: ignore[arg-type]
     assert any('more than 10 hours' in e.reason for e in errors)
+
+
+def _random_shifts(seed: int, amount: int = 300) -> list[FakeShift]:
+    """Generate chronologically ordered shifts with splits, overlaps, long days and missing clock times."""
+    rng = random.Random(seed)
+    day = dt.date(2024, 1, 1)
+    shifts = []
+    for index in range(amount):
+        day += dt.timedelta(days=rng.choice((0, 0, 1, 1, 2)))
+        start = rng.randrange(4 * 60, 22 * 60)
+        end = min(start + rng.randrange(-30, 11 * 60), 24 * 60 - 1)
+        clock_in = None if rng.random() < 0.02 else dt.time(*divmod(start, 60))  # noqa: PLR2004
+        clock_out = None if rng.random() < 0.02 else dt.time(*divmod(end, 60))  # noqa: PLR2004
+        workable = rng.random() > 0.1  # noqa: PLR2004
+        shifts.append(FakeShift(day, clock_in, clock_out, workable=workable, id=index))
+    return sorted(shifts, key=helper.chronological_order)  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize('seed', range(20))
+@pytest.mark.parametrize('tolerance', [dt.timedelta(0), dt.timedelta(minutes=15)])
+def test_get_error_incremental_matches_get_error(seed: int, tolerance: dt.timedelta) -> None:
+    """The running totals engine yields the same errors as the recalculating engine."""
+    shifts = _random_shifts(seed)
+    expected = list(verification.get_error(shifts, tolerance))  # type: ignore[arg-type]
+    got = list(verification.get_error_incremental(shifts, tolerance))  # type: ignore[arg-type]
+    assert [e.reason for e in got] == [e.reason for e in expected]
+    assert [sorted(a.id for a in e.attendances) for e in got] == [sorted(a.id for a in e.attendances) for e in expected]
+    assert [(e.break_time, e.time_attended) for e in got] == [(e.break_time, e.time_attended) for e in expected]
+
+
+def test_running_window_totals_match_helper() -> None:
+    """Running totals equal the helper calculations over the same attendances."""
+    window = verification.RunningWindow()
+    shifts = [
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0)),
+        FakeShift(dt.date(2024, 1, 1), dt.time(11, 0), dt.time(13, 0)),
+        FakeShift(dt.date(2024, 1, 1), dt.time(14, 0), dt.time(18, 0)),
+    ]
+    for shift in shifts:
+        window.append(shift, *helper.get_clock_in_and_clock_out(shift))  # type: ignore[arg-type]
+    assert window.time_attended == helper.calculate_time_attended(shifts)  # type: ignore[arg-type]
+    assert window.break_time == helper.calculate_break_time(shifts)  # type: ignore[arg-type]
+    assert window.last_clock_out == dt.datetime.combine(dt.date(2024, 1, 1), dt.time(18, 0))
+
+
+def _sequential_shifts(seed: int, employees: int = 5, amount: int = 150) -> list[FakeShift]:
+    """Generate non overlapping shifts of several employees in random order."""
+    rng = random.Random(seed)
+    shifts = []
+    for employee_id in range(employees):
+        cursor = dt.datetime.combine(dt.date(2024, 1, 1), dt.time(4, 0))
+        for index in range(amount):
+            cursor += dt.timedelta(minutes=rng.choice((0, rng.randrange(1, 90), rng.randrange(8 * 60, 14 * 60))))
+            end = min(
+                cursor + dt.timedelta(minutes=rng.randrange(1, 11 * 60)),
+                dt.datetime.combine(cursor.date(), dt.time(23, 59)),
+            )
+            clock_in = None if rng.random() < 0.02 else cursor.time()  # noqa: PLR2004
+            clock_out = None if rng.random() < 0.02 else end.time()  # noqa: PLR2004
+            shift_id = employee_id * amount + index
+            workable = rng.random() > 0.1  # noqa: PLR2004
+            shifts.append(
+                FakeShift(cursor.date(), clock_in, clock_out, workable=workable, id=shift_id, employee_id=employee_id)
+            )
+            cursor = end if end > cursor else cursor + dt.timedelta(hours=1)
+    rng.shuffle(shifts)
+    return shifts
+
+
+def test_get_error_incremental_consolidate() -> None:
+    """Repeated errors of the same rule within a window are reported once with the final aggregates."""
+    day = dt.date(2024, 1, 1)
+    shifts = [
+        FakeShift(day, dt.time(8, 0), dt.time(12, 0), id=1),
+        FakeShift(day, dt.time(12, 0), dt.time(15, 0), id=2),
+        FakeShift(day, dt.time(15, 0), dt.time(16, 0), id=3),
+    ]
+    assert len(list(verification.get_error_incremental(shifts))) == 2  # type: ignore[arg-type]  # noqa: PLR2004
+    (error,) = verification.get_error_incremental(shifts, consolidate=True)  # type: ignore[arg-type]
+    assert [a.id for a in error.attendances] == [1, 2, 3]
+    assert error.time_attended == dt.timedelta(hours=8)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_get_error_incremental_consolidate_keeps_last_error_per_window_and_rule(seed: int) -> None:
+    """Consolidating drops exactly the errors superseded by a later error of the same window and rule."""
+    shifts = _random_shifts(seed)
+    errors = list(verification.get_error_incremental(shifts))  # type: ignore[arg-type]
+
+    def key(error: helper.Error) -> tuple[str, list[int]]:
+        return error.reason, [a.id for a in error.attendances]
+
+    superseded = [
+        error
+        for index, error in enumerate(errors)
+        if isinstance(error.attendances, helper.AttendanceSpan)
+        and any(
+            later.reason == error.reason
+            and '10 hours' not in error.reason  # these reset the window
+            and len(later.attendances) > len(error.attendances)
+            and later.attendances[0] is error.attendances[0]
+            for later in errors[index + 1 :]
+        )
+    ]
+    expected = sorted(key(error) for error in errors if not any(error is s for s in superseded))
+    consolidated = verification.get_error_incremental(shifts, consolidate=True)  # type: ignore[arg-type]
+    assert sorted(key(error) for error in consolidated) == expected
+
+
+def test_shift_store_lookups() -> None:
+    """The store returns compact records by id and per employee in chronological order."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 2), dt.time(9, 0, 30), dt.time(12, 0), id=3, employee_id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(13, 0), None, workable=False, id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(16, 0), id=4, employee_id=2),
+    ]
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    assert len(shift_store) == len(shifts)
+    assert shift_store.get(1) == store.ShiftRecord(1, 1, dt.date(2024, 1, 1), dt.time(13, 0), None, 0, workable=False)
+    assert shift_store.get(5) is None
+    assert [r.id for r in shift_store.of_employee(1)] == [2, 1, 3]
+    assert [r.id for r in shift_store.of_employee(1, dt.date(2024, 1, 2), dt.date(2024, 1, 31))] == [3]
+    assert shift_store.of_employee(1, dt.date(2024, 1, 2))[0].clock_in == dt.time(9, 0)
+    assert shift_store.of_employee(3) == []
+
+
+@pytest.mark.anyio
+async def test_verify_in_processes_matches_get_error_incremental() -> None:
+    """Verifying chunks of employees in worker processes yields the errors of every employee once."""
+    shifts = _sequential_shifts(1, employees=7, amount=40)
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    start, end = dt.date(2024, 1, 5), dt.date(2024, 2, 1)
+    results: parallel.ChunkResult = []
+
+    async def on_result(result: parallel.ChunkResult) -> None:
+        results.extend(result)
+
+    await parallel.verify_in_processes(
+        shift_store, list(range(7)), start, end, dt.timedelta(0), on_result, workers=2, chunk_size=3
+    )
+    expected = {
+        employee_id: [e.reason for e in parallel.verify_employee(shift_store, employee_id, start, end, dt.timedelta(0))]
+        for employee_id in range(7)
+    }
+    assert {employee_id: [e.reason for e in errors] for employee_id, errors in results} == expected
+
+
+@dataclass(frozen=True)
+class FakeEmployee:
+    """Minimal stand-in for factorialhr.Employee for testing."""
+
+    id: int
+    full_name: str
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('workers', [1, 2])
+async def test_verify_company_verifies_every_employee_once_and_caches_them(workers: int) -> None:
+    """The pipeline reports the errors of every employee, verifies them once and sums up their hours per period."""
+    shifts = _sequential_shifts(1, employees=7, amount=40)
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    employees = [FakeEmployee(employee_id, f'Employee {employee_id}') for employee_id in range(7)]
+    team_names = {employee_id: ['Odd' if employee_id % 2 else 'Even'] for employee_id in range(7)}
+    start, end = dt.date(2024, 1, 5), dt.date(2024, 2, 1)
+    error_cache = cache.ErrorCache(maxsize=100)
+    results: parallel.ChunkResult = []
+
+    async def on_result(result: parallel.ChunkResult) -> None:
+        results.extend(result)
+
+    async def verify_company() -> tuple[list[str], list[pipeline.PeriodTotals]]:
+        return await pipeline.verify_company(
+            shift_store,
+            employees,  # type: ignore[arg-type]
+            team_names,
+            start,
+            end,
+            dt.timedelta(0),
+            on_result,
+            error_cache=error_cache,
+            workers=workers,
+            chunk_size=3,
+        )
+
+    names, totals = await verify_company()
+    expected = {
+        employee_id: [e.reason for e in parallel.verify_employee(shift_store, employee_id, start, end, dt.timedelta(0))]
+        for employee_id in range(7)
+    }
+    assert {employee_id: [e.reason for e in errors] for employee_id, errors in results} == expected
+    assert len(results) == len(error_cache) == 7  # noqa: PLR2004
+    assert names == ['2024-01', '2024-02']
+    assert [row.name for row in totals] == ['All employees', 'Team Even', 'Team Odd', *(e.full_name for e in employees)]
+    employee_totals = totals[3:]
+    assert totals[0].total == sum((row.total for row in employee_totals), dt.timedelta())
+    monthly = zip(*(row.hours for row in employee_totals), strict=True)
+    assert totals[0].hours == [sum(hours, dt.timedelta()) for hours in monthly]
+
+    results.clear()
+    assert await verify_company() == (names, totals)
+    assert {employee_id: [e.reason for e in errors] for employee_id, errors in results} == expected
+
+
+def test_shift_store_fingerprint_changes_with_shifts_in_range() -> None:
+    """Only changes of the employee's shifts in the range change the fingerprint."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 2, 1), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=3, employee_id=2),
+    ]
+    january = dt.date(2024, 1, 1), dt.date(2024, 1, 31)
+    before = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    changed_february = store.ShiftStore.from_attendances(  # type: ignore[arg-type]
+        [*shifts[:1], FakeShift(dt.date(2024, 2, 1), dt.time(9, 0), dt.time(12, 0), id=2, employee_id=1), shifts[2]]
+    )
+    changed_january = store.ShiftStore.from_attendances(  # type: ignore[arg-type]
+        [FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(13, 0), id=1, employee_id=1), *shifts[1:]]
+    )
+    assert before.fingerprint(1, *january) == changed_february.fingerprint(1, *january)
+    assert before.fingerprint(1, *january) != changed_january.fingerprint(1, *january)
+    assert before.fingerprint(1, *january) != before.fingerprint(2, *january)
+
+
+def test_error_cache_evicts_least_recently_used() -> None:
+    """The cache keeps the most recently used results up to its size."""
+    error_cache = cache.ErrorCache(maxsize=2)
+    keys = [(bytes([i]), dt.date(2024, 1, 1), dt.date(2024, 1, 31), None, False) for i in range(3)]
+    error_cache.put(keys[0], [])
+    error_cache.put(keys[1], [helper.Error('test', [])])
+    assert error_cache.get(keys[0]) == []
+    error_cache.put(keys[2], [])
+    assert error_cache.get(keys[1]) is None
+    assert error_cache.get(keys[0]) == []
+    assert len(error_cache) == 2  # noqa: PLR2004
+
+
+def test_attendance_span_is_a_view() -> None:
+    """A span shows consecutive attendances of the underlying list, also after appending to it."""
+    shifts = [FakeShift(dt.date(2024, 1, day), dt.time(9, 0), dt.time(10, 0), id=day) for day in range(1, 5)]
+    span = helper.AttendanceSpan(shifts, 1, 3)  # type: ignore[arg-type]
+    shifts.append(FakeShift(dt.date(2024, 1, 5), dt.time(9, 0), dt.time(10, 0), id=5))
+    assert len(span) == 2  # noqa: PLR2004
+    assert [s.id for s in span] == [2, 3]
+    assert span[-1].id == 3  # noqa: PLR2004
+    assert span == shifts[1:3]
+    with pytest.raises(IndexError):
+        span[2]
+
+
+def test_get_error_incremental_errors_share_attendances() -> None:
+    """Errors of the same window refer to the same attendances instead of copies."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 1), dt.time(7, 0), dt.time(13, 30), id=1),
+        FakeShift(dt.date(2024, 1, 1), dt.time(13, 40), dt.time(16, 40), id=2),
+    ]
+    errors = list(verification.get_error_incremental(shifts))  # type: ignore[arg-type]
+    assert [[s.id for s in e.attendances] for e in errors] == [[1], [1, 2]]
+    assert errors[0].attendances[0] is errors[1].attendances[0]
+    assert errors[1].time_attended is errors[1].time_attended
+
+
+def test_rolling_average_drops_days_outside_the_period() -> None:
+    """Only the days of the period ending at the latest added day are summed up."""
+    rolling_average = verification.RollingAverage(period=dt.timedelta(weeks=1))
+    for day in range(1, 8):
+        rolling_average.add(dt.date(2024, 1, day), dt.timedelta(hours=day))
+    assert rolling_average.total == dt.timedelta(hours=28)
+    assert rolling_average.average == dt.timedelta(hours=28) / 6
+    rolling_average.add(dt.date(2024, 1, 10), dt.timedelta(hours=1))
+    assert [day for day, _ in rolling_average.days] == [dt.date(2024, 1, d) for d in (4, 5, 6, 7, 10)]
+    assert rolling_average.total == dt.timedelta(hours=23)
+
+
+def _workdays(weekdays: int, hours: int, weeks: int = 30) -> list[FakeShift]:
+    """Shifts of the given length on the first weekdays of every week, starting on a monday."""
+    monday = dt.date(2024, 1, 1)
+    return [
+        FakeShift(monday + dt.timedelta(weeks=week, days=day), dt.time(6, 0), dt.time(6 + hours, 0), id=week * 7 + day)
+        for week in range(weeks)
+        for day in range(weekdays)
+    ]
+
+
+def test_get_average_errors() -> None:
+    """Long days are only reported while the average over 24 weeks exceeds 8 hours per workday."""
+    # until the saturdays without attendances compensate the long days, they are reported
+    errors = list(verification.get_average_errors(_workdays(5, 9)))  # type: ignore[arg-type]
+    monday = dt.date(2024, 1, 1)
+    assert [min(e.days_affected) - monday for e in errors] == [dt.timedelta(days=d) for d in (0, 1, 2, 3, 4, 10, 11)]
+    errors = list(verification.get_average_errors(_workdays(6, 9)))  # type: ignore[arg-type]
+    assert len(errors) == 30 * 6
+    assert all(len(error.attendances) == 1 and error.time_attended == dt.timedelta(hours=9) for error in errors)
+    assert errors[-1].days_affected == {dt.date(2024, 1, 1) + dt.timedelta(weeks=29, days=5)}
+    since = dt.date(2024, 6, 1)
+    assert [e.days_affected for e in verification.get_average_errors(_workdays(6, 9), since=since)] == [  # type: ignore[arg-type]
+        e.days_affected for e in errors if min(e.days_affected) >= since
+    ]
+    assert list(verification.get_average_errors(_workdays(6, 9), dt.timedelta(hours=1))) == []  # type: ignore[arg-type]
+
+
+def test_get_average_errors_short_history() -> None:
+    """The average of employees with a short history only counts the workdays since their first attendance."""
+    shifts = _workdays(6, 9, weeks=2)
+    errors = list(verification.get_average_errors(shifts))  # type: ignore[arg-type]
+    assert len(errors) == len(shifts)
+    # attendances of 8 hours before compensate the long days
+    history = [
+        FakeShift(shift.date - dt.timedelta(weeks=10), dt.time(6, 0), dt.time(13, 0), id=-shift.id - 1)
+        for shift in _workdays(6, 9, weeks=10)
+    ]
+    assert list(verification.get_average_errors(history + shifts)) == []  # type: ignore[arg-type]
+
+
+@pytest.mark.parametrize(
+    ('start', 'end', 'expected'),
+    [
+        (dt.date(2024, 1, 1), dt.date(2024, 1, 1), 1),
+        (dt.date(2024, 1, 1), dt.date(2024, 1, 7), 6),
+        (dt.date(2024, 1, 7), dt.date(2024, 1, 7), 0),
+        (dt.date(2024, 1, 6), dt.date(2024, 1, 8), 2),
+        (dt.date(2024, 1, 1), dt.date(2024, 6, 16), 24 * 6),
+        (dt.date(2024, 1, 2), dt.date(2024, 1, 1), 0),
+    ],
+)
+def test_count_workdays(start: dt.date, end: dt.date, expected: int) -> None:
+    """Mondays to saturdays are counted, sundays are not."""
+    assert verification.count_workdays(start, end) == expected
+
+
+def test_get_error_incremental_detect_overlaps() -> None:
+    """Overlapping attendances are reported with the attendance they overlap, contiguous ones are not."""
+    day = dt.date(2024, 1, 1)
+    shifts = [
+        FakeShift(day, dt.time(8, 0), dt.time(12, 0), id=1),
+        FakeShift(day, dt.time(12, 0), dt.time(13, 0), id=2),
+        FakeShift(day, dt.time(9, 0), dt.time(10, 0), id=3),
+        FakeShift(day, dt.time(9, 0), dt.time(10, 0), id=4),
+        FakeShift(day, dt.time(13, 30), dt.time(14, 0), workable=False, id=5),
+        FakeShift(day, dt.time(13, 45), dt.time(15, 0), id=6),
+    ]
+    overlaps = [
+        [a.id for a in error.attendances]
+        for error in verification.get_error_incremental(shifts, detect_overlaps=True)  # type: ignore[arg-type]
+        if error.reason == 'Attendance overlaps another attendance'
+    ]
+    assert overlaps == [[1, 3], [1, 4], [5, 6]]
+    assert not any(
+        error.reason == 'Attendance overlaps another attendance'
+        for error in verification.get_error_incremental(shifts)  # type: ignore[arg-type]
+    )
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_shift_store_totals_match_helper(seed: int) -> None:
+    """The prefix sums yield the totals of the helper functions for any employee and range."""
+    shifts = _sequential_shifts(seed, amount=80)
+    shift_store = store.ShiftStore.from_attendances(shifts)  # type: ignore[arg-type]
+    rng = random.Random(seed)
+    for employee_id in range(5):
+        first = dt.date(2024, 1, 1) + dt.timedelta(days=rng.randrange(30))
+        last = first + dt.timedelta(days=rng.randrange(30))
+        in_range = [
+            s
+            for s in shifts
+            if s.employee_id == employee_id
+            and first <= s.date <= last
+            and s.workable
+            and verification.validate_clock_times(s) is None  # type: ignore[arg-type]
+        ]
+        assert shift_store.time_attended(employee_id, first, last) == helper.calculate_time_attended(in_range)  # type: ignore[arg-type]
+        assert shift_store.break_time(employee_id, first, last) == helper.calculate_break_time(in_range)  # type: ignore[arg-type]
+    assert shift_store.totals(range(5)) == (
+        sum((shift_store.time_attended(e) for e in range(5)), dt.timedelta()),
+        sum((shift_store.break_time(e) for e in range(5)), dt.timedelta()),
+    )
+    assert shift_store.break_time(99) == dt.timedelta()
+
+
+def test_shift_store_merge_replaces_the_synchronized_range() -> None:
+    """Shifts of the range are replaced by the delta, shifts before it are kept unless they changed."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 10), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 11), dt.time(8, 0), dt.time(12, 0), id=3, employee_id=2),
+    ]
+    delta = [
+        FakeShift(dt.date(2024, 1, 2), dt.time(9, 0), dt.time(12, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 10), dt.time(8, 0), dt.time(13, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 12), dt.time(8, 0), dt.time(12, 0), id=4, employee_id=2),
+    ]
+    merged = store.ShiftStore.from_attendances(shifts).merge(  # type: ignore[arg-type]
+        batch.ShiftColumns.from_attendances(delta),  # type: ignore[arg-type]
+        dt.date(2024, 1, 5),
+    )
+    assert sorted(record.id for record in merged) == [1, 2, 4]
+    assert merged.get(1).date == dt.date(2024, 1, 2)  # type: ignore[union-attr]
+    assert merged.get(2).clock_out == dt.time(13, 0)  # type: ignore[union-attr]
+    assert merged.time_attended(1) == dt.timedelta(hours=8)
+
+
+def test_shift_store_merge_keeps_one_shift_per_id() -> None:
+    """A shift received twice, e.g. with two overlapping pages, is kept once with the values received last."""
+    shifts = [FakeShift(dt.date(2024, 1, 1), dt.time(8, 0), dt.time(12, 0), id=1, employee_id=1)]
+    delta = [
+        FakeShift(dt.date(2024, 1, 6), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 7), dt.time(8, 0), dt.time(12, 0), id=3, employee_id=1),
+        FakeShift(dt.date(2024, 1, 6), dt.time(8, 0), dt.time(13, 0), id=2, employee_id=1),
+    ]
+    merged = store.ShiftStore.from_attendances(shifts).merge(  # type: ignore[arg-type]
+        batch.ShiftColumns.from_attendances(delta),  # type: ignore[arg-type]
+        dt.date(2024, 1, 5),
+    )
+    assert [record.id for record in merged] == [1, 2, 3]
+    assert merged.get(2).clock_out == dt.time(13, 0)  # type: ignore[union-attr]
+    assert merged.time_attended(1) == dt.timedelta(hours=13)
+
+
+def test_shift_store_merge_moves_shifts_across_the_range_boundary() -> None:
+    """A shift of the delta replaces the shift with its id, whether it moved into the range or out of it."""
+    shifts = [
+        FakeShift(dt.date(2024, 1, 3), dt.time(8, 0), dt.time(12, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 6), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 6), dt.time(13, 0), dt.time(17, 0), id=3, employee_id=1),
+    ]
+    delta = [
+        FakeShift(dt.date(2024, 1, 6), dt.time(18, 0), dt.time(19, 0), id=1, employee_id=1),
+        FakeShift(dt.date(2024, 1, 4), dt.time(8, 0), dt.time(12, 0), id=2, employee_id=1),
+        FakeShift(dt.date(2024, 1, 6), dt.time(13, 0), dt.time(17, 0), id=3, employee_id=1),
+    ]
+    merged = store.ShiftStore.from_attendances(shifts).merge(  # type: ignore[arg-type]
+        batch.ShiftColumns.from_attendances(delta),  # type: ignore[arg-type]
+        dt.date(2024, 1, 5),
+    )
+    assert [(record.id, record.date) for record in merged] == [
+        (2, dt.date(2024, 1, 4)),
+        (3, dt.date(2024, 1, 6)),
+        (1, dt.date(2024, 1, 6)),
+    ]
+    assert merged.time_attended(1) == dt.timedelta(hours=9)
+    assert merged.time_attended(1, dt.date(2024, 1, 5)) == dt.timedelta(hours=5)
+    assert merged.break_time(1, dt.date(2024, 1, 5)) == dt.timedelta(hours=1)
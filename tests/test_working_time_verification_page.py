@@ -0,0 +1,249 @@
+"""Unit tests for working_time_verification_page module."""
+
+import datetime as dt
+import importlib
+from dataclasses import dataclass
+
+import httpx
+import pytest
+import reflex as rx
+import starlette.applications
+import starlette.routing
+
+from factorialhr_analysis import export, routes, working_time_verification
+
+# the pages package exports functions with the same names as its modules
+page = importlib.import_module('factorialhr_analysis.pages.working_time_verification_page')
+
+
+@dataclass(frozen=True)
+class FakeEmployee:
+    """Minimal stand-in for factorialhr.Employee for testing."""
+
+    id: int
+    full_name: str
+
+
+def _state() -> page.DataStateDeprecated:
+    root = rx.State(_reflex_internal_init=True)  # pyright: ignore[reportCallIssue]
+    return root.get_substate(page.DataStateDeprecated.get_full_name().split('.')[1:])
+
+
+def _verified_state(errors: int = 3) -> page.DataStateDeprecated:
+    """Get a state whose verification found the errors of Ada of the team Engines and one of Grace of the Navy."""
+    state = _state()
+    state._verification_key, verification = page._verifications.create('')  # noqa: SLF001
+    shift = working_time_verification.ShiftRecord(
+        1, 1, dt.date(2024, 1, 1), dt.time(5, 0), dt.time(12, 0), 420, workable=True
+    )
+    verification.add_errors(
+        FakeEmployee(1, 'Ada Lovelace'),  # pyright: ignore[reportArgumentType]
+        ['Engines'],
+        [working_time_verification.Error(reason=f'Error {i}', attendances=[shift]) for i in range(errors)],
+    )
+    verification.add_errors(
+        FakeEmployee(2, 'Grace Hopper'),  # pyright: ignore[reportArgumentType]
+        ['Navy'],
+        [working_time_verification.Error(reason='Error', attendances=[shift])],
+    )
+    verification.build_index()
+    verification.apply_filter('')
+    return state
+
+
+def test_show_attendances() -> None:
+    """The attendances of a known error are shown."""
+    state = _verified_state()
+    assert state.show_attendances(2) is None
+    assert [attendance['date'] for attendance in state.shown_attendances] == [dt.date(2024, 1, 1)]
+    assert not state.verification_lost
+
+
+@pytest.mark.parametrize('lost', [True, False])
+def test_show_attendances_of_an_unknown_error_asks_to_verify_again(lost: bool) -> None:  # noqa: FBT001
+    """If the verification is gone or the browser refers to another one, the errors of the browser are cleared."""
+    state = _verified_state()
+    if lost:
+        page._verifications._entries.clear()  # noqa: SLF001
+    events = state.show_attendances(1 if lost else 4)
+    assert events is not None
+    assert len(events) == 2  # noqa: PLR2004
+    assert state.verification_lost
+    assert state.shown_attendances == []
+    assert state._verification_key == ''  # noqa: SLF001
+
+
+async def _events(state: page.DataStateDeprecated, error_ids: list[int]) -> list[object]:
+    pending = len(page._pending_exports._entries)  # noqa: SLF001
+    events = [event async for event in state.download_errors(error_ids)]
+    assert len(page._pending_exports._entries) - pending == (0 if state.verification_lost else 1)  # noqa: SLF001
+    return events
+
+
+@pytest.mark.anyio
+async def test_download_errors() -> None:
+    """An export of known errors is requested and downloaded."""
+    state = _verified_state()
+    events = await _events(state, [2, 0, 2])
+    assert len(events) == 1
+    assert not state.verification_lost
+    assert state.export_session
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('lost', [True, False])
+async def test_download_unknown_errors_asks_to_verify_again(lost: bool) -> None:  # noqa: FBT001
+    """Instead of exporting an empty file, the session is asked to verify again."""
+    state = _verified_state()
+    if lost:
+        page._verifications._entries.clear()  # noqa: SLF001
+    events = await _events(state, [0, 1] if lost else [0, 5])
+    assert len(events) == 1
+    assert len(events[0]) == 2  # pyright: ignore[reportArgumentType]  # noqa: PLR2004
+    assert state.verification_lost
+
+
+@pytest.mark.anyio
+async def test_download_filtered_errors() -> None:
+    """The errors matching the filter of the browser are exported, not the ones matching the filter of the server."""
+    state = _verified_state()
+    state.set_filter_value('ada')
+    pending = set(page._pending_exports._entries)  # noqa: SLF001
+    assert len([event async for event in state.download_filtered_errors('NAVY')]) == 1
+    (token,) = set(page._pending_exports._entries) - pending  # noqa: SLF001
+    export_request = page.ExportRequest.loads(page._pending_exports._entries[token][1])  # noqa: SLF001
+    assert export_request.error_ids == [3]
+
+
+def _shown_ids(state: page.DataStateDeprecated) -> list[int]:
+    return [error['id'] for error in state.errors_to_show]
+
+
+def test_show_page_clamps_the_page_index() -> None:
+    """Pages before the first or after the last show the first or the last page."""
+    state = _verified_state(errors=119)
+    state.page_size = 25
+    state.show_page(2)
+    assert (state.page_index, state.page_count, state.total_count) == (2, 5, 120)
+    assert _shown_ids(state) == list(range(50, 75))
+    state.show_page(-1)
+    assert state.page_index == 0
+    assert _shown_ids(state) == list(range(25))
+    state.show_page(99)
+    assert state.page_index == 4  # noqa: PLR2004
+    assert _shown_ids(state) == list(range(100, 120))
+
+
+def test_set_page_size_keeps_the_first_error_visible() -> None:
+    """Changing the page size shows the page containing the first error of the shown page."""
+    state = _verified_state(errors=119)
+    state.page_size = 25
+    state.show_page(3)
+    state.set_page_size('50')
+    assert (state.page_index, state.page_count) == (1, 3)
+    assert 75 in _shown_ids(state)  # noqa: PLR2004
+    state.set_page_size('250')
+    assert (state.page_index, state.page_count) == (0, 1)
+    assert _shown_ids(state) == list(range(120))
+
+
+def test_filter_shows_the_first_page_of_the_matches() -> None:
+    """Filtering shows the first page of the matching errors, an empty page if none match."""
+    state = _verified_state(errors=119)
+    state.page_size = 25
+    state.show_page(4)
+    state.set_filter_value('grace')
+    assert (state.page_index, state.page_count, state.total_count) == (0, 1, 1)
+    assert _shown_ids(state) == [119]
+    state.set_filter_value('nobody')
+    assert (state.page_index, state.page_count, state.total_count) == (0, 1, 0)
+    assert _shown_ids(state) == []
+
+
+@pytest.mark.anyio
+async def test_batched_progress_reports_full_batches_and_the_rest_on_flush() -> None:
+    """Without the interval elapsing, only full batches are reported until the remainder is flushed."""
+    reports: list[int] = []
+
+    async def report(amount: int) -> None:
+        reports.append(amount)
+
+    progress = page.BatchedProgress(report, interval=3600, size=10)
+    for _ in range(25):
+        await progress.add(1)
+    assert reports == [10, 10]
+    await progress.add(3)
+    await progress.flush()
+    assert reports == [10, 10, 8]
+    await progress.flush()
+    assert sum(reports) == 28  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_batched_progress_reports_after_the_interval() -> None:
+    """Once the interval elapsed, every processed employee is reported immediately."""
+    reports: list[int] = []
+
+    async def report(amount: int) -> None:
+        reports.append(amount)
+
+    progress = page.BatchedProgress(report, interval=0, size=10)
+    for amount in (1, 2, 3):
+        await progress.add(amount)
+    await progress.flush()
+    assert reports == [1, 2, 3]
+
+
+def _export_client() -> httpx.AsyncClient:
+    app = starlette.applications.Starlette(
+        routes=[starlette.routing.Route(f'{routes.EXPORT_ROUTE}/{{token}}', page.export_errors)]
+    )
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://backend')
+
+
+async def _request_export(state: page.DataStateDeprecated, export_session: str) -> str:
+    """Request the export of the first two errors of the verification of the state as CSV and get its token."""
+    export_request = page.ExportRequest(
+        verification_key=state._verification_key,  # noqa: SLF001
+        error_ids=[0, 1],
+        file_format=export.Format.CSV,
+        with_attendances=False,
+        file_name='errors.csv',
+        session_digest=page._session_digest(export_session),  # noqa: SLF001
+    )
+    token = f'token-{export_session}'
+    await page._pending_exports.put(token, export_request.dumps())  # noqa: SLF001
+    return token
+
+
+@pytest.mark.anyio
+async def test_export_errors() -> None:
+    """The export is streamed once to the session which requested it."""
+    token = await _request_export(_verified_state(), 'secret')
+    async with _export_client() as client:
+        client.cookies.set(page.EXPORT_SESSION_COOKIE, 'secret')
+        response = await client.get(f'{routes.EXPORT_ROUTE}/{token}')
+        assert response.status_code == 200  # noqa: PLR2004
+        assert response.headers['content-disposition'] == 'attachment; filename="errors.csv"'
+        lines = response.text.splitlines()
+        assert lines[0].startswith('Name,')
+        assert [line.split(',')[0] for line in lines[1:]] == ['Ada Lovelace', 'Ada Lovelace']
+        assert (await client.get(f'{routes.EXPORT_ROUTE}/{token}')).status_code == 404  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_export_errors_of_an_unknown_token() -> None:
+    """Unknown or expired exports are not found."""
+    async with _export_client() as client:
+        assert (await client.get(f'{routes.EXPORT_ROUTE}/unknown')).status_code == 404  # noqa: PLR2004
+
+
+@pytest.mark.anyio
+async def test_export_errors_of_another_session() -> None:
+    """An export can not be downloaded by another session, even with its token, and is gone once refused."""
+    token = await _request_export(_verified_state(), 'secret')
+    async with _export_client() as client:
+        client.cookies.set(page.EXPORT_SESSION_COOKIE, 'guess')
+        assert (await client.get(f'{routes.EXPORT_ROUTE}/{token}')).status_code == 403  # noqa: PLR2004
+        client.cookies.set(page.EXPORT_SESSION_COOKIE, 'secret')
+        assert (await client.get(f'{routes.EXPORT_ROUTE}/{token}')).status_code == 404  # noqa: PLR2004